@@ -0,0 +1,292 @@
+"""Transactional bulk import of lineups from CSV or JSON.
+
+A batch is validated and given IDs and slots as a whole before anything is
+written. It is then committed in one go: every affected output file is
+written once, storage is saved once, and if either step fails the library
+and the output files are restored to their previous state.
+"""
+
+import csv
+import json
+import os
+
+from src.constants import GRENADES, MAPS, SIDES
+from src.core import generate_unique_id, make_lineup, parse_getpos
+from src.dedupe import DedupeIndex
+from src.renderer import DirtyTracker, generate_configs
+
+# Columns every row needs; ``tab``/``text`` are optional (auto slot if absent)
+REQUIRED_COLUMNS = ("map", "side", "grenade", "name", "getpos")
+
+# Validation errors listed in the exception message before "... and N more"
+_MAX_REPORTED = 10
+
+
+class BulkImportError(ValueError):
+    """Raised when a batch fails validation; nothing has been written."""
+
+    def __init__(self, errors: list):
+        self.errors = list(errors)
+        lines = self.errors[:_MAX_REPORTED]
+        if len(self.errors) > _MAX_REPORTED:
+            lines.append(f"... and {len(self.errors) - _MAX_REPORTED} more")
+        super().__init__("\n".join(lines))
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def read_rows(path: str) -> list:
+    """Read lineup rows from a ``.csv`` or ``.json`` file.
+
+    CSV files need a header row with the ``REQUIRED_COLUMNS`` (plus optional
+    ``tab`` and ``text``). JSON files hold a list of objects with the same
+    keys, or a ``lineups.json``-style ``{"lineups": [...]}`` whose
+    ``raw_getpos`` is accepted in place of ``getpos``.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as fh:
+            return list(csv.DictReader(fh))
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as fh:
+            rows = json.load(fh)
+        if isinstance(rows, dict):
+            rows = rows.get("lineups", [])
+        if not isinstance(rows, list):
+            raise ValueError(f"{path}: expected a list of lineups.")
+        return rows
+    raise ValueError(f"Unsupported import file type {ext!r}; use .csv or .json.")
+
+
+def _field(row: dict, key: str) -> str:
+    value = row.get(key)
+    if value is None and key == "getpos":
+        value = row.get("raw_getpos")
+    return "" if value is None else str(value).strip()
+
+
+def _slot(row: dict):
+    """Return the explicit ``(tab, text)`` of *row*, or ``None`` for auto."""
+    tab, text = _field(row, "tab"), _field(row, "text")
+    if not tab and not text:
+        return None
+    if not tab or not text:
+        raise ValueError("give both tab and text, or neither")
+    try:
+        return (int(tab), int(text))
+    except ValueError:
+        raise ValueError(f"tab/text must be integers, got {tab!r}/{text!r}") from None
+
+
+# ---------------------------------------------------------------------------
+# Validation and allocation
+# ---------------------------------------------------------------------------
+
+def prepare_lineups(
+    rows: list,
+    existing_ids: set,
+    slots,
+    sensitivity: float = 1.0,
+    lineups: list = (),
+    tolerances: tuple | None = None,
+    skipped: list | None = None,
+) -> list:
+    """Validate *rows* and build their lineups without writing anything.
+
+    Rows with ``tab``/``text`` keep that slot, which must be free; the rest
+    get the lowest free slots of their map/side through one
+    ``SlotIndex.reserve`` per pair. *slots* and *existing_ids* are not
+    modified. When *tolerances* is given, rows duplicating a stored lineup
+    in *lineups* (or an earlier row) are left out before any slot is given,
+    and a line saying why is appended to *skipped* for each.
+
+    Raises ``BulkImportError`` listing every problem found.
+    """
+    errors = []
+    parsed_rows = []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append(f"row {number}: not an object")
+            continue
+        map_name = _field(row, "map").lower()
+        side = _field(row, "side").upper()
+        grenade = _field(row, "grenade").lower()
+        name = _field(row, "name")
+        raw = _field(row, "getpos")
+        problems = []
+        if map_name not in MAPS:
+            problems.append(f"unknown map {map_name!r}")
+        if side not in SIDES:
+            problems.append(f"unknown side {side!r}")
+        if grenade not in GRENADES:
+            problems.append(f"unknown grenade {grenade!r}")
+        if not name:
+            problems.append("missing name")
+        parsed = None
+        try:
+            parsed = parse_getpos(raw)
+        except ValueError:
+            problems.append("missing or invalid getpos")
+        try:
+            slot = _slot(row)
+        except ValueError as exc:
+            problems.append(str(exc))
+            slot = None
+        if problems:
+            errors.append(f"row {number}: {'; '.join(problems)}")
+            continue
+        parsed_rows.append((number, map_name, side, grenade, name, raw, parsed, slot))
+
+    if tolerances is not None:
+        parsed_rows = _drop_duplicates(parsed_rows, lineups, tolerances, skipped)
+
+    work = slots.copy()
+    for number, map_name, side, *_, slot in parsed_rows:
+        if slot is None:
+            continue
+        try:
+            if work.is_occupied(map_name, side, *slot):
+                errors.append(
+                    f"row {number}: slot tab={slot[0]} text={slot[1]} is occupied"
+                )
+            else:
+                work.add(map_name, side, *slot)
+        except ValueError as exc:
+            errors.append(f"row {number}: {exc}")
+
+    auto: dict = {}
+    for entry in parsed_rows:
+        if entry[-1] is None:
+            auto.setdefault((entry[1], entry[2]), []).append(entry)
+    assigned = {}
+    for (map_name, side), entries in auto.items():
+        try:
+            reserved = work.reserve(map_name, side, len(entries))
+        except ValueError as exc:
+            errors.append(str(exc))
+            continue
+        for entry, slot in zip(entries, reserved):
+            assigned[entry[0]] = slot
+    if errors:
+        raise BulkImportError(errors)
+
+    ids = set(existing_ids)
+    built = []
+    for number, map_name, side, grenade, name, raw, parsed, slot in parsed_rows:
+        slot = slot or assigned[number]
+        unique_id = generate_unique_id(ids)
+        ids.add(unique_id)
+        built.append(make_lineup(
+            unique_id, side, map_name, grenade, name, raw, *slot, parsed, sensitivity
+        ))
+    return built
+
+
+def _drop_duplicates(parsed_rows: list, lineups: list, tolerances: tuple, skipped):
+    """Return *parsed_rows* without the rows duplicating a lineup or earlier row."""
+    dedupe = DedupeIndex.from_lineups(lineups, *tolerances)
+    kept = []
+    for entry in parsed_rows:
+        number, map_name, side, grenade, _, raw, *_ = entry
+        # Rows have no ID yet, so they are indexed under their row number
+        probe = {
+            "unique_id": f"#{number}", "map": map_name, "side": side,
+            "grenade": grenade, "raw_getpos": raw,
+        }
+        matches = dedupe.find(probe)
+        if not matches:
+            dedupe.add(probe)
+            kept.append(entry)
+            continue
+        if skipped is not None:
+            other = matches[0]["unique_id"]
+            what = f"row {other[1:]}" if other.startswith("#") else f"lineup {other}"
+            skipped.append(f"row {number}: duplicates {what}")
+    return kept
+
+
+# ---------------------------------------------------------------------------
+# Commit
+# ---------------------------------------------------------------------------
+
+def _tracker(lineups: list) -> DirtyTracker:
+    dirty = DirtyTracker()
+    dirty.clear()
+    for lu in lineups:
+        dirty.mark_lineup(lu)
+    return dirty
+
+
+def commit_lineups(
+    store,
+    data: dict,
+    lineups: list,
+    cfg_dir: str,
+    resource_dir: str,
+    storage_dir: str | None = None,
+    layout: str = "single",
+    progress=None,
+) -> list:
+    """Write *lineups* to the output files and storage as one transaction.
+
+    The files they touch are regenerated once each from the library plus the
+    batch, then the batch is saved with one ``store.add_lineups`` call. If
+    either step raises (including a cancelled *progress*), *data* is left
+    without the batch, the touched files are regenerated from it, and the
+    exception propagates. Returns the paths written.
+    """
+    previous = list(data.get("lineups", []))
+    staged = dict(data, lineups=previous + list(lineups))
+    try:
+        written = generate_configs(
+            cfg_dir, resource_dir, staged, storage_dir, _tracker(lineups),
+            progress=progress, layout=layout,
+        )
+        store.add_lineups(data, lineups)
+    except BaseException:
+        data["lineups"] = previous
+        try:
+            generate_configs(
+                cfg_dir, resource_dir, data, storage_dir, _tracker(lineups),
+                layout=layout,
+            )
+        except OSError:
+            pass  # the original error says more about what went wrong
+        raise
+    return written
+
+
+def bulk_add(
+    store,
+    data: dict,
+    rows: list,
+    cfg_dir: str,
+    resource_dir: str,
+    slots,
+    storage_dir: str | None = None,
+    sensitivity: float = 1.0,
+    layout: str = "single",
+    tolerances: tuple | None = None,
+    progress=None,
+    skipped: list | None = None,
+) -> list:
+    """Validate, allocate and commit *rows*; returns the new lineups.
+
+    On success the new slots are marked in *slots*; duplicate rows are left
+    out and reported in *skipped*. See ``prepare_lineups`` and
+    ``commit_lineups``.
+    """
+    lineups = prepare_lineups(
+        rows, store.get_existing_ids(data), slots, sensitivity,
+        data.get("lineups", []), tolerances, skipped,
+    )
+    if not lineups:
+        return []
+    commit_lineups(
+        store, data, lineups, cfg_dir, resource_dir, storage_dir, layout, progress
+    )
+    for lu in lineups:
+        slots.add(lu["map"], lu["side"], lu["tab"], lu["text"])
+    return lineups
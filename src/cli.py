@@ -0,0 +1,614 @@
+"""Headless command-line interface for the CS2 Lineup Config Generator.
+
+Usage::
+
+    python -m src.cli [--storage-dir DIR] [--cs2-path PATH ...] COMMAND ...
+
+Commands are built directly on ``core``, ``config_generator`` and
+``storage``. Each command imports only the modules it needs, and tkinter is
+never imported, so the CLI works on machines without a display.
+"""
+
+import argparse
+import contextlib
+import sys
+
+from src.constants import ALIAS_LAYOUTS, GRENADES, MAPS, SIDES
+
+
+class CliError(Exception):
+    """Raised by a command to abort with an error message."""
+
+
+# ---------------------------------------------------------------------------
+# Shared helpers
+# ---------------------------------------------------------------------------
+
+def _storage_dir(args) -> str:
+    from src.storage import default_storage_dir
+
+    return args.storage_dir or default_storage_dir()
+
+
+def _open(args):
+    """Open the store for ``--storage-dir`` and return ``(store, data)``."""
+    from src.storage import open_store
+
+    store = open_store(_storage_dir(args))
+    return store, store.load_data()
+
+
+def _cs2_paths(args, data: dict, required: bool = True) -> list:
+    """Return the CS2 installs to write to: ``--cs2-path`` or the settings."""
+    from src.config_generator import cs2_paths
+
+    if args.cs2_path:
+        paths = list(dict.fromkeys(args.cs2_path))
+    else:
+        paths = cs2_paths(data.get("settings", {}))
+    if not paths and required:
+        raise CliError("No CS2 installation path; pass --cs2-path or set it in the GUI.")
+    return paths
+
+
+def _cs2_path(args, data: dict, required: bool = True) -> str:
+    """Return the primary CS2 install, used for incremental edits."""
+    paths = _cs2_paths(args, data, required)
+    return paths[0] if paths else ""
+
+
+def _output_dirs(args, data: dict) -> tuple:
+    from src.config_generator import cs2_cfg_dir, cs2_resource_dir
+
+    cs2_path = _cs2_path(args, data)
+    return cs2_cfg_dir(cs2_path), cs2_resource_dir(cs2_path)
+
+
+def _generate(args, data: dict, dirty=None) -> int:
+    """Regenerate configs in every CS2 install; returns the failed count."""
+    from src.config_generator import output_targets
+    from src.renderer import generate_configs_to_targets
+
+    results = generate_configs_to_targets(
+        output_targets(_cs2_paths(args, data)), data, _storage_dir(args), dirty,
+        layout=_layout(data),
+    )
+    failed = [r for r in results if r.error is not None]
+    print(f"{sum(len(r.written) for r in results)} file(s) updated.")
+    for result in failed:
+        print(f"error: {result.cfg_dir}: {result.error}", file=sys.stderr)
+    return len(failed)
+
+
+def _update_other_installs(args, data: dict, dirty) -> int:
+    """Bring every other CS2 install up to date after an edit to the main one.
+
+    *dirty* marks the files the edit touched; they are regenerated in every
+    install, and the main install's are skipped as unchanged. Returns the
+    failed count, which is 0 when there is only one install.
+    """
+    if len(_cs2_paths(args, data)) < 2:
+        return 0
+    return _generate(args, data, dirty)
+
+
+def _edited(lineups):
+    """Return a dirty set marking the files touched by editing *lineups*."""
+    from src.renderer import DirtyTracker
+
+    dirty = DirtyTracker()
+    dirty.clear()
+    for lu in lineups:
+        dirty.mark_lineup(lu)
+    return dirty
+
+
+def _layout(data: dict) -> str:
+    """Return the alias layout stored in the settings."""
+    return data.get("settings", {}).get("alias_layout", "single")
+
+
+def _sensitivity(data: dict) -> float:
+    """Return the mouse sensitivity stored in the settings."""
+    return data.get("settings", {}).get("sensitivity", 1.0)
+
+
+def _slot_index(args, data: dict):
+    """Build the slot index from storage plus the cfg files, if any."""
+    from src.config_generator import cs2_cfg_dir
+    from src.slot_index import SlotIndex
+
+    index = SlotIndex.from_lineups(data.get("lineups", []))
+    cs2_path = _cs2_path(args, data, required=False)
+    if cs2_path:
+        index.merge_cfg_dir(cs2_cfg_dir(cs2_path))
+    return index
+
+
+def _dedupe_index(args, data: dict):
+    """Build the duplicate index over stored lineups using the tolerances."""
+    from src.dedupe import DedupeIndex
+
+    return DedupeIndex.from_lineups(data.get("lineups", []), *_tolerances(args, data))
+
+
+def _tolerances(args, data: dict) -> tuple:
+    from src.dedupe import tolerances
+
+    position, angle = tolerances(data.get("settings", {}))
+    if getattr(args, "position_tolerance", None) is not None:
+        position = args.position_tolerance
+    if getattr(args, "angle_tolerance", None) is not None:
+        angle = args.angle_tolerance
+    return position, angle
+
+
+def _format_row(lu: dict) -> str:
+    return "\t".join((
+        lu["unique_id"],
+        lu["map"],
+        lu["side"],
+        lu["grenade"],
+        f"tab={lu['tab']} text={lu['text']}",
+        lu["name"],
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+def _cmd_add(args) -> int:
+    from src.config_generator import write_lineup
+    from src.core import generate_unique_id, make_lineup, parse_getpos
+
+    store, data = _open(args)
+    parsed = parse_getpos(args.getpos)
+    cfg_dir, resource_dir = _output_dirs(args, data)
+    slots = _slot_index(args, data)
+
+    if args.tab is None and args.text is None:
+        slot = slots.first_free(args.map, args.side)
+        if slot is None:
+            raise CliError("All slots are occupied for this map/side.")
+        tab, text = slot
+    elif args.tab is None or args.text is None:
+        raise CliError("--tab and --text must be given together.")
+    else:
+        tab, text = args.tab, args.text
+        if slots.is_occupied(args.map, args.side, tab, text) and not args.force:
+            raise CliError(
+                f"Slot tab={tab} text={text} is already occupied; use --force to overwrite."
+            )
+
+    unique_id = generate_unique_id(store.get_existing_ids(data))
+    lineup = make_lineup(
+        unique_id, args.side, args.map, args.grenade, args.name, args.getpos.strip(),
+        tab, text, parsed, _sensitivity(data),
+    )
+    duplicates = _dedupe_index(args, data).find(lineup)
+    if duplicates and not args.allow_duplicate:
+        raise CliError(
+            f"Lineup duplicates {duplicates[0]['unique_id']}; "
+            "use --allow-duplicate to save it anyway."
+        )
+    write_lineup(cfg_dir, resource_dir, lineup, _layout(data))
+    store.add_lineup(data, lineup)
+    print(f"Saved {unique_id} at tab={tab} text={text}")
+    return 1 if _update_other_installs(args, data, _edited([lineup])) else 0
+
+
+def _cmd_import(args) -> int:
+    from src.core import generate_unique_id, iter_condump, make_lineup
+    from src.renderer import DirtyTracker
+
+    store, data = _open(args)
+    _cs2_paths(args, data)  # fail before parsing anything without an install
+    slots = _slot_index(args, data)
+    dedupe = _dedupe_index(args, data)
+    existing_ids = store.get_existing_ids(data)
+    dirty = DirtyTracker()
+    dirty.clear()
+
+    duplicates = 0
+    candidates = []
+    for i, (line_number, raw, parsed) in enumerate(iter_condump(args.file)):
+        if not args.allow_duplicate:
+            probe = {
+                "unique_id": f"#{i}", "map": args.map, "side": args.side,
+                "grenade": args.grenade, "raw_getpos": raw,
+            }
+            if dedupe.find(probe):
+                duplicates += 1
+                continue
+            dedupe.add(probe)
+        candidates.append((line_number, raw, parsed))
+
+    # One allocation for the whole batch; lineups that do not fit are skipped
+    imported = min(len(candidates), slots.free_count(args.map, args.side))
+    skipped = len(candidates) - imported
+    reserved = slots.reserve(args.map, args.side, imported)
+    lineups = []
+    for number, ((line_number, raw, parsed), slot) in enumerate(
+        zip(candidates, reserved), start=1
+    ):
+        unique_id = generate_unique_id(existing_ids)
+        existing_ids.add(unique_id)
+        lineup = make_lineup(
+            unique_id, args.side, args.map, args.grenade,
+            f"{args.name_prefix} {number}", raw, *slot, parsed, _sensitivity(data),
+        )
+        lineups.append(lineup)
+        dirty.mark_lineup(lineup)
+        print(f"line {line_number}: {unique_id} tab={slot[0]} text={slot[1]}")
+
+    failed = 0
+    if lineups:
+        # Row-level insert: the SQLite backend does not rewrite the library
+        store.add_lineups(data, lineups)
+        failed = _generate(args, data, dirty)
+    print(f"Imported {imported} lineup(s).")
+    if duplicates:
+        print(f"Skipped {duplicates} duplicate lineup(s).")
+    if skipped:
+        print(f"Skipped {skipped} lineup(s): no free slots left.", file=sys.stderr)
+        return 1
+    return 1 if failed else 0
+
+
+def _cmd_import_file(args) -> int:
+    from src.bulk import bulk_add, read_rows
+
+    store, data = _open(args)
+    cfg_dir, resource_dir = _output_dirs(args, data)
+    rows = read_rows(args.file)
+    duplicates = []
+    # The batch is committed to the main install as one transaction
+    lineups = bulk_add(
+        store, data, rows, cfg_dir, resource_dir, _slot_index(args, data),
+        _storage_dir(args), _sensitivity(data), _layout(data),
+        None if args.allow_duplicate else _tolerances(args, data),
+        skipped=duplicates,
+    )
+    for lu in lineups:
+        print(_format_row(lu))
+    for line in duplicates:
+        print(f"Skipped {line}")
+    print(f"Imported {len(lineups)} lineup(s).")
+    # ... then copied to the other installs
+    return 1 if lineups and _update_other_installs(args, data, _edited(lineups)) else 0
+
+
+def _cmd_generate(args) -> int:
+    store, data = _open(args)
+    _cs2_paths(args, data)  # fail before saving the layout without an install
+    if args.layout and args.layout != _layout(data):
+        data.setdefault("settings", {})["alias_layout"] = args.layout
+        store.save_settings(data)
+    return 1 if _generate(args, data) else 0
+
+
+def _cmd_sensitivity(args) -> int:
+    from src.core import recompute_values
+    from src.renderer import DirtyTracker
+
+    if args.value <= 0:
+        raise CliError("Sensitivity must be a positive number.")
+    store, data = _open(args)
+    lineups = data.get("lineups", [])
+    data.setdefault("settings", {})["sensitivity"] = args.value
+    changed = recompute_values(lineups, args.value)
+    store.save_data(data)
+    print(f"Recomputed {changed} lineup(s).")
+    if changed and _cs2_paths(args, data, required=False):
+        aliases = DirtyTracker()
+        aliases.clear()
+        aliases.mark_aliases(lineups)
+        if _generate(args, data, aliases):
+            return 1
+    return 0
+
+
+def _cmd_delete(args) -> int:
+    from src.config_generator import remove_lineups_files
+
+    store, data = _open(args)
+    cfg_dir, resource_dir = _output_dirs(args, data)
+    status = 0
+    lineups = []
+    for unique_id in dict.fromkeys(args.ids):
+        lineup = store.find_lineup(data, unique_id)
+        if lineup is None:
+            print(f"Lineup {unique_id} not found.", file=sys.stderr)
+            status = 1
+            continue
+        lineups.append(lineup)
+    if lineups:
+        remove_lineups_files(cfg_dir, resource_dir, lineups, _layout(data))
+        store.remove_lineups(data, {lu["unique_id"] for lu in lineups})
+    for lu in lineups:
+        print(f"Deleted {lu['unique_id']}")
+    if lineups and _update_other_installs(args, data, _edited(lineups)):
+        return 1
+    return status
+
+
+def _cmd_list(args) -> int:
+    _, data = _open(args)
+    for lu in data.get("lineups", []):
+        if args.map and lu["map"] != args.map:
+            continue
+        if args.side and lu["side"] != args.side:
+            continue
+        if args.grenade and lu["grenade"] != args.grenade:
+            continue
+        print(_format_row(lu))
+    return 0
+
+
+def _cmd_slots(args) -> int:
+    _, data = _open(args)
+    slots = _slot_index(args, data)
+    occupied = sorted(slots.occupied(args.map, args.side))
+    if occupied:
+        print(", ".join(f"tab={t} text={x}" for t, x in occupied))
+    else:
+        print("No occupied slots.")
+    first = slots.first_free(args.map, args.side)
+    if first is None:
+        print("No free slots.")
+    else:
+        print(
+            f"First free: tab={first[0]} text={first[1]} "
+            f"({slots.free_count(args.map, args.side)} free)"
+        )
+    return 0
+
+
+def _cmd_compact(args) -> int:
+    from src.config_generator import commands_filename, labels_filename
+    from src.renderer import DirtyTracker
+    from src.slot_index import compact_wheel
+
+    store, data = _open(args)
+    cfg_dir, _ = _output_dirs(args, data)
+    dirty = DirtyTracker()
+    dirty.clear()
+    moved = 0
+    for map_name in [args.map] if args.map else MAPS:
+        for side in [args.side] if args.side else SIDES:
+            moves = compact_wheel(
+                cfg_dir, data.get("lineups", []), map_name, side, _layout(data)
+            )
+            for (tab, text), (new_tab, new_text) in sorted(moves.items()):
+                print(
+                    f"{map_name} {side}: tab={tab} text={text} -> "
+                    f"tab={new_tab} text={new_text}"
+                )
+            if moves:
+                dirty.mark_files((
+                    labels_filename(map_name, side),
+                    commands_filename(map_name, side),
+                ))
+            moved += len(moves)
+    if moved:
+        store.save_data(data)
+    print(f"Moved {moved} slot(s).")
+    return 1 if moved and _update_other_installs(args, data, dirty) else 0
+
+
+def _cmd_dedupe(args) -> int:
+    from src.config_generator import remove_lineups_files
+    from src.dedupe import find_duplicates
+
+    store, data = _open(args)
+    groups = find_duplicates(data.get("lineups", []), *_tolerances(args, data))
+    if not groups:
+        print("No duplicates found.")
+        return 0
+    for kept, dups in groups:
+        print(f"{kept['unique_id']}: {', '.join(lu['unique_id'] for lu in dups)}")
+    victims = [lu for _, dups in groups for lu in dups]
+    if not args.merge:
+        print(f"{len(victims)} duplicate(s); run with --merge to delete them.")
+        return 0
+    cfg_dir, resource_dir = _output_dirs(args, data)
+    remove_lineups_files(cfg_dir, resource_dir, victims, _layout(data))
+    store.remove_lineups(data, {lu["unique_id"] for lu in victims})
+    print(f"Deleted {len(victims)} duplicate(s).")
+    return 1 if _update_other_installs(args, data, _edited(victims)) else 0
+
+
+def _cmd_reconcile(args) -> int:
+    from src.reconcile import UNREPAIRABLE, reconcile, repair
+
+    _, data = _open(args)
+    cfg_dir, resource_dir = _output_dirs(args, data)
+    issues = reconcile(cfg_dir, resource_dir, data.get("lineups", []), _layout(data))
+    for issue in issues:
+        key = issue.key
+        if isinstance(key, tuple):
+            key = f"tab={key[0]} text={key[1]}"
+        print(f"{issue.kind}\t{issue.filename}\t{key}\t{issue.detail}")
+    if not issues:
+        print("Storage and config files agree.")
+        return 0
+    print(f"{len(issues)} difference(s).")
+    if not args.repair:
+        print("Run with --repair to rewrite the affected files from storage.")
+        return 0
+    written = repair(
+        cfg_dir, resource_dir, data, issues, _storage_dir(args), _layout(data)
+    )
+    print(f"{len(written)} file(s) rewritten.")
+    conflicts = sum(1 for issue in issues if issue.kind in UNREPAIRABLE)
+    if conflicts:
+        print(
+            f"{conflicts} slot conflict(s) need manual fixing (delete or move a lineup).",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+def _cmd_near(args) -> int:
+    from src.core import parse_getpos
+    from src.spatial_index import SpatialIndex
+
+    _, data = _open(args)
+    pos = parse_getpos(args.getpos)["setpos"]
+    index = SpatialIndex.from_lineups(data.get("lineups", []))
+    if args.radius is not None:
+        found = index.within(args.map, pos, args.radius, args.side)
+    else:
+        found = index.nearest(args.map, pos, args.k, args.side)
+    if not found:
+        print("No lineups found.")
+    for distance, lu in found:
+        print(f"{distance:9.1f}  {_format_row(lu)}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Argument parsing
+# ---------------------------------------------------------------------------
+
+def _add_target_args(parser, required: bool = True) -> None:
+    parser.add_argument("--map", choices=MAPS, required=required)
+    parser.add_argument("--side", choices=SIDES, required=required)
+
+
+def _add_tolerance_args(parser) -> None:
+    parser.add_argument(
+        "--position-tolerance", type=float, help="duplicate distance per axis (units)"
+    )
+    parser.add_argument(
+        "--angle-tolerance", type=float, help="duplicate pitch/yaw difference (degrees)"
+    )
+
+
+def _add_dedupe_args(parser) -> None:
+    parser.add_argument(
+        "--allow-duplicate", action="store_true", help="save lineups that duplicate others"
+    )
+    _add_tolerance_args(parser)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="CS2 Lineup Config Generator (CSAFAP), headless.",
+    )
+    parser.add_argument("--storage-dir", help="storage directory (default ~/.csafap)")
+    parser.add_argument(
+        "--cs2-path", action="append",
+        help="CS2 installation path (default from settings); repeat to write "
+        "generated configs to several installs, the first is used for edits",
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE", help="write timing spans and I/O counters as JSON"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="add a single lineup")
+    _add_target_args(p)
+    p.add_argument("--grenade", choices=GRENADES, required=True)
+    p.add_argument("--name", required=True)
+    p.add_argument("--getpos", required=True, help="pasted getpos output")
+    p.add_argument("--tab", type=int)
+    p.add_argument("--text", type=int)
+    p.add_argument("--force", action="store_true", help="overwrite an occupied slot")
+    _add_dedupe_args(p)
+    p.set_defaults(func=_cmd_add)
+
+    p = sub.add_parser("import", help="import every getpos line from a condump file")
+    p.add_argument("file")
+    _add_target_args(p)
+    p.add_argument("--grenade", choices=GRENADES, required=True)
+    p.add_argument("--name-prefix", default="import")
+    _add_dedupe_args(p)
+    p.set_defaults(func=_cmd_import)
+
+    p = sub.add_parser(
+        "import-file", help="import lineups from a CSV or JSON file, all or nothing "
+        "(duplicate rows are skipped)"
+    )
+    p.add_argument("file", help="columns: map, side, grenade, name, getpos[, tab, text]")
+    _add_dedupe_args(p)
+    p.set_defaults(func=_cmd_import_file)
+
+    p = sub.add_parser("generate", help="regenerate all config files")
+    p.add_argument(
+        "--layout", choices=ALIAS_LAYOUTS,
+        help="alias layout to switch to: one main.cfg or per-map shards (saved)",
+    )
+    p.set_defaults(func=_cmd_generate)
+
+    p = sub.add_parser(
+        "sensitivity", help="set mouse sensitivity and recompute yaw/pitch values"
+    )
+    p.add_argument("value", type=float)
+    p.set_defaults(func=_cmd_sensitivity)
+
+    p = sub.add_parser("delete", help="delete lineups by ID")
+    p.add_argument("ids", nargs="+")
+    p.set_defaults(func=_cmd_delete)
+
+    p = sub.add_parser("list", help="list saved lineups")
+    _add_target_args(p, required=False)
+    p.add_argument("--grenade", choices=GRENADES)
+    p.set_defaults(func=_cmd_list)
+
+    p = sub.add_parser("slots", help="show occupied and free slots")
+    _add_target_args(p)
+    p.set_defaults(func=_cmd_slots)
+
+    p = sub.add_parser("compact", help="repack slots to close holes left by deletes")
+    _add_target_args(p, required=False)
+    p.set_defaults(func=_cmd_compact)
+
+    p = sub.add_parser("dedupe", help="report (or merge) duplicate lineups")
+    _add_tolerance_args(p)
+    p.add_argument("--merge", action="store_true", help="delete all but the first copy")
+    p.set_defaults(func=_cmd_dedupe)
+
+    p = sub.add_parser(
+        "reconcile", help="compare storage with the config files on disk"
+    )
+    p.add_argument(
+        "--repair", action="store_true",
+        help="rewrite each differing file once from storage",
+    )
+    p.set_defaults(func=_cmd_reconcile)
+
+    p = sub.add_parser("near", help="list lineups thrown near a getpos position")
+    p.add_argument("--map", choices=MAPS, required=True)
+    p.add_argument("--side", choices=SIDES)
+    p.add_argument("--getpos", required=True, help="pasted getpos output")
+    p.add_argument("-k", type=int, default=5, help="number of lineups (default 5)")
+    p.add_argument("--radius", type=float, help="list every lineup within this distance")
+    p.set_defaults(func=_cmd_near)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    trace = contextlib.nullcontext()
+    if args.trace:
+        from src import diagnostics
+
+        diagnostics.enable()
+        trace = diagnostics.span(args.command)
+    try:
+        with trace:
+            return args.func(args)
+    except (CliError, ValueError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if args.trace:
+            diagnostics.dump_trace(args.trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
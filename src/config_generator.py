@@ -1,6 +1,35 @@
 """Config file generation for CS2 lineup configurations."""
 
+import mmap
 import os
+import re
+import threading
+from collections import OrderedDict
+
+from src import diagnostics
+from src.constants import ALIAS_LAYOUTS
+from src.core import format_lineup_name
+from src.fileio import (
+    atomic_write_bytes,
+    atomic_write_text,
+    overwrite_from,
+    sync_batch,
+)
+
+_ALIAS_ID_RE = re.compile(r"^\s*alias\s+\S+?_(?:yaw|pitch)_(\S+)")
+_PLATFORM_KEY_RE = re.compile(r'^\s*"([^"]+)"')
+_LABEL_RE = re.compile(r'cl_radial_radio_tab_(\d+)_text_(\d+)\s+"(#[^"]+)"')
+_COMMAND_RE = re.compile(r"cl_radial_radio_tab_(\d+)_text_(\d+)\s+(.*?)\s*$")
+
+# Parsed labels/commands files, most recently used last. Entries are
+# validated against the file's (mtime_ns, size) and dropped on our writes.
+PARSE_CACHE_SIZE = 64
+_parse_cache: OrderedDict = OrderedDict()
+_parse_lock = threading.Lock()
+
+# Delimiters of the CSAFAP-managed region inside platform_english.txt
+PLATFORM_BLOCK_BEGIN = "// CSAFAP BEGIN - managed by CSAFAP, do not edit"
+PLATFORM_BLOCK_END = "// CSAFAP END"
 
 
 def ensure_directory(path: str) -> None:
@@ -8,6 +37,89 @@ def ensure_directory(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def cs2_cfg_dir(cs2_path: str) -> str:
+    """Return the CSAFAP cfg directory inside a CS2 installation."""
+    return os.path.join(cs2_path, "csgo", "cfg", "CSAFAP")
+
+
+def cs2_resource_dir(cs2_path: str) -> str:
+    """Return the resource directory inside a CS2 installation."""
+    return os.path.join(cs2_path, "csgo", "resource")
+
+
+def cs2_paths(settings: dict) -> list:
+    """Return every configured CS2 installation, ``cs2_path`` first.
+
+    ``extra_cs2_paths`` lists further installs that generated configs are
+    also written to. Empty entries and repeats are dropped.
+    """
+    paths = [settings.get("cs2_path", "")] + list(settings.get("extra_cs2_paths", []))
+    return [p for p in dict.fromkeys(p.strip() for p in paths) if p]
+
+
+def output_targets(paths: list) -> list:
+    """Return the ``(cfg_dir, resource_dir)`` pair of each CS2 install."""
+    return [(cs2_cfg_dir(p), cs2_resource_dir(p)) for p in paths]
+
+
+def labels_filename(map_name: str, side: str) -> str:
+    """Return the labels cfg filename for *map_name* / *side*."""
+    return f"{map_name.lower()}_{side.upper()}_labels.cfg"
+
+
+def commands_filename(map_name: str, side: str) -> str:
+    """Return the commands cfg filename for *map_name* / *side*."""
+    return f"{map_name.lower()}_{side.upper()}_commands.cfg"
+
+
+def aliases_filename(map_name: str) -> str:
+    """Return the alias shard filename for *map_name* (sharded layout)."""
+    return f"{map_name.lower()}_aliases.cfg"
+
+
+def alias_filename(map_name: str, layout: str = "single") -> str:
+    """Return the file that holds *map_name*'s aliases under *layout*."""
+    if layout not in ALIAS_LAYOUTS:
+        raise ValueError(f"Unknown alias layout: {layout!r}")
+    return aliases_filename(map_name) if layout == "sharded" else "main.cfg"
+
+
+def format_shard_exec(map_name: str) -> str:
+    """Return the console command that loads *map_name*'s alias shard."""
+    return f"exec CSAFAP/{map_name.lower()}_aliases"
+
+
+def format_alias_lines(
+    grenade: str, unique_id: str, yaw_value: float, pitch_value: float
+) -> list:
+    """Return the two ``main.cfg`` alias lines for a lineup."""
+    grenade_lower = grenade.lower()
+    return [
+        f'alias {grenade_lower}_yaw_{unique_id} "yaw {yaw_value} 1 1"',
+        f'alias {grenade_lower}_pitch_{unique_id} "pitch {pitch_value} 1 1"',
+    ]
+
+
+def alias_line_id(line: str):
+    """Return the lineup ID of a yaw/pitch alias line, or ``None``."""
+    m = _ALIAS_ID_RE.match(line)
+    return m.group(1) if m else None
+
+
+def format_platform_entry(message_name: str, formatted_lineup_name: str) -> str:
+    """Return the ``platform_english.txt`` line for a lineup."""
+    return f'"{message_name}"                    "{formatted_lineup_name}"'
+
+
+def format_command(grenade: str, unique_id: str) -> str:
+    """Return the radio wheel command string for a lineup."""
+    grenade_lower = grenade.lower()
+    return (
+        f'cmd";{grenade_lower}_yaw_{unique_id};'
+        f'{grenade_lower}_pitch_{unique_id};'
+    )
+
+
 # ---------------------------------------------------------------------------
 # main.cfg helpers
 # ---------------------------------------------------------------------------
@@ -18,24 +130,30 @@ def append_main_cfg(
     unique_id: str,
     yaw_value: float,
     pitch_value: float,
+    filename: str = "main.cfg",
 ) -> None:
-    """Append yaw/pitch alias lines to ``main.cfg``.
+    """Append yaw/pitch alias lines to ``main.cfg`` (or alias shard *filename*).
 
     Adds two lines::
 
         alias {grenade}_yaw_{id} "yaw {yaw_value} 1 1"
         alias {grenade}_pitch_{id} "pitch {pitch_value} 1 1"
+
+    The file is replaced atomically with the lines added, so a crash leaves
+    either the old or the new file, never a torn line.
     """
-    ensure_directory(cfg_dir)
-    path = os.path.join(cfg_dir, "main.cfg")
-    grenade_lower = grenade.lower()
-    lines = [
-        f'alias {grenade_lower}_yaw_{unique_id} "yaw {yaw_value} 1 1"',
-        f'alias {grenade_lower}_pitch_{unique_id} "pitch {pitch_value} 1 1"',
-    ]
-    with open(path, "a", encoding="utf-8") as fh:
-        for line in lines:
-            fh.write(line + "\n")
+    path = os.path.join(cfg_dir, filename)
+    text = "".join(
+        line + "\n"
+        for line in format_alias_lines(grenade, unique_id, yaw_value, pitch_value)
+    )
+    try:
+        with open(path, "rb") as fh:
+            diagnostics.count(diagnostics.FILES_OPENED)
+            existing = fh.read()
+    except FileNotFoundError:
+        existing = b""
+    atomic_write_bytes(path, [existing, text.encode("utf-8")])
 
 
 # ---------------------------------------------------------------------------
@@ -52,51 +170,213 @@ def append_platform_english(
     Format::
 
         "CFG_MAP_NADE_ID"                    "Formatted Name"
+
+    When the managed block ends the file and has no entry for
+    *message_name* yet, the entry is written over the END marker in place;
+    otherwise the file is rewritten atomically with the entry spliced in.
     """
-    ensure_directory(resource_dir)
     path = os.path.join(resource_dir, "platform_english.txt")
-    entry = f'"{message_name}"                    "{formatted_lineup_name}"'
-    with open(path, "a", encoding="utf-8") as fh:
-        fh.write(entry + "\n")
+    entry = format_platform_entry(message_name, formatted_lineup_name)
+    if _append_at_end(path, message_name, entry):
+        return
+    head, entries, tail = split_platform_english(path)
+    entries = [line for line in entries if platform_entry_key(line) != message_name]
+    entries.append(entry)
+    write_platform_english(path, head, entries, tail)
+
+
+def platform_entry_key(line: str):
+    """Return the message name a ``platform_english.txt`` line defines, if any."""
+    m = _PLATFORM_KEY_RE.match(line)
+    return m.group(1) if m else None
+
+
+def _locate_block(mm) -> tuple | None:
+    """Return ``(start, inner_start, inner_end, end)`` of the managed block.
+
+    *start*/*end* delimit the whole block including both marker lines;
+    *inner_start*/*inner_end* delimit the entry lines between them.
+    """
+    begin = mm.find(PLATFORM_BLOCK_BEGIN.encode("utf-8"))
+    if begin == -1:
+        return None
+    finish = mm.find(PLATFORM_BLOCK_END.encode("utf-8"), begin)
+    if finish == -1:
+        return None
+    inner_start = mm.find(b"\n", begin)
+    inner_start = finish if inner_start == -1 or inner_start > finish else inner_start + 1
+    end = mm.find(b"\n", finish)
+    end = len(mm) if end == -1 else end + 1
+    return begin, inner_start, finish, end
+
+
+def _append_at_end(path: str, message_name: str, entry: str) -> bool:
+    """Append *entry* in place if the managed block is the end of *path*.
+
+    Returns ``False``, leaving the file untouched, when there is no block,
+    text follows it, or it already defines *message_name*.
+    """
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return False
+    with diagnostics.span("config.append_platform_english"), fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return False
+        diagnostics.count(diagnostics.FILES_OPENED)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            found = _locate_block(mm)
+            if found is None or found[3] != len(mm):
+                return False
+            _, inner_start, inner_end, _ = found
+            inner = mm[inner_start:inner_end].decode("utf-8")
+        if any(platform_entry_key(line) == message_name for line in inner.splitlines()):
+            return False
+        overwrite_from(
+            path, inner_end, f"{entry}\n{PLATFORM_BLOCK_END}\n".encode("utf-8")
+        )
+    return True
+
+
+def split_platform_english(path: str) -> tuple:
+    """Split ``platform_english.txt`` around the CSAFAP managed block.
+
+    Returns ``(head, entries, tail)`` where *head* and *tail* are the raw
+    bytes before and after the block and *entries* are the entry lines inside
+    it. The block is located with a memory-mapped search, so the (possibly
+    multi-megabyte) rest of the file is copied but never decoded or parsed.
+
+    A file without a block is migrated once: legacy ``"CFG_…"`` lines are
+    moved out of the file body and returned as *entries*.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return b"", [], b""
+    with diagnostics.span("config.split_platform_english"):
+        return _split_platform_english(path)
+
+
+def _split_platform_english(path: str) -> tuple:
+    diagnostics.count(diagnostics.FILES_OPENED)
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            diagnostics.count(diagnostics.BYTES_READ, len(mm))
+            found = _locate_block(mm)
+            if found is not None:
+                start, inner_start, inner_end, end = found
+                inner = mm[inner_start:inner_end].decode("utf-8")
+                return mm[:start], inner.splitlines(), mm[end:]
+            body = mm[:].decode("utf-8")
+    kept, entries = [], []
+    for line in body.splitlines(keepends=True):
+        if line.lstrip().startswith('"CFG_'):
+            entries.append(line.rstrip("\r\n"))
+        else:
+            kept.append(line)
+    if kept and not kept[-1].endswith("\n"):
+        kept[-1] += "\n"
+    return "".join(kept).encode("utf-8"), entries, b""
+
+
+def _platform_block(entries: list) -> bytes:
+    lines = [PLATFORM_BLOCK_BEGIN, *entries, PLATFORM_BLOCK_END]
+    return "".join(line + "\n" for line in lines).encode("utf-8")
+
+
+def join_platform_english(head: bytes, entries: list, tail: bytes) -> bytes:
+    """Return the file contents with *entries* spliced in as the managed block."""
+    return head + _platform_block(entries) + tail
+
+
+def write_platform_english(path: str, head: bytes, entries: list, tail: bytes) -> None:
+    """Atomically rewrite ``platform_english.txt`` with a new managed block."""
+    atomic_write_bytes(path, [head, _platform_block(entries), tail])
 
 
 # ---------------------------------------------------------------------------
 # labels.cfg helpers
 # ---------------------------------------------------------------------------
 
+def _parse_slots(path: str, pattern) -> dict:
+    slots: dict = {}
+    diagnostics.count(diagnostics.FILES_OPENED)
+    span = diagnostics.span("config.parse_slots")
+    with span, open(path, "r", encoding="utf-8") as fh:
+        lines = 0
+        for lines, line in enumerate(fh, start=1):
+            m = pattern.search(line)
+            if m:
+                slots[(int(m.group(1)), int(m.group(2)))] = m.group(3)
+        diagnostics.count(diagnostics.REGEX_PARSES, lines)
+        if diagnostics.enabled:
+            diagnostics.count(diagnostics.BYTES_READ, fh.buffer.tell())
+    return slots
+
+
+def _read_slots_file(path: str, pattern) -> dict:
+    """Return the parsed slots of *path*, from the cache when still valid.
+
+    A copy is returned, so callers may modify it freely.
+    """
+    key = os.path.abspath(path)
+    try:
+        st = os.stat(key)
+    except FileNotFoundError:
+        invalidate_parse_cache(key)
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _parse_lock:
+        entry = _parse_cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _parse_cache.move_to_end(key)
+            return dict(entry[1])
+    slots = _parse_slots(key, pattern)
+    with _parse_lock:
+        _parse_cache[key] = (stamp, slots)
+        _parse_cache.move_to_end(key)
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return dict(slots)
+
+
+def invalidate_parse_cache(path: str | None = None) -> None:
+    """Forget the cached parse of *path*, or of every file if ``None``."""
+    with _parse_lock:
+        if path is None:
+            _parse_cache.clear()
+        else:
+            _parse_cache.pop(os.path.abspath(path), None)
+
+
+def read_slots_cfg(cfg_dir: str, map_name: str, side: str) -> tuple:
+    """Read the labels and commands cfgs of *map_name* / *side* together.
+
+    Returns ``(labels, commands)`` as from ``read_labels_cfg`` and
+    ``read_commands_cfg``; each file is parsed at most once while unchanged.
+    """
+    return (
+        read_labels_cfg(cfg_dir, map_name, side),
+        read_commands_cfg(cfg_dir, map_name, side),
+    )
+
+
 def read_labels_cfg(cfg_dir: str, map_name: str, side: str) -> dict:
     """Read an existing labels cfg and return a dict of slot -> message_name.
 
     Returns ``{(tab, text): message_name, ...}``.
     """
-    filename = f"{map_name.lower()}_{side.upper()}_labels.cfg"
-    path = os.path.join(cfg_dir, filename)
-    slots: dict = {}
-    if not os.path.exists(path):
-        return slots
-    import re
-    pattern = re.compile(
-        r'cl_radial_radio_tab_(\d+)_text_(\d+)\s+"(#[^"]+)"'
+    return _read_slots_file(
+        os.path.join(cfg_dir, labels_filename(map_name, side)), _LABEL_RE
     )
-    with open(path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            m = pattern.search(line)
-            if m:
-                tab = int(m.group(1))
-                text = int(m.group(2))
-                msg = m.group(3)
-                slots[(tab, text)] = msg
-    return slots
 
 
 def write_labels_cfg(cfg_dir: str, map_name: str, side: str, slots: dict) -> None:
     """Write the labels cfg from a slots dict."""
-    ensure_directory(cfg_dir)
-    filename = f"{map_name.lower()}_{side.upper()}_labels.cfg"
-    path = os.path.join(cfg_dir, filename)
-    with open(path, "w", encoding="utf-8") as fh:
-        for (tab, text), msg in sorted(slots.items()):
-            fh.write(f'cl_radial_radio_tab_{tab}_text_{text} "{msg}"\n')
+    path = os.path.join(cfg_dir, labels_filename(map_name, side))
+    atomic_write_text(path, "".join(
+        f'cl_radial_radio_tab_{tab}_text_{text} "{msg}"\n'
+        for (tab, text), msg in sorted(slots.items())
+    ))
+    invalidate_parse_cache(path)
 
 
 def append_label(
@@ -122,34 +402,31 @@ def read_commands_cfg(cfg_dir: str, map_name: str, side: str) -> dict:
 
     Returns ``{(tab, text): command_string, ...}``.
     """
-    filename = f"{map_name.lower()}_{side.upper()}_commands.cfg"
-    path = os.path.join(cfg_dir, filename)
-    slots: dict = {}
-    if not os.path.exists(path):
-        return slots
-    import re
-    pattern = re.compile(
-        r'cl_radial_radio_tab_(\d+)_text_(\d+)\s+(.*)'
+    return _read_slots_file(
+        os.path.join(cfg_dir, commands_filename(map_name, side)), _COMMAND_RE
     )
-    with open(path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            m = pattern.search(line)
-            if m:
-                tab = int(m.group(1))
-                text = int(m.group(2))
-                cmd = m.group(3).strip()
-                slots[(tab, text)] = cmd
-    return slots
 
 
-def write_commands_cfg(cfg_dir: str, map_name: str, side: str, slots: dict) -> None:
+def format_commands_cfg(map_name: str, slots: dict, layout: str = "single") -> str:
+    """Return the commands cfg contents for a slots dict.
+
+    In the sharded layout the file first execs the map's alias shard, so
+    only that map's aliases are loaded.
+    """
+    header = f"{format_shard_exec(map_name)}\n" if layout == "sharded" else ""
+    return header + "".join(
+        f"cl_radial_radio_tab_{tab}_text_{text} {cmd}\n"
+        for (tab, text), cmd in sorted(slots.items())
+    )
+
+
+def write_commands_cfg(
+    cfg_dir: str, map_name: str, side: str, slots: dict, layout: str = "single"
+) -> None:
     """Write the commands cfg from a slots dict."""
-    ensure_directory(cfg_dir)
-    filename = f"{map_name.lower()}_{side.upper()}_commands.cfg"
-    path = os.path.join(cfg_dir, filename)
-    with open(path, "w", encoding="utf-8") as fh:
-        for (tab, text), cmd in sorted(slots.items()):
-            fh.write(f"cl_radial_radio_tab_{tab}_text_{text} {cmd}\n")
+    path = os.path.join(cfg_dir, commands_filename(map_name, side))
+    atomic_write_text(path, format_commands_cfg(map_name, slots, layout))
+    invalidate_parse_cache(path)
 
 
 def append_command(
@@ -160,46 +437,39 @@ def append_command(
     text: int,
     grenade: str,
     unique_id: str,
+    layout: str = "single",
 ) -> None:
     """Append a single command entry to the commands cfg."""
     slots = read_commands_cfg(cfg_dir, map_name, side)
-    grenade_lower = grenade.lower()
-    cmd = (
-        f'cmd";{grenade_lower}_yaw_{unique_id};'
-        f'{grenade_lower}_pitch_{unique_id};'
-    )
-    slots[(tab, text)] = cmd
-    write_commands_cfg(cfg_dir, map_name, side, slots)
+    slots[(tab, text)] = format_command(grenade, unique_id)
+    write_commands_cfg(cfg_dir, map_name, side, slots, layout)
 
 
 # ---------------------------------------------------------------------------
 # Deletion helpers
 # ---------------------------------------------------------------------------
 
+def _read_lines(path: str) -> list:
+    diagnostics.count(diagnostics.FILES_OPENED)
+    with open(path, "r", encoding="utf-8") as fh:
+        lines = fh.readlines()
+    if diagnostics.enabled:
+        diagnostics.count_bytes(diagnostics.BYTES_READ, "".join(lines))
+    return lines
+
+
 def remove_from_main_cfg(cfg_dir: str, unique_id: str) -> None:
     """Remove alias lines containing *unique_id* from ``main.cfg``."""
     path = os.path.join(cfg_dir, "main.cfg")
     if not os.path.exists(path):
         return
-    with open(path, "r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    with open(path, "w", encoding="utf-8") as fh:
-        for line in lines:
-            if unique_id not in line:
-                fh.write(line)
+    lines = _read_lines(path)
+    atomic_write_text(path, "".join(line for line in lines if unique_id not in line))
 
 
 def remove_from_platform_english(resource_dir: str, message_name: str) -> None:
     """Remove the entry for *message_name* from ``platform_english.txt``."""
-    path = os.path.join(resource_dir, "platform_english.txt")
-    if not os.path.exists(path):
-        return
-    with open(path, "r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    with open(path, "w", encoding="utf-8") as fh:
-        for line in lines:
-            if message_name not in line:
-                fh.write(line)
+    remove_messages_from_platform_english(resource_dir, {message_name})
 
 
 def remove_slot_from_labels(
@@ -212,12 +482,178 @@ def remove_slot_from_labels(
 
 
 def remove_slot_from_commands(
-    cfg_dir: str, map_name: str, side: str, tab: int, text: int
+    cfg_dir: str,
+    map_name: str,
+    side: str,
+    tab: int,
+    text: int,
+    layout: str = "single",
 ) -> None:
     """Remove a specific slot from the commands cfg."""
     slots = read_commands_cfg(cfg_dir, map_name, side)
     slots.pop((tab, text), None)
-    write_commands_cfg(cfg_dir, map_name, side, slots)
+    write_commands_cfg(cfg_dir, map_name, side, slots, layout)
+
+
+# ---------------------------------------------------------------------------
+# Batch deletion helpers
+# ---------------------------------------------------------------------------
+
+def remove_ids_from_main_cfg(
+    cfg_dir: str, unique_ids: set, filename: str = "main.cfg"
+) -> None:
+    """Remove the alias lines of every ID in *unique_ids* in a single pass.
+
+    *filename* selects an alias shard instead of ``main.cfg``.
+    """
+    path = os.path.join(cfg_dir, filename)
+    if not unique_ids or not os.path.exists(path):
+        return
+    lines = _read_lines(path)
+    kept = []
+    for line in lines:
+        m = _ALIAS_ID_RE.match(line)
+        if m is None or m.group(1) not in unique_ids:
+            kept.append(line)
+    diagnostics.count(diagnostics.REGEX_PARSES, len(lines))
+    if len(kept) != len(lines):
+        atomic_write_text(path, "".join(kept))
+
+
+def remove_messages_from_platform_english(
+    resource_dir: str, message_names: set
+) -> None:
+    """Remove the entries of every name in *message_names* in a single pass.
+
+    Only the managed block is filtered; the rest of the file is untouched.
+    """
+    path = os.path.join(resource_dir, "platform_english.txt")
+    if not message_names or not os.path.exists(path):
+        return
+    head, entries, tail = split_platform_english(path)
+    kept = [line for line in entries if platform_entry_key(line) not in message_names]
+    if len(kept) != len(entries):
+        write_platform_english(path, head, kept, tail)
+
+
+def remove_slots(
+    cfg_dir: str, map_name: str, side: str, slots: set, layout: str = "single"
+) -> None:
+    """Remove every ``(tab, text)`` in *slots* from the labels and commands cfgs.
+
+    Each file is read and rewritten once.
+    """
+    if not slots:
+        return
+    labels, commands = read_slots_cfg(cfg_dir, map_name, side)
+    if not slots.isdisjoint(labels):
+        write_labels_cfg(
+            cfg_dir, map_name, side,
+            {slot: msg for slot, msg in labels.items() if slot not in slots},
+        )
+    if not slots.isdisjoint(commands):
+        write_commands_cfg(
+            cfg_dir, map_name, side,
+            {slot: cmd for slot, cmd in commands.items() if slot not in slots},
+            layout,
+        )
+
+
+def move_slots(
+    cfg_dir: str, map_name: str, side: str, moves: dict, layout: str = "single"
+) -> None:
+    """Move labels/commands entries between slots.
+
+    *moves* maps ``(tab, text)`` -> new ``(tab, text)``. Each file is read
+    and rewritten once; entries not being moved stay where they are.
+    """
+    if not moves:
+        return
+    labels, commands = read_slots_cfg(cfg_dir, map_name, side)
+    for entries in (labels, commands):
+        moved = {new: entries.pop(old) for old, new in moves.items() if old in entries}
+        entries.update(moved)
+    with sync_batch():
+        write_labels_cfg(cfg_dir, map_name, side, labels)
+        write_commands_cfg(cfg_dir, map_name, side, commands, layout)
+
+
+# ---------------------------------------------------------------------------
+# Whole-lineup helpers
+# ---------------------------------------------------------------------------
+
+def write_lineup(
+    cfg_dir: str, resource_dir: str, lineup: dict, layout: str = "single"
+) -> None:
+    """Write a single stored *lineup* into every config file.
+
+    ``main.cfg`` and the labels/commands files are replaced atomically and
+    ``platform_english.txt`` is spliced in place; all of them are flushed to
+    disk together once the four are written.
+    """
+    with diagnostics.span("config.write_lineup"), sync_batch():
+        _write_lineup(cfg_dir, resource_dir, lineup, layout)
+
+
+def _write_lineup(cfg_dir: str, resource_dir: str, lineup: dict, layout: str) -> None:
+    append_main_cfg(
+        cfg_dir, lineup["grenade"], lineup["unique_id"],
+        lineup["yaw_value"], lineup["pitch_value"],
+        alias_filename(lineup["map"], layout),
+    )
+    append_platform_english(
+        resource_dir, lineup["message_name"], format_lineup_name(lineup["name"])
+    )
+    append_label(
+        cfg_dir, lineup["map"], lineup["side"],
+        lineup["tab"], lineup["text"], lineup["message_name"],
+    )
+    append_command(
+        cfg_dir, lineup["map"], lineup["side"],
+        lineup["tab"], lineup["text"], lineup["grenade"], lineup["unique_id"],
+        layout,
+    )
+
+
+def remove_lineup_files(
+    cfg_dir: str, resource_dir: str, lineup: dict, layout: str = "single"
+) -> None:
+    """Remove a single stored *lineup* from every config file."""
+    remove_lineups_files(cfg_dir, resource_dir, [lineup], layout)
+
+
+def remove_lineups_files(
+    cfg_dir: str, resource_dir: str, lineups: list, layout: str = "single"
+) -> None:
+    """Remove many stored *lineups* from every config file.
+
+    Each affected file is filtered in a single pass and rewritten at most
+    once, however many lineups are removed; all of them are flushed to disk
+    together at the end.
+    """
+    with diagnostics.span("config.remove_lineups_files"), sync_batch():
+        _remove_lineups_files(cfg_dir, resource_dir, lineups, layout)
+
+
+def _remove_lineups_files(
+    cfg_dir: str, resource_dir: str, lineups: list, layout: str
+) -> None:
+    slots_by_pair: dict = {}
+    ids_by_alias_file: dict = {}
+    for lu in lineups:
+        slots_by_pair.setdefault((lu["map"], lu["side"]), set()).add(
+            (lu["tab"], lu["text"])
+        )
+        ids_by_alias_file.setdefault(alias_filename(lu["map"], layout), set()).add(
+            lu["unique_id"]
+        )
+    for filename, unique_ids in ids_by_alias_file.items():
+        remove_ids_from_main_cfg(cfg_dir, unique_ids, filename)
+    remove_messages_from_platform_english(
+        resource_dir, {lu["message_name"] for lu in lineups}
+    )
+    for (map_name, side), slots in slots_by_pair.items():
+        remove_slots(cfg_dir, map_name, side, slots, layout)
 
 
 # ---------------------------------------------------------------------------
@@ -226,8 +662,7 @@ def remove_slot_from_commands(
 
 def get_occupied_slots(cfg_dir: str, map_name: str, side: str) -> set:
     """Return the set of ``(tab, text)`` tuples already in use."""
-    labels = read_labels_cfg(cfg_dir, map_name, side)
-    commands = read_commands_cfg(cfg_dir, map_name, side)
+    labels, commands = read_slots_cfg(cfg_dir, map_name, side)
     return set(labels.keys()) | set(commands.keys())
 
 
@@ -29,3 +29,6 @@ RADIO_TAB_MIN = 0
 RADIO_TAB_MAX = 2
 RADIO_TEXT_MIN = 1
 RADIO_TEXT_MAX = 8
+
+# Where the yaw/pitch aliases go: all in main.cfg, or one shard per map
+ALIAS_LAYOUTS = ("single", "sharded")
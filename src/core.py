@@ -4,12 +4,25 @@ import random
 import re
 import string
 
-from src.constants import SENSITIVITY_MULTIPLIER
+from src.constants import SENSITIVITY, SENSITIVITY_MULTIPLIER
 
 # Characters used for generating unique IDs
 _ID_CHARS = string.ascii_uppercase + string.digits
 _ID_LENGTH = 6
 
+_GETPOS_RE = re.compile(
+    r"setpos\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s*;\s*"
+    r"setang\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)"
+)
+
+
+def _match_to_getpos(match) -> dict:
+    values = [float(match.group(i)) for i in range(1, 7)]
+    return {
+        "setpos": values[0:3],
+        "setang": values[3:6],  # pitch, yaw, roll
+    }
+
 
 def parse_getpos(raw: str) -> dict:
     """Parse a CS2 ``getpos`` console output and return setpos/setang values.
@@ -23,22 +36,45 @@ def parse_getpos(raw: str) -> dict:
 
     Raises ``ValueError`` on invalid input.
     """
-    raw = raw.strip()
-    pattern = (
-        r"setpos\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s*;\s*"
-        r"setang\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)"
-    )
-    match = re.search(pattern, raw)
+    match = _GETPOS_RE.search(raw.strip())
     if not match:
         raise ValueError(
             "Invalid getpos format. Expected: "
             "'setpos X Y Z; setang PITCH YAW ROLL'"
         )
-    values = [float(match.group(i)) for i in range(1, 7)]
-    return {
-        "setpos": values[0:3],
-        "setang": values[3:6],  # pitch, yaw, roll
-    }
+    try:
+        return _match_to_getpos(match)
+    except ValueError:
+        raise ValueError(f"Invalid getpos numbers in: {match.group(0)!r}") from None
+
+
+def iter_getpos(lines):
+    """Yield every ``setpos …; setang …`` record found in *lines*.
+
+    *lines* is any iterable of strings (e.g. an open file), consumed lazily.
+    Yields ``(line_number, raw, parsed)`` where *line_number* is 1-based,
+    *raw* is the matched ``setpos …; setang …`` text and *parsed* is the dict
+    returned by ``parse_getpos``. Lines with malformed numbers are skipped.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if "setpos" not in line:
+            continue
+        for match in _GETPOS_RE.finditer(line):
+            try:
+                parsed = _match_to_getpos(match)
+            except ValueError:
+                continue
+            yield line_number, match.group(0), parsed
+
+
+def iter_condump(path: str):
+    """Stream getpos records from a CS2 console log (``condump``) file.
+
+    The file is read line by line, so memory use does not grow with the log
+    size. Yields the same tuples as ``iter_getpos``.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        yield from iter_getpos(fh)
 
 
 def extract_yaw_pitch(setang: list) -> tuple:
@@ -53,13 +89,46 @@ def extract_yaw_pitch(setang: list) -> tuple:
     return yaw_angle, pitch_angle
 
 
-def calculate_value(angle: float) -> float:
+def calculate_value(angle: float, sensitivity: float = SENSITIVITY) -> float:
     """Calculate the mouse movement value from an angle.
 
     Formula: value = angle / (sensitivity * 0.022).
-    Since sensitivity is always 1.0, this simplifies to angle / 0.022.
     """
-    return angle / SENSITIVITY_MULTIPLIER
+    return angle / (sensitivity * SENSITIVITY_MULTIPLIER)
+
+
+def lineup_angles(lineup: dict) -> tuple:
+    """Return ``(yaw_angle, pitch_angle)`` for a stored *lineup*.
+
+    The angles are cached on the lineup dict; lineups saved before they were
+    stored have them parsed from ``raw_getpos`` once.
+    """
+    if "yaw_angle" not in lineup or "pitch_angle" not in lineup:
+        yaw_angle, pitch_angle = extract_yaw_pitch(
+            parse_getpos(lineup["raw_getpos"])["setang"]
+        )
+        lineup["yaw_angle"] = yaw_angle
+        lineup["pitch_angle"] = pitch_angle
+    return lineup["yaw_angle"], lineup["pitch_angle"]
+
+
+def recompute_values(lineups: list, sensitivity: float) -> int:
+    """Recompute ``yaw_value``/``pitch_value`` of every lineup for *sensitivity*.
+
+    Values are derived from the stored angles, so no getpos is re-parsed.
+    Returns the number of lineups whose values changed.
+    """
+    divisor = sensitivity * SENSITIVITY_MULTIPLIER
+    changed = 0
+    for lu in lineups:
+        yaw_angle, pitch_angle = lineup_angles(lu)
+        yaw_value = yaw_angle / divisor
+        pitch_value = pitch_angle / divisor
+        if lu.get("yaw_value") != yaw_value or lu.get("pitch_value") != pitch_value:
+            lu["yaw_value"] = yaw_value
+            lu["pitch_value"] = pitch_value
+            changed += 1
+    return changed
 
 
 def generate_unique_id(existing_ids: set | None = None) -> str:
@@ -96,3 +165,43 @@ def build_message_name(map_name: str, grenade: str, unique_id: str) -> str:
     Format: ``CFG_{MAP}_{GRENADE}_{ID}``
     """
     return f"CFG_{map_name.upper()}_{grenade.upper()}_{unique_id.upper()}"
+
+
+def make_lineup(
+    unique_id: str,
+    side: str,
+    map_name: str,
+    grenade: str,
+    name: str,
+    raw_getpos: str,
+    tab: int,
+    text: int,
+    parsed: dict | None = None,
+    sensitivity: float = SENSITIVITY,
+) -> "Lineup":
+    """Build the ``Lineup`` record for a new lineup.
+
+    *parsed* is the ``parse_getpos`` result for *raw_getpos*; it is parsed
+    here when not supplied. The yaw/pitch values are computed for
+    *sensitivity*; the angles are stored too so they can be recomputed.
+    """
+    if parsed is None:
+        parsed = parse_getpos(raw_getpos)
+    from src.model import Lineup  # src.model imports this module
+
+    yaw_angle, pitch_angle = extract_yaw_pitch(parsed["setang"])
+    return Lineup(
+        unique_id=unique_id,
+        side=side,
+        map=map_name,
+        grenade=grenade,
+        name=name,
+        raw_getpos=raw_getpos,
+        yaw_angle=yaw_angle,
+        pitch_angle=pitch_angle,
+        yaw_value=calculate_value(yaw_angle, sensitivity),
+        pitch_value=calculate_value(pitch_angle, sensitivity),
+        message_name=build_message_name(map_name, grenade, unique_id),
+        tab=tab,
+        text=text,
+    )
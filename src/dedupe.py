@@ -0,0 +1,159 @@
+"""Duplicate and near-duplicate lineup detection.
+
+Two lineups are duplicates when they share ``(map, side, grenade)`` and
+every ``setpos`` coordinate and ``setang`` pitch/yaw differs by at most the
+configured tolerance. Lineups are hashed into buckets twice as wide as the
+tolerance, so a candidate only has to be compared against the 2^5 buckets
+around it, whatever the library size.
+"""
+
+import itertools
+import math
+
+from src.core import parse_getpos
+
+# Default tolerances: game units for position, degrees for angles.
+DEFAULT_POSITION_TOLERANCE = 1.0
+DEFAULT_ANGLE_TOLERANCE = 0.05
+
+
+def tolerances(settings: dict) -> tuple:
+    """Return ``(position, angle)`` tolerances from the stored *settings*."""
+    return (
+        float(settings.get("dedupe_position_tolerance", DEFAULT_POSITION_TOLERANCE)),
+        float(settings.get("dedupe_angle_tolerance", DEFAULT_ANGLE_TOLERANCE)),
+    )
+
+
+# Index of the yaw angle in a throw tuple
+_YAW = 4
+
+
+def _yaw_difference(a: float, b: float) -> float:
+    """Return *a* - *b* in degrees, wrapped into [-180, 180)."""
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+def _throw(lineup: dict):
+    """Return ``(x, y, z, pitch, yaw)`` for *lineup*, or ``None`` if unparsable."""
+    try:
+        parsed = parse_getpos(lineup.get("raw_getpos", ""))
+    except ValueError:
+        return None
+    x, y, z = parsed["setpos"]
+    pitch, yaw, _ = parsed["setang"]
+    return (x, y, z, pitch, (yaw + 180.0) % 360.0 - 180.0)
+
+
+class DedupeIndex:
+    """Bucketed hash of lineup throws for O(1) duplicate lookups."""
+
+    def __init__(
+        self,
+        position_tolerance: float = DEFAULT_POSITION_TOLERANCE,
+        angle_tolerance: float = DEFAULT_ANGLE_TOLERANCE,
+    ):
+        tols = (position_tolerance,) * 3 + (angle_tolerance,) * 2
+        self._tolerances = tols
+        self._widths = tuple(2.0 * t for t in tols)
+        self._buckets: dict = {}  # key -> {unique_id: (throw, lineup)}
+        self._keys: dict = {}  # unique_id -> bucket key
+
+    @classmethod
+    def from_lineups(cls, lineups, *args, **kwargs) -> "DedupeIndex":
+        """Build an index from stored lineup dicts."""
+        index = cls(*args, **kwargs)
+        for lu in lineups:
+            index.add(lu)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _group(self, lineup: dict) -> tuple:
+        return (lineup["map"].lower(), lineup["side"].upper(), lineup["grenade"])
+
+    def _cells(self, throw) -> tuple:
+        return tuple(
+            math.floor(v / w) if w else v for v, w in zip(throw, self._widths)
+        )
+
+    def _neighbour_keys(self, group, throw):
+        """Yield the bucket keys that may hold a throw within tolerance."""
+        options = []
+        for i, (v, w) in enumerate(zip(throw, self._widths)):
+            if not w:
+                options.append((v,))
+                continue
+            values = [v]
+            # Yaw wraps: near +-180 the match may sit at the other edge
+            if i == _YAW and v - self._tolerances[i] < -180.0:
+                values.append(v + 360.0)
+            elif i == _YAW and v + self._tolerances[i] >= 180.0:
+                values.append(v - 360.0)
+            cells = []
+            for value in values:
+                cell = math.floor(value / w)
+                # Within half a bucket of the lower edge -> the lower
+                # neighbour can hold a match, otherwise the upper one can.
+                other = cell - 1 if value - cell * w < w / 2 else cell + 1
+                cells += (cell, other)
+            options.append(tuple(dict.fromkeys(cells)))
+        for cells in itertools.product(*options):
+            yield group + cells
+
+    def add(self, lineup: dict) -> bool:
+        """Index *lineup*; returns ``False`` if its getpos cannot be parsed."""
+        throw = _throw(lineup)
+        if throw is None:
+            return False
+        self.remove(lineup["unique_id"])
+        key = self._group(lineup) + self._cells(throw)
+        self._buckets.setdefault(key, {})[lineup["unique_id"]] = (throw, lineup)
+        self._keys[lineup["unique_id"]] = key
+        return True
+
+    def remove(self, unique_id: str) -> None:
+        """Drop *unique_id* from the index; unknown IDs are ignored."""
+        key = self._keys.pop(unique_id, None)
+        if key is not None:
+            bucket = self._buckets[key]
+            del bucket[unique_id]
+            if not bucket:
+                del self._buckets[key]
+
+    def find(self, lineup: dict) -> list:
+        """Return the indexed lineups that duplicate *lineup* (excluding itself)."""
+        throw = _throw(lineup)
+        if throw is None:
+            return []
+        found = []
+        tolerances = self._tolerances[:_YAW]
+        yaw_tolerance = self._tolerances[_YAW]
+        for key in self._neighbour_keys(self._group(lineup), throw):
+            for unique_id, (other, existing) in self._buckets.get(key, {}).items():
+                if unique_id == lineup.get("unique_id"):
+                    continue
+                if all(
+                    abs(a - b) <= t for a, b, t in zip(throw, other, tolerances)
+                ) and abs(_yaw_difference(throw[_YAW], other[_YAW])) <= yaw_tolerance:
+                    found.append(existing)
+        return found
+
+
+def find_duplicates(lineups, *args, **kwargs) -> list:
+    """Group duplicate lineups in one pass.
+
+    Returns ``[(kept, [duplicates, ...]), ...]`` where *kept* is the first
+    occurrence in *lineups* and every duplicate matches it.
+    """
+    index = DedupeIndex(*args, **kwargs)
+    groups: dict = {}
+    for lu in lineups:
+        matches = index.find(lu)
+        if matches:
+            kept = matches[0]
+            groups.setdefault(kept["unique_id"], (kept, []))[1].append(lu)
+        else:
+            index.add(lu)
+    return list(groups.values())
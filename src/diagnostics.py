@@ -0,0 +1,195 @@
+"""Opt-in timing spans and I/O counters.
+
+Instrumentation is off by default: ``span()`` then returns a shared no-op
+context manager and ``count()`` returns after one flag check, so the
+instrumented hot paths pay next to nothing. Call ``enable()`` (the GUI's
+Diagnostics tab does) or set ``CSAFAP_TRACE`` to a file path to turn it on;
+with the environment variable every recorded operation is also dumped there
+as JSON when the process exits.
+
+The outermost span on a thread is an *operation*. Nested spans and counters
+are totalled into it, and finished operations are kept in a short history.
+Worker threads contribute to an operation through ``joined()``.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_ENV = "CSAFAP_TRACE"
+
+# Finished operations kept for the Diagnostics tab and trace dumps
+HISTORY_SIZE = 100
+
+# Counter names used by the instrumented modules
+FILES_OPENED = "files_opened"
+FILES_WRITTEN = "files_written"
+BYTES_READ = "bytes_read"
+BYTES_WRITTEN = "bytes_written"
+REGEX_PARSES = "regex_parses"
+
+enabled = False
+
+_local = threading.local()
+_lock = threading.Lock()
+_history: deque = deque(maxlen=HISTORY_SIZE)
+
+
+class Operation:
+    """Wall time, per-span totals and counters of one top-level operation."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.wall_ms = 0.0
+        self.spans: dict = {}  # name -> [calls, total_ms]
+        self.counters: dict = {}
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started": self.started,
+            "wall_ms": round(self.wall_ms, 3),
+            "spans": {
+                name: {"calls": calls, "total_ms": round(total, 3)}
+                for name, (calls, total) in self.spans.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "op", "top", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        op = getattr(_local, "op", None)
+        self.top = op is None
+        if self.top:
+            op = _local.op = Operation(self.name)
+        self.op = op
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.start) * 1000.0
+        with _lock:
+            totals = self.op.spans.setdefault(self.name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+        if self.top:
+            self.op.wall_ms = elapsed
+            _local.op = None
+            with _lock:
+                _history.append(self.op)
+        return False
+
+
+def span(name: str):
+    """Return a context manager timing *name* (a no-op when disabled)."""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add *amount* to counter *name* of the current operation."""
+    if not enabled:
+        return
+    op = getattr(_local, "op", None)
+    if op is not None:
+        with _lock:
+            op.counters[name] = op.counters.get(name, 0) + amount
+
+
+def count_bytes(name: str, contents) -> None:
+    """Add the encoded size of *contents* (``str`` or ``bytes``) to *name*."""
+    if not enabled:
+        return
+    if isinstance(contents, str):
+        contents = contents.encode("utf-8")
+    count(name, len(contents))
+
+
+def current_operation():
+    """Return the operation being recorded on this thread, or ``None``."""
+    return getattr(_local, "op", None)
+
+
+@contextlib.contextmanager
+def joined(op):
+    """Record this thread's spans and counters into *op*.
+
+    Used by worker threads doing part of an operation started on another
+    thread; a no-op when *op* is ``None``.
+    """
+    if op is None:
+        yield
+        return
+    previous = getattr(_local, "op", None)
+    _local.op = op
+    try:
+        yield
+    finally:
+        _local.op = previous
+
+
+def enable(on: bool = True) -> None:
+    """Turn instrumentation on (or off with ``on=False``)."""
+    global enabled
+    enabled = on
+
+
+def last_operation():
+    """Return the most recently finished ``Operation``, or ``None``."""
+    with _lock:
+        return _history[-1] if _history else None
+
+
+def operations() -> list:
+    """Return the finished operations, oldest first."""
+    with _lock:
+        return list(_history)
+
+
+def clear() -> None:
+    """Forget every recorded operation."""
+    with _lock:
+        _history.clear()
+
+
+def dump_trace(path: str) -> int:
+    """Write every recorded operation to *path* as JSON; returns the count."""
+    ops = [op.to_dict() for op in operations()]
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"operations": ops}, fh, indent=2)
+    return len(ops)
+
+
+def _enable_from_env() -> None:
+    path = os.environ.get(TRACE_ENV)
+    if path:
+        enable()
+        atexit.register(dump_trace, path)
+
+
+_enable_from_env()
@@ -0,0 +1,255 @@
+"""Crash-safe file output helpers.
+
+Files are written into a staging directory next to their destination and
+published with atomic renames, so an interrupted write never leaves a
+half-updated config tree behind. Durability is requested once per batch
+rather than once per file: staged trees are flushed as a whole before they
+are published, and single-file writes made inside ``sync_batch()`` are
+flushed together when the block ends.
+"""
+
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+
+from src import diagnostics
+
+_STAGE_PREFIX = ".csafap-stage-"
+_BACKUP_SUFFIX = ".csafap-old"
+_DEFAULT_FILE_MODE = 0o644
+_DEFAULT_DIR_MODE = 0o755
+
+# Files and directories written inside ``sync_batch()``, per thread
+_pending = threading.local()
+
+
+def _existing_mode(path: str, default: int) -> int:
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return default
+
+
+def _write_file(path: str, contents) -> None:
+    """Write *contents* (``str`` or ``bytes``) to *path*."""
+    diagnostics.count(diagnostics.FILES_WRITTEN)
+    diagnostics.count_bytes(diagnostics.BYTES_WRITTEN, contents)
+    if isinstance(contents, bytes):
+        with open(path, "wb") as fh:
+            fh.write(contents)
+        return
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(contents)
+
+
+def _fsync_path(path: str) -> None:
+    with open(path, "rb") as fh:
+        os.fsync(fh.fileno())
+
+
+def _fsync_directory(path: str) -> None:
+    """Flush a directory entry so renames inside it survive a crash."""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sync_batch(paths, directories=()) -> None:
+    """Flush the files in *paths*, then the *directories* holding them."""
+    for path in paths:
+        _fsync_path(path)
+    for directory in directories:
+        _fsync_directory(directory)
+
+
+@contextlib.contextmanager
+def sync_batch():
+    """Flush the atomic writes made inside the block once, when it ends.
+
+    Each file is still renamed into place atomically, but none is fsynced
+    on its own; every written file and then every touched directory is
+    flushed once on exit. Nested blocks join the outermost one.
+    """
+    if getattr(_pending, "batch", None) is not None:
+        yield
+        return
+    batch = _pending.batch = ({}, {})  # insertion-ordered sets
+    try:
+        yield
+    finally:
+        _pending.batch = None
+    files, directories = batch
+    _sync_batch(files, directories)
+
+
+def atomic_write_text(path: str, contents: str) -> None:
+    """Replace *path* with *contents* atomically."""
+    _atomic_write(path, lambda fd: os.fdopen(fd, "w", encoding="utf-8"), [contents])
+
+
+def atomic_write_bytes(path: str, chunks) -> None:
+    """Replace *path* atomically with the concatenation of byte *chunks*.
+
+    Chunks are written one after another, so large unchanged regions of a
+    file are copied through without being joined into one buffer first.
+    """
+    _atomic_write(path, lambda fd: os.fdopen(fd, "wb"), chunks)
+
+
+def _atomic_write(path: str, opener, chunks) -> None:
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=_STAGE_PREFIX, dir=directory)
+    diagnostics.count(diagnostics.FILES_WRITTEN)
+    batch = getattr(_pending, "batch", None)
+    try:
+        with opener(fd) as fh:
+            for chunk in chunks:
+                diagnostics.count_bytes(diagnostics.BYTES_WRITTEN, chunk)
+                fh.write(chunk)
+            fh.flush()
+            if batch is None:
+                os.fsync(fh.fileno())
+        os.chmod(tmp_path, _existing_mode(path, _DEFAULT_FILE_MODE))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _written(path, directory, batch)
+
+
+def _written(path: str, directory: str, batch) -> None:
+    """Flush *directory* now, or leave *path* to the enclosing batch."""
+    if batch is None:
+        _fsync_directory(directory)
+        return
+    batch[0][path] = None
+    batch[1][directory] = None
+
+
+def overwrite_from(path: str, offset: int, contents: bytes) -> None:
+    """Replace the bytes of *path* from *offset* on with *contents*, in place.
+
+    Much cheaper than an atomic rewrite when a large file only changes at
+    its end, but not crash-safe: an interrupted write can leave a torn
+    tail, so callers must be able to detect and rebuild it. The file is
+    flushed now, or with the enclosing ``sync_batch()``.
+    """
+    diagnostics.count(diagnostics.FILES_WRITTEN)
+    diagnostics.count_bytes(diagnostics.BYTES_WRITTEN, contents)
+    batch = getattr(_pending, "batch", None)
+    with open(path, "r+b") as fh:
+        fh.seek(offset)
+        fh.write(contents)
+        fh.truncate()
+        fh.flush()
+        if batch is None:
+            os.fsync(fh.fileno())
+    if batch is not None:
+        batch[0][os.path.abspath(path)] = None
+
+
+def _recover_directory(target_dir: str) -> None:
+    """Finish or roll back a swap interrupted by a crash."""
+    backup = target_dir + _BACKUP_SUFFIX
+    if not os.path.exists(backup):
+        return
+    if os.path.exists(target_dir):
+        shutil.rmtree(backup)
+    else:
+        os.replace(backup, target_dir)
+
+
+def _carry_over(src_dir: str, staging: str, skip: set) -> None:
+    """Link files from *src_dir* that the batch does not replace into *staging*."""
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if entry.name in skip or entry.name.startswith(_STAGE_PREFIX):
+                continue
+            dest = os.path.join(staging, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                shutil.copytree(entry.path, dest, symlinks=True)
+                continue
+            try:
+                os.link(entry.path, dest)
+            except OSError:
+                shutil.copy2(entry.path, dest, follow_symlinks=False)
+
+
+def publish_directory(target_dir: str, files: dict, remove=()) -> None:
+    """Publish *files* (``{filename: contents}``) into *target_dir*.
+
+    The new tree is assembled in a sibling staging directory (existing files
+    that are not part of the batch are hard-linked across) and then swapped
+    into place, so readers see either the old tree or the new one. Files
+    named in *remove* are left out of the new tree.
+    """
+    with diagnostics.span("fileio.publish_directory"):
+        _publish_directory(os.path.abspath(target_dir), files, remove)
+
+
+def _publish_directory(target_dir: str, files: dict, remove) -> None:
+    parent = os.path.dirname(target_dir)
+    os.makedirs(parent, exist_ok=True)
+    _recover_directory(target_dir)
+
+    staging = tempfile.mkdtemp(prefix=_STAGE_PREFIX, dir=parent)
+    try:
+        os.chmod(staging, _existing_mode(target_dir, _DEFAULT_DIR_MODE))
+        written = []
+        for filename, contents in files.items():
+            path = os.path.join(staging, filename)
+            _write_file(path, contents)
+            written.append(path)
+        if os.path.isdir(target_dir):
+            _carry_over(target_dir, staging, set(files) | set(remove))
+        _sync_batch(written, [staging])
+
+        backup = target_dir + _BACKUP_SUFFIX
+        if os.path.exists(target_dir):
+            os.replace(target_dir, backup)
+        os.replace(staging, target_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        _recover_directory(target_dir)
+        raise
+    _fsync_directory(parent)
+    shutil.rmtree(target_dir + _BACKUP_SUFFIX, ignore_errors=True)
+
+
+def replace_files(target_dir: str, files: dict) -> None:
+    """Atomically replace individual *files* inside a shared *target_dir*.
+
+    Used for directories that also hold files we do not own (e.g. the game's
+    ``resource`` directory), where swapping the whole directory is not an
+    option. Each file is renamed into place atomically.
+    """
+    with diagnostics.span("fileio.replace_files"):
+        _replace_files(target_dir, files)
+
+
+def _replace_files(target_dir: str, files: dict) -> None:
+    os.makedirs(target_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=_STAGE_PREFIX, dir=target_dir)
+    try:
+        written = []
+        for filename, contents in files.items():
+            path = os.path.join(staging, filename)
+            _write_file(path, contents)
+            written.append(path)
+        _sync_batch(written)
+        for filename in files:
+            os.replace(
+                os.path.join(staging, filename), os.path.join(target_dir, filename)
+            )
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    _fsync_directory(target_dir)
@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
 from src.constants import (
+    ALIAS_LAYOUTS,
     GRENADES,
     MAPS,
     RADIO_TAB_MAX,
@@ -14,33 +15,77 @@ from src.constants import (
     SIDES,
 )
 from src.core import (
-    build_message_name,
-    calculate_value,
-    extract_yaw_pitch,
-    format_lineup_name,
     generate_unique_id,
+    make_lineup,
     parse_getpos,
+    recompute_values,
 )
+from src import diagnostics
+from src.bulk import bulk_add, read_rows
 from src.config_generator import (
-    append_command,
-    append_label,
-    append_main_cfg,
-    append_platform_english,
-    find_first_empty_slot,
-    get_occupied_slots,
-    remove_from_main_cfg,
-    remove_from_platform_english,
-    remove_slot_from_commands,
-    remove_slot_from_labels,
+    commands_filename,
+    cs2_cfg_dir,
+    cs2_paths,
+    cs2_resource_dir,
+    labels_filename,
+    output_targets,
+    remove_lineups_files,
+    write_lineup,
 )
+from src.dedupe import DedupeIndex, tolerances
+from src.list_model import PagedApplier, RowSync
+from src.renderer import DirtyTracker, generate_configs_to_targets
+from src.slot_index import SlotIndex, compact_wheel
+from src.spatial_index import SpatialIndex
 from src.storage import (
-    add_lineup,
-    find_lineup,
-    get_existing_ids,
-    load_data,
-    remove_lineup,
-    save_data,
+    BACKENDS,
+    default_data,
+    default_storage_dir,
+    open_store,
+    switch_backend,
 )
+from src.worker import JobCancelled, JobRunner
+
+# How often (ms) the main loop polls the worker for progress and results.
+_POLL_INTERVAL = 50
+
+# Filter combobox entry that disables that filter, and the typing debounce (ms).
+_ALL = "All"
+_FILTER_DELAY = 150
+
+
+def save_lineup_job(ctx, store, data, cfg_dir, resource_dir, lineup, layout):
+    """Body of the Save Lineup job: write the config files, then storage.
+
+    It can be cancelled only before the files are written; from then on
+    storage must follow, or the lineup would sit in the cfg files unsaved.
+    """
+    ctx.report(0, 2, "Writing config files")
+    write_lineup(cfg_dir, resource_dir, lineup, layout)
+    ctx.report(1, 2, "Saving lineup", cancellable=False)
+    return store.add_lineup(data, lineup)
+
+
+def store_sensitivity(store, data: dict, sensitivity: float) -> int:
+    """Set *sensitivity*, recompute every lineup's values and save both.
+
+    The setting and the values are saved together, so storage never holds
+    a sensitivity its values were not computed for. If saving fails, the
+    in-memory data is put back to the previous sensitivity. Returns the
+    number of lineups whose values changed.
+    """
+    settings = data.setdefault("settings", {})
+    previous = settings.get("sensitivity", 1.0)
+    lineups = data.get("lineups", [])
+    settings["sensitivity"] = sensitivity
+    try:
+        changed = recompute_values(lineups, sensitivity)
+        store.save_data(data)
+    except BaseException:
+        settings["sensitivity"] = previous
+        recompute_values(lineups, previous)
+        raise
+    return changed
 
 
 class Application(tk.Tk):
@@ -52,37 +97,78 @@ class Application(tk.Tk):
         self.geometry("900x650")
         self.resizable(True, True)
 
-        # Storage
-        self.storage_dir = storage_dir or os.path.join(
-            os.path.expanduser("~"), ".csafap"
-        )
-        self.data = load_data(self.storage_dir)
+        # Storage, opened in the background; the Add form works meanwhile
+        self.storage_dir = storage_dir or default_storage_dir()
+        self.store = None
+        # Why the last library load failed, until a retry succeeds
+        self._load_error = None
+        self.data = default_data()
+
+        # Slot occupancy, built lazily for the current CS2 path
+        self._slot_index = None
+        self._slot_index_dir = None
+
+        # Throw positions per map, built on the first nearby search
+        self._spatial = None
+        # Duplicate throw buckets, built on the first save
+        self._dedupe = None
+
+        # Output files changed since the last "Generate Configs"
+        self._dirty = DirtyTracker()
+        self._generated_targets = None
+
+        # File I/O runs here so the main loop stays responsive
+        self.jobs = JobRunner()
 
         # Auto slot mode
         self.auto_slot = tk.BooleanVar(value=True)
 
+        # Settings, filled in once storage is loaded
+        self.cs2_path_var = tk.StringVar()
+        self.extra_paths_var = tk.StringVar()
+        self.sensitivity_var = tk.DoubleVar(value=1.0)
+        self.backend_var = tk.StringVar()
+        self.layout_var = tk.StringVar(value="single")
+
+        # Widgets of the tabs that have not been opened yet
+        self._rows = None
+        self.diagnostics_tree = None
+
         self._build_ui()
-        self._refresh_lineup_list()
+        self._load_library()
 
     # ------------------------------------------------------------------
     # UI Construction
     # ------------------------------------------------------------------
 
     def _build_ui(self):
-        notebook = ttk.Notebook(self)
+        notebook = self.notebook = ttk.Notebook(self)
         notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         self.add_frame = ttk.Frame(notebook)
         self.list_frame = ttk.Frame(notebook)
         self.settings_frame = ttk.Frame(notebook)
+        self.diagnostics_frame = ttk.Frame(notebook)
 
         notebook.add(self.add_frame, text="Add New Lineup")
         notebook.add(self.list_frame, text="Saved Lineups")
         notebook.add(self.settings_frame, text="Settings")
+        notebook.add(self.diagnostics_frame, text="Diagnostics")
 
+        # Only the Add form is built up front; other tabs on first select
         self._build_add_form()
-        self._build_lineup_list()
-        self._build_settings()
+        self._build_status_bar()
+        self._tab_builders = {
+            str(self.list_frame): self._build_lineup_list,
+            str(self.settings_frame): self._build_settings,
+            str(self.diagnostics_frame): self._build_diagnostics,
+        }
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _on_tab_changed(self, _event=None):
+        builder = self._tab_builders.pop(self.notebook.select(), None)
+        if builder is not None:
+            builder()
 
     # --- Add New Lineup form ---
 
@@ -155,10 +241,15 @@ class Application(tk.Tk):
             width=5,
         ).pack(side=tk.LEFT, padx=2)
 
-        # Occupied slots display
-        ttk.Button(f, text="Show Occupied Slots", command=self._show_occupied).grid(
-            row=7, column=0, columnspan=2, sticky="w", padx=5, pady=2
-        )
+        # Occupied slots display and nearby search
+        lookup_frame = ttk.Frame(f)
+        lookup_frame.grid(row=7, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+        ttk.Button(
+            lookup_frame, text="Show Occupied Slots", command=self._show_occupied
+        ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(
+            lookup_frame, text="Find Nearby Lineups", command=self._find_nearby
+        ).pack(side=tk.LEFT, padx=2)
         self.occupied_label = ttk.Label(f, text="")
         self.occupied_label.grid(
             row=8, column=0, columnspan=2, sticky="w", padx=5, pady=2
@@ -173,12 +264,50 @@ class Application(tk.Tk):
 
     def _build_lineup_list(self):
         f = self.list_frame
+
+        filter_frame = ttk.Frame(f)
+        filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.filter_map_var = tk.StringVar(value=_ALL)
+        self.filter_side_var = tk.StringVar(value=_ALL)
+        self.filter_grenade_var = tk.StringVar(value=_ALL)
+        self.filter_text_var = tk.StringVar()
+        for label, var, values, width in (
+            ("Map:", self.filter_map_var, MAPS, 12),
+            ("Side:", self.filter_side_var, SIDES, 5),
+            ("Grenade:", self.filter_grenade_var, GRENADES, 10),
+        ):
+            ttk.Label(filter_frame, text=label).pack(side=tk.LEFT, padx=2)
+            ttk.Combobox(
+                filter_frame,
+                textvariable=var,
+                values=(_ALL, *values),
+                state="readonly",
+                width=width,
+            ).pack(side=tk.LEFT, padx=2)
+        ttk.Label(filter_frame, text="Name:").pack(side=tk.LEFT, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.filter_text_var, width=25).pack(
+            side=tk.LEFT, padx=2
+        )
+        self._filter_job = None
+        for var in (
+            self.filter_map_var,
+            self.filter_side_var,
+            self.filter_grenade_var,
+            self.filter_text_var,
+        ):
+            var.trace_add("write", self._schedule_filter)
+
         cols = ("ID", "Map", "Side", "Grenade", "Name", "Slot")
-        self.tree = ttk.Treeview(f, columns=cols, show="headings", height=15)
+        self.tree = ttk.Treeview(
+            f, columns=cols, show="headings", height=15, selectmode="extended"
+        )
         for c in cols:
             self.tree.heading(c, text=c)
             self.tree.column(c, width=100)
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Rows are diffed by unique_id and inserted a page per tick
+        self._rows = RowSync()
+        self._row_pages = PagedApplier(self.tree, lambda step: self.after(1, step))
 
         btn_frame = ttk.Frame(f)
         btn_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -188,9 +317,16 @@ class Application(tk.Tk):
         ttk.Button(btn_frame, text="Delete Selected", command=self._delete_lineup).pack(
             side=tk.LEFT, padx=5
         )
+        ttk.Button(btn_frame, text="Compact Slots", command=self._compact_slots).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Button(btn_frame, text="Import…", command=self._import_lineups).pack(
+            side=tk.LEFT, padx=5
+        )
         ttk.Button(btn_frame, text="Refresh", command=self._refresh_lineup_list).pack(
             side=tk.LEFT, padx=5
         )
+        self._refresh_lineup_list()
 
     # --- Settings ---
 
@@ -199,9 +335,6 @@ class Application(tk.Tk):
         ttk.Label(f, text="CS2 Installation Path:").grid(
             row=0, column=0, sticky="w", padx=5, pady=5
         )
-        self.cs2_path_var = tk.StringVar(
-            value=self.data.get("settings", {}).get("cs2_path", "")
-        )
         ttk.Entry(f, textvariable=self.cs2_path_var, width=50).grid(
             row=0, column=1, sticky="w", padx=5, pady=5
         )
@@ -209,55 +342,409 @@ class Application(tk.Tk):
             row=0, column=2, padx=5, pady=5
         )
 
-        ttk.Label(f, text="Sensitivity:").grid(
+        ttk.Label(f, text="Additional CS2 Installs:").grid(
             row=1, column=0, sticky="w", padx=5, pady=5
         )
-        self.sensitivity_var = tk.DoubleVar(
-            value=self.data.get("settings", {}).get("sensitivity", 1.0)
+        ttk.Entry(f, textvariable=self.extra_paths_var, width=50).grid(
+            row=1, column=1, sticky="w", padx=5, pady=5
+        )
+        ttk.Button(f, text="Add…", command=self._browse_extra_path).grid(
+            row=1, column=2, padx=5, pady=5
+        )
+
+        ttk.Label(f, text="Sensitivity:").grid(
+            row=2, column=0, sticky="w", padx=5, pady=5
         )
         ttk.Entry(f, textvariable=self.sensitivity_var, width=10).grid(
-            row=1, column=1, sticky="w", padx=5, pady=5
+            row=2, column=1, sticky="w", padx=5, pady=5
+        )
+
+        ttk.Label(f, text="Storage Backend:").grid(
+            row=3, column=0, sticky="w", padx=5, pady=5
+        )
+        ttk.Combobox(
+            f,
+            textvariable=self.backend_var,
+            values=BACKENDS,
+            state="readonly",
+            width=10,
+        ).grid(row=3, column=1, sticky="w", padx=5, pady=5)
+
+        ttk.Label(f, text="Alias Layout:").grid(
+            row=4, column=0, sticky="w", padx=5, pady=5
         )
+        ttk.Combobox(
+            f,
+            textvariable=self.layout_var,
+            values=ALIAS_LAYOUTS,
+            state="readonly",
+            width=10,
+        ).grid(row=4, column=1, sticky="w", padx=5, pady=5)
 
         ttk.Button(f, text="Save Settings", command=self._save_settings).grid(
-            row=2, column=0, columnspan=3, pady=10
+            row=5, column=0, columnspan=3, pady=10
         )
 
+    # --- Diagnostics ---
+
+    def _build_diagnostics(self):
+        f = self.diagnostics_frame
+        top = ttk.Frame(f)
+        top.pack(fill=tk.X, padx=5, pady=5)
+        self.trace_var = tk.BooleanVar(value=diagnostics.enabled)
+        ttk.Checkbutton(
+            top, text="Record timings and I/O counters",
+            variable=self.trace_var, command=self._toggle_tracing,
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top, text="Save Trace…", command=self._save_trace).pack(
+            side=tk.RIGHT, padx=5
+        )
+        self.diagnostics_label = ttk.Label(f, text="No operation recorded yet.")
+        self.diagnostics_label.pack(fill=tk.X, padx=10)
+
+        cols = ("Item", "Calls", "Value")
+        self.diagnostics_tree = ttk.Treeview(f, columns=cols, show="headings", height=15)
+        for c in cols:
+            self.diagnostics_tree.heading(c, text=c)
+        self.diagnostics_tree.column("Item", width=300)
+        self.diagnostics_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self._show_diagnostics()
+
+    def _toggle_tracing(self):
+        diagnostics.enable(self.trace_var.get())
+
+    def _show_diagnostics(self):
+        """Show the span and counter breakdown of the last operation."""
+        op = diagnostics.last_operation()
+        if op is None or self.diagnostics_tree is None:
+            return
+        self.diagnostics_label.config(
+            text=f"Last operation: {op.name} ({op.wall_ms:.1f} ms wall time)"
+        )
+        tree = self.diagnostics_tree
+        tree.delete(*tree.get_children())
+        for name, (calls, total) in sorted(
+            op.spans.items(), key=lambda item: -item[1][1]
+        ):
+            tree.insert("", tk.END, values=(name, calls, f"{total:.1f} ms"))
+        for name, value in sorted(op.counters.items()):
+            tree.insert("", tk.END, values=(name, "", value))
+
+    def _save_trace(self):
+        path = filedialog.asksaveasfilename(
+            title="Save Trace", defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            n = diagnostics.dump_trace(path)
+        except OSError as exc:
+            messagebox.showerror("File Error", str(exc))
+            return
+        messagebox.showinfo("Save Trace", f"{n} operation(s) written.")
+
+    # --- Status bar ---
+
+    def _build_status_bar(self):
+        f = ttk.Frame(self)
+        f.pack(fill=tk.X, padx=5, pady=(0, 5))
+        self.status_var = tk.StringVar(value="Ready")
+        ttk.Label(f, textvariable=self.status_var).pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(
+            f, text="Cancel", command=self.jobs.cancel, state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.progress = ttk.Progressbar(f, length=200, mode="determinate")
+        self.progress.pack(side=tk.RIGHT, padx=5)
+
+    # ------------------------------------------------------------------
+    # Background jobs
+    # ------------------------------------------------------------------
+
+    def _run_job(self, name: str, fn, on_done, on_error=None) -> bool:
+        """Run ``fn(context)`` on the worker thread.
+
+        *on_done(result)* runs on the main loop once the job finishes. If
+        *on_error(exc)* is given it replaces the error dialog, and is also
+        called with a ``JobCancelled`` when the job is cancelled.
+        Returns ``False`` if another job is still running.
+        """
+        if self.jobs.busy:
+            messagebox.showwarning(
+                "Busy", f"Please wait until '{self.jobs.current}' has finished."
+            )
+            return False
+
+        def traced(ctx):
+            with diagnostics.span(name):
+                return fn(ctx)
+
+        def done(result):
+            self._job_idle("Ready")
+            on_done(result)
+
+        def failed(exc):
+            self._job_idle(f"{name} failed")
+            if on_error is not None:
+                on_error(exc)
+            else:
+                messagebox.showerror("File Error", str(exc))
+
+        def cancelled():
+            self._job_idle(f"{name} cancelled")
+            if on_error is not None:
+                on_error(JobCancelled(f"{name} was cancelled."))
+
+        self.jobs.submit(
+            name, traced,
+            on_done=done, on_error=failed, on_cancel=cancelled,
+            on_progress=self._job_progress,
+        )
+        self.status_var.set(f"{name}…")
+        self.progress.config(value=0, maximum=1)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.after(_POLL_INTERVAL, self._poll_jobs)
+        return True
+
+    def _poll_jobs(self):
+        self.jobs.poll()
+        if self.jobs.busy:
+            self.after(_POLL_INTERVAL, self._poll_jobs)
+
+    def _job_progress(self, done: int, total: int, message: str):
+        self.progress.config(value=done, maximum=max(total, 1))
+        if message:
+            self.status_var.set(message)
+
+    def _job_idle(self, status: str):
+        if diagnostics.enabled:
+            self._show_diagnostics()
+        self.status_var.set(status)
+        self.progress.config(value=0)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    # ------------------------------------------------------------------
+    # Storage loading
+    # ------------------------------------------------------------------
+
+    def _load_library(self):
+        """Open storage and load every lineup on the worker thread."""
+        storage_dir = self.storage_dir
+        self._load_error = None
+
+        def job(ctx):
+            ctx.report(0, 1, "Loading lineups")
+            store = open_store(storage_dir)
+            data = store.load_data()
+            store.build_index(data)
+            return store, data
+
+        def done(result):
+            self.store, self.data = result
+            settings = self.data.get("settings", {})
+            self.cs2_path_var.set(settings.get("cs2_path", ""))
+            self.extra_paths_var.set(
+                os.pathsep.join(settings.get("extra_cs2_paths", []))
+            )
+            self.sensitivity_var.set(settings.get("sensitivity", 1.0))
+            self.backend_var.set(self.store.backend)
+            self.layout_var.set(self._layout())
+            # Indexes built from the empty placeholder library are stale
+            self._slot_index = None
+            self._spatial = None
+            self._dedupe = None
+            self._refresh_lineup_list()
+
+        def failed(exc):
+            self._load_error = exc
+            self._offer_reload()
+
+        self._run_job("Load library", job, done, failed)
+
+    def _offer_reload(self):
+        """Report why loading failed and load again if the user asks to."""
+        if messagebox.askretrycancel(
+            "Load Error", f"Could not load saved lineups:\n{self._load_error}"
+        ):
+            self._load_library()
+
+    def _loaded(self) -> bool:
+        """Return ``True`` once storage is loaded, else say why it is not."""
+        if self.store is not None:
+            return True
+        if self._load_error is not None:
+            self._offer_reload()
+        else:
+            messagebox.showinfo(
+                "Loading", "Saved lineups are still loading; try again shortly."
+            )
+        return False
+
     # ------------------------------------------------------------------
     # Actions
     # ------------------------------------------------------------------
 
     def _cs2_cfg_dir(self) -> str:
         """Return the CSAFAP cfg directory inside the CS2 installation."""
-        return os.path.join(self.cs2_path_var.get(), "csgo", "cfg", "CSAFAP")
+        return cs2_cfg_dir(self.cs2_path_var.get())
 
     def _cs2_resource_dir(self) -> str:
         """Return the resource directory inside the CS2 installation."""
-        return os.path.join(self.cs2_path_var.get(), "csgo", "resource")
+        return cs2_resource_dir(self.cs2_path_var.get())
+
+    def _extra_paths(self) -> list:
+        """Return the additional CS2 installs typed in Settings."""
+        return [
+            p.strip() for p in self.extra_paths_var.get().split(os.pathsep) if p.strip()
+        ]
+
+    def _output_targets(self) -> list:
+        """Return ``(cfg_dir, resource_dir)`` for every configured install."""
+        return output_targets(cs2_paths({
+            "cs2_path": self.cs2_path_var.get(),
+            "extra_cs2_paths": self._extra_paths(),
+        }))
+
+    def _layout(self) -> str:
+        """Return the stored alias layout (``single`` or ``sharded``)."""
+        return self.data.get("settings", {}).get("alias_layout", "single")
 
     def _browse_cs2_path(self):
         path = filedialog.askdirectory(title="Select CS2 Installation Folder")
         if path:
             self.cs2_path_var.set(path)
 
+    def _browse_extra_path(self):
+        path = filedialog.askdirectory(title="Select Another CS2 Installation Folder")
+        if path:
+            self.extra_paths_var.set(os.pathsep.join(self._extra_paths() + [path]))
+
     def _save_settings(self):
-        self.data.setdefault("settings", {})["cs2_path"] = self.cs2_path_var.get()
-        self.data["settings"]["sensitivity"] = self.sensitivity_var.get()
-        save_data(self.storage_dir, self.data)
-        messagebox.showinfo("Settings", "Settings saved successfully.")
+        if not self._loaded():
+            return
+        if self.jobs.busy:
+            messagebox.showwarning(
+                "Busy", f"Please wait until '{self.jobs.current}' has finished."
+            )
+            return
+        try:
+            sensitivity = self.sensitivity_var.get()
+        except tk.TclError:
+            sensitivity = 0
+        if sensitivity <= 0:
+            messagebox.showerror("Error", "Sensitivity must be a positive number.")
+            return
+        settings = self.data.setdefault("settings", {})
+        sensitivity_changed = sensitivity != settings.get("sensitivity", 1.0)
+        settings["cs2_path"] = self.cs2_path_var.get()
+        settings["extra_cs2_paths"] = self._extra_paths()
+        # A new sensitivity is stored by the job, with the values it implies
+        layout_changed = self.layout_var.get() != self._layout()
+        if layout_changed:
+            self.data["settings"]["alias_layout"] = self.layout_var.get()
+            self._dirty.mark_all()
+        backend = self.backend_var.get()
+        if backend != self.store.backend:
+            self.store.close()
+            self.store = switch_backend(self.storage_dir, self.data, backend)
+            self.store.build_index(self.data)
+        else:
+            self.store.save_settings(self.data)
+        message = "Settings saved successfully."
+        if layout_changed:
+            message += "\nClick Generate Configs to apply the new alias layout."
+        messagebox.showinfo("Settings", message)
+        if sensitivity_changed:
+            self._apply_sensitivity(sensitivity, layout_changed)
 
-    def _show_occupied(self):
+    def _sensitivity(self) -> float:
+        return self.data.get("settings", {}).get("sensitivity", 1.0)
+
+    def _apply_sensitivity(self, sensitivity: float, layout_changed: bool = False):
+        """Recompute every stored yaw/pitch value and rewrite only the aliases.
+
+        After a layout switch the commands cfgs are rewritten too, so they
+        exec (or stop exec'ing) the alias shards the new aliases live in.
+        """
+        lineups = self.data.get("lineups", [])
+        targets = self._output_targets()
+        layout = self._layout()
+
+        def job(ctx):
+            # Not cancellable: storage and main.cfg must stay in step
+            changed = store_sensitivity(self.store, self.data, sensitivity)
+            results = []
+            if changed and targets:
+                aliases = DirtyTracker()
+                aliases.clear()
+                aliases.mark_aliases(lineups)
+                if layout_changed:
+                    aliases.mark_layout(lineups)
+                results = generate_configs_to_targets(
+                    targets, self.data, self.storage_dir, aliases, layout=layout,
+                )
+            return changed, results
+
+        def done(result):
+            changed, results = result
+            self._report_targets(
+                "Sensitivity", f"Recomputed {changed} lineup(s)", results
+            )
+
+        def failed(exc):
+            self.sensitivity_var.set(self._sensitivity())
+            messagebox.showerror("File Error", str(exc))
+
+        self._run_job("Apply sensitivity", job, done, failed)
+
+    def _slots(self) -> SlotIndex:
+        """Return the slot index for the current CS2 path, building it once."""
         cfg_dir = self._cs2_cfg_dir()
+        if self._slot_index is None or self._slot_index_dir != cfg_dir:
+            index = SlotIndex.from_lineups(self.data.get("lineups", []))
+            index.merge_cfg_dir(cfg_dir)
+            self._slot_index = index
+            self._slot_index_dir = cfg_dir
+        return self._slot_index
+
+    def _show_occupied(self):
+        if not self._loaded():
+            return
         map_name = self.map_var.get()
         side = self.side_var.get()
-        occupied = get_occupied_slots(cfg_dir, map_name, side)
+        occupied = self._slots().occupied(map_name, side)
         if occupied:
             text = ", ".join(f"tab={t} text={x}" for t, x in sorted(occupied))
         else:
             text = "No occupied slots."
         self.occupied_label.config(text=text)
 
+    def _find_nearby(self):
+        """Show the saved lineups thrown closest to the pasted getpos."""
+        if not self._loaded():
+            return
+        try:
+            pos = parse_getpos(self.getpos_text.get("1.0", tk.END))["setpos"]
+        except ValueError as exc:
+            messagebox.showerror("Error", str(exc))
+            return
+        if self._spatial is None:
+            self._spatial = SpatialIndex.from_lineups(self.data.get("lineups", []))
+        found = self._spatial.nearest(self.map_var.get(), pos, k=5)
+        if found:
+            text = "\n".join(
+                f"{distance:.0f} units: {lu['unique_id']} {lu['side']} "
+                f"{lu['grenade']} - {lu['name']}"
+                for distance, lu in found
+            )
+        else:
+            text = "No saved lineups on this map."
+        messagebox.showinfo("Nearby Lineups", text)
+
     def _save_lineup(self):
+        if not self._loaded():
+            return
         # Validate CS2 path
         cs2_path = self.cs2_path_var.get()
         if not cs2_path:
@@ -287,8 +774,9 @@ class Application(tk.Tk):
         cfg_dir = self._cs2_cfg_dir()
 
         # Determine slot
+        slots = self._slots()
         if self.auto_slot.get():
-            slot = find_first_empty_slot(cfg_dir, map_name, side)
+            slot = slots.first_free(map_name, side)
             if slot is None:
                 messagebox.showerror("Error", "All slots are occupied for this map/side.")
                 return
@@ -296,8 +784,12 @@ class Application(tk.Tk):
         else:
             tab = self.tab_var.get()
             text = self.text_var.get()
-            occupied = get_occupied_slots(cfg_dir, map_name, side)
-            if (tab, text) in occupied:
+            try:
+                occupied = slots.is_occupied(map_name, side, tab, text)
+            except ValueError as exc:
+                messagebox.showerror("Error", str(exc))
+                return
+            if occupied:
                 overwrite = messagebox.askyesno(
                     "Slot Occupied",
                     f"Slot tab={tab} text={text} is already occupied. Overwrite?",
@@ -305,138 +797,261 @@ class Application(tk.Tk):
                 if not overwrite:
                     return
 
-        # Calculate values
-        yaw_angle, pitch_angle = extract_yaw_pitch(parsed["setang"])
-        yaw_value = calculate_value(yaw_angle)
-        pitch_value = calculate_value(pitch_angle)
-
-        # Generate unique ID
-        existing_ids = get_existing_ids(self.data)
+        # Generate unique ID and calculate values
+        existing_ids = self.store.get_existing_ids(self.data)
         unique_id = generate_unique_id(existing_ids)
+        lineup_entry = make_lineup(
+            unique_id, side, map_name, grenade, lineup_name, raw_getpos,
+            tab, text, parsed, self._sensitivity(),
+        )
 
-        # Build names
-        message_name = build_message_name(map_name, grenade, unique_id)
-        formatted_name = format_lineup_name(lineup_name)
+        if self._dedupe is None:
+            self._dedupe = DedupeIndex.from_lineups(
+                self.data.get("lineups", []), *tolerances(self.data.get("settings", {}))
+            )
+        duplicates = self._dedupe.find(lineup_entry)
+        if duplicates:
+            dup = duplicates[0]
+            if not messagebox.askyesno(
+                "Possible Duplicate",
+                f"This throw matches lineup {dup['unique_id']} ({dup['name']}).\n"
+                "Save it anyway?",
+            ):
+                return
 
-        # Write config files
         resource_dir = self._cs2_resource_dir()
-        try:
-            append_main_cfg(cfg_dir, grenade, unique_id, yaw_value, pitch_value)
-            append_platform_english(resource_dir, message_name, formatted_name)
-            append_label(cfg_dir, map_name, side, tab, text, message_name)
-            append_command(cfg_dir, map_name, side, tab, text, grenade, unique_id)
-        except OSError as exc:
-            messagebox.showerror("File Error", str(exc))
-            return
+        layout = self._layout()
 
-        # Save to storage
-        lineup_entry = {
-            "unique_id": unique_id,
-            "side": side,
-            "map": map_name,
-            "grenade": grenade,
-            "name": lineup_name,
-            "raw_getpos": raw_getpos,
-            "yaw_value": yaw_value,
-            "pitch_value": pitch_value,
-            "message_name": message_name,
-            "tab": tab,
-            "text": text,
-        }
-        self.data = add_lineup(self.data, lineup_entry)
-        save_data(self.storage_dir, self.data)
+        def job(ctx):
+            return save_lineup_job(
+                ctx, self.store, self.data, cfg_dir, resource_dir, lineup_entry, layout
+            )
 
-        messagebox.showinfo(
-            "Success",
-            f"Lineup saved!\nID: {unique_id}\nSlot: tab={tab} text={text}",
-        )
-        self._clear_add_form()
-        self._refresh_lineup_list()
+        def done(data):
+            self.data = data
+            slots.add(map_name, side, tab, text)
+            if self._spatial is not None:
+                self._spatial.add(lineup_entry)
+            self._dedupe.add(lineup_entry)
+            self._dirty.mark_lineup(lineup_entry)
+            messagebox.showinfo(
+                "Success",
+                f"Lineup saved!\nID: {unique_id}\nSlot: tab={tab} text={text}",
+            )
+            self._clear_add_form()
+            self._refresh_lineup_list()
+
+        self._run_job("Save lineup", job, done)
 
     def _generate_configs(self):
         """Regenerate all config files from stored lineup data."""
+        if not self._loaded():
+            return
         cs2_path = self.cs2_path_var.get()
         if not cs2_path:
             messagebox.showerror("Error", "Please set the CS2 installation path in Settings.")
             return
 
-        cfg_dir = self._cs2_cfg_dir()
-        resource_dir = self._cs2_resource_dir()
+        targets = self._output_targets()
+        if targets != self._generated_targets:
+            self._dirty.mark_all()
+        layout = self._layout()
 
-        try:
-            for lu in self.data.get("lineups", []):
-                append_main_cfg(
-                    cfg_dir, lu["grenade"], lu["unique_id"],
-                    lu["yaw_value"], lu["pitch_value"],
-                )
-                append_platform_english(
-                    resource_dir, lu["message_name"],
-                    format_lineup_name(lu["name"]),
-                )
-                append_label(
-                    cfg_dir, lu["map"], lu["side"],
-                    lu["tab"], lu["text"], lu["message_name"],
-                )
-                append_command(
-                    cfg_dir, lu["map"], lu["side"],
-                    lu["tab"], lu["text"], lu["grenade"], lu["unique_id"],
-                )
-        except OSError as exc:
-            messagebox.showerror("File Error", str(exc))
-            return
+        def job(ctx):
+            return generate_configs_to_targets(
+                targets, self.data, self.storage_dir, self._dirty,
+                progress=ctx.report, layout=layout,
+            )
 
-        messagebox.showinfo("Success", "Config files generated successfully!")
+        def done(results):
+            self._generated_targets = targets
+            self._slot_index = None
+            self._report_targets(
+                "Generate Configs", "Config files generated", results
+            )
+
+        self._run_job("Generate configs", job, done)
+
+    def _report_targets(self, title: str, summary: str, results: list):
+        """Show files written per install, and the installs that failed."""
+        written = sum(len(r.written) for r in results)
+        failed = [r for r in results if r.error is not None]
+        message = f"{summary}; {written} file(s) updated."
+        if len(results) > 1:
+            updated = len(results) - len(failed)
+            message += f"\n{updated} of {len(results)} install(s) updated."
+        if failed:
+            message += "\n\nFailed:\n" + "\n".join(
+                f"{r.cfg_dir}: {r.error}" for r in failed
+            )
+            messagebox.showerror(title, message)
+        else:
+            messagebox.showinfo(title, message)
 
     def _delete_lineup(self):
+        if not self._loaded():
+            return
         selected = self.tree.selection()
         if not selected:
             messagebox.showwarning("Warning", "Please select a lineup to delete.")
             return
-        item = self.tree.item(selected[0])
-        unique_id = item["values"][0]
-        lineup = find_lineup(self.data, unique_id)
-        if lineup is None:
+        lineups = [self.store.find_lineup(self.data, iid) for iid in selected]
+        lineups = [lu for lu in lineups if lu is not None]
+        if not lineups:
             messagebox.showerror("Error", "Lineup not found.")
             return
 
-        if not messagebox.askyesno("Confirm", f"Delete lineup {unique_id}?"):
+        if len(lineups) == 1:
+            prompt = f"Delete lineup {lineups[0]['unique_id']}?"
+        else:
+            prompt = f"Delete {len(lineups)} lineups?"
+        if not messagebox.askyesno("Confirm", prompt):
             return
 
         cfg_dir = self._cs2_cfg_dir()
         resource_dir = self._cs2_resource_dir()
+        layout = self._layout()
+        unique_ids = {lu["unique_id"] for lu in lineups}
 
-        # Remove from config files
-        remove_from_main_cfg(cfg_dir, unique_id)
-        remove_from_platform_english(resource_dir, lineup["message_name"])
-        remove_slot_from_labels(
-            cfg_dir, lineup["map"], lineup["side"], lineup["tab"], lineup["text"]
-        )
-        remove_slot_from_commands(
-            cfg_dir, lineup["map"], lineup["side"], lineup["tab"], lineup["text"]
+        def job(ctx):
+            ctx.report(0, 2, "Removing from config files")
+            # One rewrite per affected file; not cancellable past this point
+            remove_lineups_files(cfg_dir, resource_dir, lineups, layout)
+            return self.store.remove_lineups(self.data, unique_ids)
+
+        def done(data):
+            self.data = data
+            slots = self._slots()
+            for lu in lineups:
+                slots.remove(lu["map"], lu["side"], lu["tab"], lu["text"])
+                if self._spatial is not None:
+                    self._spatial.remove(lu["unique_id"])
+                if self._dedupe is not None:
+                    self._dedupe.remove(lu["unique_id"])
+                self._dirty.mark_lineup(lu)
+            self._refresh_lineup_list()
+            if len(lineups) == 1:
+                messagebox.showinfo(
+                    "Deleted", f"Lineup {lineups[0]['unique_id']} deleted."
+                )
+            else:
+                messagebox.showinfo("Deleted", f"{len(lineups)} lineups deleted.")
+
+        self._run_job("Delete lineups", job, done)
+
+    def _compact_slots(self):
+        """Repack every map/side wheel so the used slots have no holes."""
+        if not self._loaded():
+            return
+        if not self.cs2_path_var.get():
+            messagebox.showerror("Error", "Please set the CS2 installation path in Settings.")
+            return
+        cfg_dir = self._cs2_cfg_dir()
+        layout = self._layout()
+        pairs = [(m, s) for m in MAPS for s in SIDES]
+
+        def job(ctx):
+            # Not cancellable: files and storage must move together
+            moved = {}
+            for map_name, side in pairs:
+                moves = compact_wheel(
+                    cfg_dir, self.data.get("lineups", []), map_name, side, layout
+                )
+                if moves:
+                    moved[map_name, side] = len(moves)
+            if moved:
+                self.store.save_data(self.data)
+            return moved
+
+        def done(result):
+            # Only the main install was repacked; the others follow on Generate
+            for map_name, side in result:
+                self._dirty.mark_files((
+                    labels_filename(map_name, side),
+                    commands_filename(map_name, side),
+                ))
+            moved = sum(result.values())
+            self._slot_index = None
+            self._refresh_lineup_list()
+            messagebox.showinfo("Compact Slots", f"{moved} slot(s) moved.")
+
+        self._run_job("Compact slots", job, done)
+
+    def _import_lineups(self):
+        """Add every lineup from a CSV/JSON file in one transaction."""
+        if not self._loaded():
+            return
+        if not self.cs2_path_var.get():
+            messagebox.showerror("Error", "Please set the CS2 installation path in Settings.")
+            return
+        path = filedialog.askopenfilename(
+            title="Import Lineups",
+            filetypes=[("Lineup files", "*.csv *.json"), ("All files", "*.*")],
         )
+        if not path:
+            return
+        cfg_dir = self._cs2_cfg_dir()
+        resource_dir = self._cs2_resource_dir()
+        layout = self._layout()
+        slots = self._slots()
+        sensitivity = self._sensitivity()
+        tols = tolerances(self.data.get("settings", {}))
+        duplicates = []
 
-        self.data = remove_lineup(self.data, unique_id)
-        save_data(self.storage_dir, self.data)
-        self._refresh_lineup_list()
-        messagebox.showinfo("Deleted", f"Lineup {unique_id} deleted.")
+        def job(ctx):
+            ctx.report(0, 3, "Validating")
+            rows = read_rows(path)
+            # A cancel while writing rolls the whole batch back
+            return bulk_add(
+                self.store, self.data, rows, cfg_dir, resource_dir, slots,
+                self.storage_dir, sensitivity, layout, tols, progress=ctx.report,
+                skipped=duplicates,
+            )
+
+        def done(lineups):
+            for lu in lineups:
+                # Written to the main install only; the others follow on Generate
+                self._dirty.mark_lineup(lu)
+                if self._spatial is not None:
+                    self._spatial.add(lu)
+                if self._dedupe is not None:
+                    self._dedupe.add(lu)
+            self._refresh_lineup_list()
+            message = f"{len(lineups)} lineup(s) imported."
+            if duplicates:
+                message += f"\n\nSkipped {len(duplicates)} duplicate row(s):\n"
+                message += "\n".join(duplicates[:10])
+                if len(duplicates) > 10:
+                    message += f"\n... and {len(duplicates) - 10} more"
+            messagebox.showinfo("Import", message)
+
+        self._run_job("Import lineups", job, done)
 
     def _clear_add_form(self):
         self.name_entry.delete(0, tk.END)
         self.getpos_text.delete("1.0", tk.END)
 
+    def _schedule_filter(self, *_args):
+        """Refresh the list once typing in the filter bar pauses."""
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(_FILTER_DELAY, self._refresh_lineup_list)
+
+    def _filtered_lineups(self) -> list:
+        def selected(var):
+            value = var.get()
+            return None if value == _ALL else value
+
+        return self.store.index.search(
+            selected(self.filter_map_var),
+            selected(self.filter_side_var),
+            selected(self.filter_grenade_var),
+            self.filter_text_var.get(),
+        )
+
     def _refresh_lineup_list(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for lu in self.data.get("lineups", []):
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
-                    lu["unique_id"],
-                    lu["map"],
-                    lu["side"],
-                    lu["grenade"],
-                    lu["name"],
-                    f"tab={lu['tab']} text={lu['text']}",
-                ),
-            )
+        """Update only the rows that changed since the last refresh."""
+        if self._rows is None or self.store is None:
+            return  # tab not opened yet, or still loading
+        self._filter_job = None
+        self._row_pages.extend(self._rows.plan(self._filtered_lineups()))
@@ -0,0 +1,128 @@
+"""Incremental row updates for the Saved Lineups list.
+
+``RowSync`` remembers which rows a ``ttk.Treeview`` shows, keyed by
+``unique_id``, and turns a new lineup list into the minimal set of
+delete/update/move/insert operations. The GUI applies those operations a
+page at a time with ``after()`` so large libraries load without blocking
+the main loop.
+"""
+
+from collections import deque
+
+# Rows inserted/updated per main-loop tick when applying operations.
+PAGE_SIZE = 500
+
+
+def row_values(lineup: dict) -> tuple:
+    """Return the Treeview column values for *lineup*."""
+    return (
+        lineup["unique_id"],
+        lineup["map"],
+        lineup["side"],
+        lineup["grenade"],
+        lineup["name"],
+        f"tab={lineup['tab']} text={lineup['text']}",
+    )
+
+
+class RowSync:
+    """Track the rows shown in a list widget and diff against new data.
+
+    Operations are tuples:
+
+    - ``("delete", [iid, ...])``
+    - ``("update", iid, values)``
+    - ``("move", iid, index)``
+    - ``("insert", index, iid, values)``
+
+    Applied in order, they turn the previously planned state into the new
+    one. Indices refer to the list as it is after the earlier operations.
+    """
+
+    def __init__(self):
+        self.shown: dict = {}
+
+    def plan(self, lineups) -> list:
+        """Return the operations that show *lineups*, and remember them."""
+        target = {}
+        for lu in lineups:
+            target[lu["unique_id"]] = row_values(lu)
+
+        ops = []
+        removed = [iid for iid in self.shown if iid not in target]
+        for start in range(0, len(removed), PAGE_SIZE):
+            ops.append(("delete", removed[start:start + PAGE_SIZE]))
+
+        survivors = [iid for iid in self.shown if iid in target]
+        moved = set()
+        j = 0
+        for index, (iid, values) in enumerate(target.items()):
+            while j < len(survivors) and survivors[j] in moved:
+                j += 1
+            if iid not in self.shown:
+                ops.append(("insert", index, iid, values))
+                continue
+            if j < len(survivors) and survivors[j] == iid:
+                j += 1
+            else:
+                moved.add(iid)
+                ops.append(("move", iid, index))
+            if self.shown[iid] != values:
+                ops.append(("update", iid, values))
+
+        self.shown = target
+        return ops
+
+    def reset(self) -> None:
+        """Forget the shown rows (e.g. after the widget was cleared)."""
+        self.shown = {}
+
+
+def apply_ops(tree, ops) -> None:
+    """Apply *ops* from ``RowSync.plan`` to a ``ttk.Treeview``."""
+    for op in ops:
+        kind = op[0]
+        if kind == "delete":
+            tree.delete(*op[1])
+        elif kind == "update":
+            tree.item(op[1], values=op[2])
+        elif kind == "move":
+            tree.move(op[1], "", op[2])
+        else:
+            tree.insert("", op[1], iid=op[2], values=op[3])
+
+
+class PagedApplier:
+    """Apply queued operations to a Treeview ``PAGE_SIZE`` at a time.
+
+    *schedule(callback)* arranges for *callback* to run on a later
+    main-loop tick (``lambda cb: widget.after(1, cb)`` in the GUI).
+    """
+
+    def __init__(self, tree, schedule, page_size: int = PAGE_SIZE):
+        self.tree = tree
+        self.schedule = schedule
+        self.page_size = page_size
+        self._pending: deque = deque()
+        self._scheduled = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def extend(self, ops) -> None:
+        """Queue *ops* and apply the first page right away."""
+        self._pending.extend(ops)
+        if not self._scheduled:
+            self._step()
+
+    def _step(self) -> None:
+        self._scheduled = False
+        page = [
+            self._pending.popleft()
+            for _ in range(min(self.page_size, len(self._pending)))
+        ]
+        apply_ops(self.tree, page)
+        if self._pending:
+            self._scheduled = True
+            self.schedule(self._step)
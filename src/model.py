@@ -0,0 +1,281 @@
+"""Compact in-memory lineup record.
+
+``Lineup`` keeps each stored field in a ``__slots__`` attribute instead of a
+per-lineup dict, and interns the ``map``/``side``/``grenade`` strings so a
+large library shares one copy of each. ``message_name`` and the
+``platform_english.txt`` name are derived on access rather than stored.
+
+A ``Lineup`` behaves like the lineup dicts used everywhere else
+(``lu["map"]``, ``lu.get("tab")``, ``"yaw_angle" in lu``); conversion to and
+from the storage dict format happens only when loading and saving.
+"""
+
+import sys
+from collections.abc import MutableMapping
+from operator import itemgetter
+
+from src.core import build_message_name, format_lineup_name
+
+# Storage keys held in slots, in the order they are written back
+FIELDS = (
+    "unique_id",
+    "side",
+    "map",
+    "grenade",
+    "name",
+    "raw_getpos",
+    "yaw_angle",
+    "pitch_angle",
+    "yaw_value",
+    "pitch_value",
+    "tab",
+    "text",
+)
+
+# Fields with a handful of distinct values, shared via sys.intern
+_INTERNED = frozenset(("side", "map", "grenade"))
+
+# ``_message_name`` marker: present and equal to the derived name
+_DERIVED = object()
+
+
+class Lineup(MutableMapping):
+    """One stored lineup.
+
+    Unset fields are missing, as in a dict. Keys outside ``FIELDS`` are kept
+    in a side dict so unknown data still round-trips. A stored
+    ``message_name`` equal to the derived one is not kept, only a marker; one
+    that differs (e.g. hand-edited) is kept as an override.
+    """
+
+    __slots__ = FIELDS + ("_message_name", "_extra")
+
+    def __init__(self, **fields):
+        message_name = fields.pop("message_name", None)
+        for key, value in fields.items():
+            self[key] = value
+        # Compared against the derived name, so set once the parts are in
+        if message_name is not None:
+            self["message_name"] = message_name
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "Lineup":
+        """Build a lineup from its storage dict.
+
+        This is the load path, so slots are assigned directly rather than
+        through ``__setitem__``, and a stored ``message_name`` is checked
+        against the derived one without building it.
+        """
+        lineup = cls.__new__(cls)
+        if entry.keys() == _STORED_KEYS:
+            try:
+                return cls._from_stored(lineup, entry)
+            except (TypeError, AttributeError):
+                pass  # e.g. a non-string map; the general path below copes
+        extra = None
+        message_name = None
+        for key, value in entry.items():
+            if key in _SLOT_FIELDS:
+                if key in _INTERNED and type(value) is str:
+                    value = _intern(value)
+                _setters[key](lineup, value)
+            elif key == "message_name":
+                message_name = value
+            else:
+                if extra is None:
+                    extra = lineup._extra = {}
+                extra[key] = value
+        if message_name is not None:
+            lineup._message_name = (
+                _DERIVED if _is_derived(lineup, message_name) else message_name
+            )
+        return lineup
+
+    @staticmethod
+    def _from_stored(lineup: "Lineup", entry: dict) -> "Lineup":
+        """Fill *lineup* from a complete storage dict.
+
+        All values are fetched in one ``itemgetter`` call, and the stored
+        ``message_name`` is compared with the shared per-(map, grenade)
+        prefix plus the ID.
+        """
+        (
+            unique_id, side, map_name, grenade, lineup.name, lineup.raw_getpos,
+            lineup.yaw_angle, lineup.pitch_angle, lineup.yaw_value,
+            lineup.pitch_value, lineup.tab, lineup.text, message_name,
+        ) = _stored_values(entry)
+        lineup.unique_id = unique_id
+        lineup.side = _intern(side)
+        lineup.map = map_name = _intern(map_name)
+        lineup.grenade = grenade = _intern(grenade)
+        prefix = _prefixes.get((map_name, grenade))
+        if prefix is None:
+            prefix = _prefixes[(map_name, grenade)] = build_message_name(
+                map_name, grenade, ""
+            )
+        lineup._message_name = (
+            _DERIVED if message_name == prefix + unique_id.upper() else message_name
+        )
+        return lineup
+
+    def to_dict(self) -> dict:
+        """Return the storage dict for this lineup."""
+        entry = {}
+        for key in _ORDER:
+            value = self.get(key, _DERIVED)
+            if value is not _DERIVED:
+                entry[key] = value
+        extra = getattr(self, "_extra", None)
+        if extra:
+            entry.update(extra)
+        return entry
+
+    # ------------------------------------------------------------------
+    # Derived fields
+    # ------------------------------------------------------------------
+
+    @property
+    def message_name(self):
+        """``CFG_{MAP}_{GRENADE}_{ID}``, or ``None`` if it was never set."""
+        stored = getattr(self, "_message_name", None)
+        if stored is not _DERIVED:
+            return stored
+        try:
+            return build_message_name(self.map, self.grenade, self.unique_id)
+        except AttributeError:
+            return None
+
+    @property
+    def formatted_name(self) -> str:
+        """The name as written to ``platform_english.txt``."""
+        return format_lineup_name(self.name)
+
+    # ------------------------------------------------------------------
+    # Mapping protocol
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        if key == "message_name":
+            value = self.message_name
+            if value is None:
+                raise KeyError(key)
+            return value
+        if key in _SLOT_FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        extra = getattr(self, "_extra", None)
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        return extra[key]
+
+    def __setitem__(self, key, value):
+        if key in _SLOT_FIELDS:
+            if key in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+        elif key == "message_name":
+            self._message_name = _DERIVED
+            if value != self.message_name:
+                self._message_name = value
+        else:
+            extra = getattr(self, "_extra", None)
+            if extra is None:
+                extra = self._extra = {}
+            extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _SLOT_FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif key == "message_name":
+            self._message_name = None
+        else:
+            extra = getattr(self, "_extra", None)
+            if extra is None or key not in extra:
+                raise KeyError(key)
+            del extra[key]
+
+    def __iter__(self):
+        for key in _ORDER:
+            if key == "message_name":
+                if self.message_name is not None:
+                    yield key
+            elif hasattr(self, key):
+                yield key
+        extra = getattr(self, "_extra", None)
+        if extra:
+            yield from extra
+
+    def __len__(self) -> int:
+        count = sum(1 for key in FIELDS if hasattr(self, key))
+        if self.message_name is not None:
+            count += 1
+        extra = getattr(self, "_extra", None)
+        return count + len(extra) if extra else count
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"Lineup({self.to_dict()!r})"
+
+
+_SLOT_FIELDS = frozenset(FIELDS)
+_STORED_KEYS = frozenset(FIELDS + ("message_name",))
+_ORDER = FIELDS[:10] + ("message_name",) + FIELDS[10:]
+_setters = {key: getattr(Lineup, key).__set__ for key in FIELDS}
+_intern = sys.intern
+_stored_values = itemgetter(*FIELDS, "message_name")
+
+# ``CFG_{MAP}_{GRENADE}_`` per (map, grenade), shared by every lineup
+_prefixes: dict = {}
+
+
+def _is_derived(lineup: Lineup, message_name) -> bool:
+    """Return ``True`` if *message_name* is what *lineup* would derive."""
+    try:
+        pair = (lineup.map, lineup.grenade)
+        unique_id = lineup.unique_id
+    except AttributeError:
+        return False
+    if type(pair[0]) is not str or type(pair[1]) is not str:
+        return False
+    prefix = _prefixes.get(pair)
+    if prefix is None:
+        prefix = _prefixes[pair] = build_message_name(*pair, "")
+    # Equal to prefix + unique_id.upper() without building the string: the
+    # tail is the ID itself, so the name must have no lower-case letters
+    return (
+        type(message_name) is str
+        and type(unique_id) is str
+        and len(message_name) == len(prefix) + len(unique_id)
+        and message_name.startswith(prefix)
+        and message_name.endswith(unique_id)
+        and message_name.isupper()
+    )
+
+
+def as_lineup(lineup) -> Lineup:
+    """Return *lineup* as a ``Lineup``, converting a storage dict."""
+    return lineup if isinstance(lineup, Lineup) else Lineup.from_dict(lineup)
+
+
+def encode_lineup(obj):
+    """``json.dump`` *default* hook that writes lineups as storage dicts."""
+    if isinstance(obj, Lineup):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,192 @@
+"""Reconcile stored lineups with the config files on disk.
+
+Files edited by hand, or by older versions that appended without
+filtering, drift from ``lineups.json``: aliases get duplicated and labels
+outlive their lineups. ``reconcile`` reads every output file once, indexes
+its entries by unique ID, message name or slot, and compares them with what
+storage says should be there. ``repair`` regenerates just the files that
+differ, each with a single rewrite.
+"""
+
+import os
+from collections import namedtuple
+
+from src import diagnostics
+from src.config_generator import (
+    alias_filename,
+    alias_line_id,
+    commands_filename,
+    format_alias_lines,
+    format_command,
+    format_platform_entry,
+    labels_filename,
+    platform_entry_key,
+    read_slots_cfg,
+    split_platform_english,
+)
+from src.constants import MAPS, SIDES
+from src.core import format_lineup_name
+from src.renderer import MAIN_CFG, PLATFORM_ENGLISH, DirtyTracker, generate_configs
+
+# One difference. *kind* is e.g. ``"missing_alias"``; *filename* is the file
+# to rewrite; *key* is the unique ID, message name or ``(tab, text)`` slot.
+Issue = namedtuple("Issue", "kind filename key detail")
+
+# Differences that regenerating from storage cannot fix
+UNREPAIRABLE = frozenset(("slot_conflict",))
+
+_SHARD_SUFFIX = "_aliases.cfg"
+
+
+def _read_alias_file(path: str) -> dict:
+    """Return ``{unique_id: [line, ...]}`` for the alias lines in *path*."""
+    found: dict = {}
+    try:
+        fh = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return found
+    diagnostics.count(diagnostics.FILES_OPENED)
+    with fh:
+        lines = 0
+        for lines, line in enumerate(fh, start=1):
+            unique_id = alias_line_id(line)
+            if unique_id is not None:
+                found.setdefault(unique_id, []).append(line.rstrip("\r\n"))
+    diagnostics.count(diagnostics.REGEX_PARSES, lines)
+    return found
+
+
+def _alias_files(cfg_dir: str) -> list:
+    """Return ``main.cfg`` plus every alias shard present in *cfg_dir*."""
+    try:
+        names = sorted(os.listdir(cfg_dir))
+    except FileNotFoundError:
+        names = []
+    return [MAIN_CFG] + [n for n in names if n.endswith(_SHARD_SUFFIX)]
+
+
+def _compare_entries(issues, what: str, filename: str, found: dict, expected: dict):
+    """Compare ``{key: [line, ...]}`` on disk against ``{key: [line, ...]}``."""
+    for key, lines in found.items():
+        wanted = expected.get(key)
+        if wanted is None:
+            issues.append(Issue(f"orphan_{what}", filename, key, lines[0]))
+        elif len(lines) > len(wanted):
+            issues.append(Issue(
+                f"duplicate_{what}", filename, key,
+                f"{len(lines)} lines, expected {len(wanted)}",
+            ))
+        elif sorted(lines) != sorted(wanted):
+            issues.append(Issue(f"stale_{what}", filename, key, lines[0]))
+    for key, wanted in expected.items():
+        if key not in found:
+            issues.append(Issue(f"missing_{what}", filename, key, wanted[0]))
+
+
+def _compare_slots(issues, what: str, filename: str, found: dict, expected: dict):
+    """Compare ``{slot: value}`` on disk against the stored ``{slot: value}``."""
+    for slot, value in found.items():
+        wanted = expected.get(slot)
+        if wanted is None:
+            issues.append(Issue(f"orphan_{what}", filename, slot, value))
+        elif value != wanted:
+            issues.append(Issue(f"stale_{what}", filename, slot, value))
+    for slot, wanted in expected.items():
+        if slot not in found:
+            issues.append(Issue(f"missing_{what}", filename, slot, wanted))
+
+
+def reconcile(
+    cfg_dir: str, resource_dir: str, lineups: list, layout: str = "single"
+) -> list:
+    """Return the ``Issue`` list describing how the files differ from *lineups*.
+
+    Every alias file, ``platform_english.txt`` and each labels/commands cfg
+    is read once; all comparisons are dict/set lookups, so the cost is
+    linear in the number of lines and lineups.
+    """
+    with diagnostics.span("reconcile"):
+        issues: list = []
+
+        # Aliases, wherever they are found
+        expected_aliases: dict = {}
+        for lu in lineups:
+            expected_aliases.setdefault(alias_filename(lu["map"], layout), {})[
+                lu["unique_id"]
+            ] = format_alias_lines(
+                lu["grenade"], lu["unique_id"], lu["yaw_value"], lu["pitch_value"]
+            )
+        for filename in _alias_files(cfg_dir):
+            found = _read_alias_file(os.path.join(cfg_dir, filename))
+            _compare_entries(
+                issues, "alias", filename, found, expected_aliases.pop(filename, {})
+            )
+        for filename, expected in expected_aliases.items():
+            _compare_entries(issues, "alias", filename, {}, expected)
+
+        # platform_english.txt managed block
+        _, entries, _ = split_platform_english(
+            os.path.join(resource_dir, PLATFORM_ENGLISH)
+        )
+        found: dict = {}
+        for line in entries:
+            key = platform_entry_key(line)
+            if key is not None:
+                found.setdefault(key, []).append(line)
+        expected = {
+            lu["message_name"]: [
+                format_platform_entry(lu["message_name"], format_lineup_name(lu["name"]))
+            ]
+            for lu in lineups
+        }
+        _compare_entries(issues, "message", PLATFORM_ENGLISH, found, expected)
+
+        # Labels and commands per map/side
+        by_pair: dict = {(m, s): {} for m in MAPS for s in SIDES}
+        for lu in lineups:
+            slots = by_pair.setdefault((lu["map"], lu["side"]), {})
+            slot = (lu["tab"], lu["text"])
+            if slot in slots:
+                issues.append(Issue(
+                    "slot_conflict", labels_filename(lu["map"], lu["side"]), slot,
+                    f"{slots[slot]['unique_id']} and {lu['unique_id']}",
+                ))
+            slots[slot] = lu  # the later lineup wins, as when rendering
+        for (map_name, side), slots in by_pair.items():
+            labels, commands = read_slots_cfg(cfg_dir, map_name, side)
+            _compare_slots(
+                issues, "label", labels_filename(map_name, side), labels,
+                {slot: f"#{lu['message_name']}" for slot, lu in slots.items()},
+            )
+            _compare_slots(
+                issues, "command", commands_filename(map_name, side), commands,
+                {
+                    slot: format_command(lu["grenade"], lu["unique_id"])
+                    for slot, lu in slots.items()
+                },
+            )
+        return issues
+
+
+def repair(
+    cfg_dir: str,
+    resource_dir: str,
+    data: dict,
+    issues: list,
+    storage_dir: str | None = None,
+    layout: str = "single",
+) -> list:
+    """Rewrite every file named by a repairable issue from stored *data*.
+
+    Each file is regenerated once, however many issues it has. Entries that
+    belong to no stored lineup are dropped. Returns the paths written.
+    """
+    filenames = {i.filename for i in issues if i.kind not in UNREPAIRABLE}
+    if not filenames:
+        return []
+    dirty = DirtyTracker()
+    dirty.clear()
+    dirty.mark_files(filenames)
+    return generate_configs(
+        cfg_dir, resource_dir, data, storage_dir, dirty, layout=layout
+    )
@@ -0,0 +1,502 @@
+"""In-memory rendering of every generated config file.
+
+Rather than appending lineups one at a time (which re-reads and rewrites the
+labels/commands files for each lineup), the renderer builds the complete
+contents of every output file from stored lineup data and writes each file
+exactly once.
+"""
+
+import hashlib
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src import diagnostics
+from src.config_generator import (
+    aliases_filename,
+    commands_filename,
+    format_alias_lines,
+    format_command,
+    format_commands_cfg,
+    format_shard_exec,
+    invalidate_parse_cache,
+    format_platform_entry,
+    join_platform_english,
+    labels_filename,
+    split_platform_english,
+)
+from src.constants import MAPS, SIDES
+from src.core import format_lineup_name
+from src.fileio import publish_directory, replace_files
+from src.storage import load_output_hashes, save_output_hashes
+
+MAIN_CFG = "main.cfg"
+PLATFORM_ENGLISH = "platform_english.txt"
+
+
+def _map_sides(lineups: list) -> list:
+    """Return every ``(map, side)`` pair that needs a labels/commands file."""
+    pairs = [(m, s) for m in MAPS for s in SIDES]
+    seen = set(pairs)
+    for lu in lineups:
+        pair = (lu["map"], lu["side"])
+        if pair not in seen:
+            seen.add(pair)
+            pairs.append(pair)
+    return pairs
+
+
+def _maps(lineups: list) -> list:
+    """Return every map that needs an alias shard."""
+    return list(dict.fromkeys(m for m, _ in _map_sides(lineups)))
+
+
+def render_main_cfg(lineups: list) -> str:
+    """Render the full contents of ``main.cfg``."""
+    lines = []
+    for lu in lineups:
+        lines.extend(
+            format_alias_lines(
+                lu["grenade"], lu["unique_id"], lu["yaw_value"], lu["pitch_value"]
+            )
+        )
+    return "".join(line + "\n" for line in lines)
+
+
+def render_alias_shards(lineups: list, only: set | None = None) -> dict:
+    """Render one ``{map}_aliases.cfg`` per map (sharded layout).
+
+    Returns ``{filename: contents, ...}``, restricted to *only* if given.
+    """
+    by_map: dict = {
+        aliases_filename(m): []
+        for m in _maps(lineups)
+        if only is None or aliases_filename(m) in only
+    }
+    for lu in lineups:
+        lines = by_map.get(aliases_filename(lu["map"]))
+        if lines is not None:
+            lines.extend(
+                format_alias_lines(
+                    lu["grenade"], lu["unique_id"], lu["yaw_value"], lu["pitch_value"]
+                )
+            )
+    return {
+        filename: "".join(line + "\n" for line in lines)
+        for filename, lines in by_map.items()
+    }
+
+
+def render_loader_cfg(lineups: list) -> str:
+    """Render ``main.cfg`` for the sharded layout.
+
+    It defines no lineup aliases itself, only a ``csafap_{map}`` alias per
+    map that loads that map's shard by hand; each commands cfg already
+    execs its own shard.
+    """
+    lines = ["// CSAFAP alias loader - per-map aliases live in {map}_aliases.cfg"]
+    lines.extend(
+        f'alias csafap_{m.lower()} "{format_shard_exec(m)}"' for m in _maps(lineups)
+    )
+    return "".join(line + "\n" for line in lines)
+
+
+def render_platform_entries(lineups: list) -> list:
+    """Render the ``platform_english.txt`` entry lines for *lineups*."""
+    return [
+        format_platform_entry(lu["message_name"], format_lineup_name(lu["name"]))
+        for lu in lineups
+    ]
+
+
+def render_platform_english(path: str, lineups: list) -> bytes:
+    """Render ``platform_english.txt`` with a fresh CSAFAP managed block.
+
+    Everything outside the managed block of the existing file at *path* is
+    kept byte for byte; previously generated entries are replaced.
+    """
+    head, _, tail = split_platform_english(path)
+    return join_platform_english(head, render_platform_entries(lineups), tail)
+
+
+def render_slot_files(
+    lineups: list, only: set | None = None, layout: str = "single"
+) -> dict:
+    """Render every labels/commands cfg.
+
+    Returns ``{filename: contents, ...}``. When two lineups share a slot the
+    later one wins, matching the behaviour of ``append_label``. If *only* is
+    given, ``(map, side)`` pairs whose files are not in it are skipped.
+    """
+    labels: dict = {
+        pair: {}
+        for pair in _map_sides(lineups)
+        if only is None
+        or labels_filename(*pair) in only
+        or commands_filename(*pair) in only
+    }
+    commands: dict = {pair: {} for pair in labels}
+    for lu in lineups:
+        pair = (lu["map"], lu["side"])
+        if pair not in labels:
+            continue
+        slot = (lu["tab"], lu["text"])
+        labels[pair][slot] = f"#{lu['message_name']}"
+        commands[pair][slot] = format_command(lu["grenade"], lu["unique_id"])
+
+    files = {}
+    for map_name, side in labels:
+        files[labels_filename(map_name, side)] = "".join(
+            f'cl_radial_radio_tab_{tab}_text_{text} "{msg}"\n'
+            for (tab, text), msg in sorted(labels[(map_name, side)].items())
+        )
+        files[commands_filename(map_name, side)] = format_commands_cfg(
+            map_name, commands[(map_name, side)], layout
+        )
+    return files
+
+
+def render_cfg_files(
+    lineups: list, only: set | None = None, layout: str = "single"
+) -> dict:
+    """Render ``main.cfg``, the alias shards and every labels/commands cfg.
+
+    Returns ``{filename: contents, ...}`` for files inside the CSAFAP cfg dir,
+    restricted to filenames in *only* when it is given. Alias shards are only
+    rendered in the ``"sharded"`` layout, where ``main.cfg`` is a loader.
+    """
+    files = {}
+    if only is None or MAIN_CFG in only:
+        if layout == "sharded":
+            files[MAIN_CFG] = render_loader_cfg(lineups)
+        else:
+            files[MAIN_CFG] = render_main_cfg(lineups)
+    if layout == "sharded":
+        files.update(render_alias_shards(lineups, only))
+    files.update(render_slot_files(lineups, only, layout))
+    if only is not None:
+        # Slot files render per map/side pair; keep only the ones asked for
+        files = {name: text for name, text in files.items() if name in only}
+    return files
+
+
+class DirtyTracker:
+    """Track which output files changed since the last generation.
+
+    A fresh tracker treats every file as dirty, so the first generation after
+    startup considers all outputs (content hashes still skip unchanged ones).
+    """
+
+    def __init__(self):
+        self._all = True
+        self._files: set = set()
+
+    def mark_all(self) -> None:
+        """Mark every output file as dirty."""
+        self._all = True
+
+    def mark_lineup(self, lineup: dict) -> None:
+        """Mark the files affected by adding, changing or removing *lineup*."""
+        self._files.update((
+            MAIN_CFG,
+            aliases_filename(lineup["map"]),
+            PLATFORM_ENGLISH,
+            labels_filename(lineup["map"], lineup["side"]),
+            commands_filename(lineup["map"], lineup["side"]),
+        ))
+
+    def mark_files(self, filenames) -> None:
+        """Mark the named output files as dirty."""
+        self._files.update(filenames)
+
+    def mark_aliases(self, lineups: list) -> None:
+        """Mark only the alias files (after yaw/pitch values changed)."""
+        self._files.add(MAIN_CFG)
+        self._files.update(aliases_filename(lu["map"]) for lu in lineups)
+
+    def mark_layout(self, lineups: list) -> None:
+        """Mark every file that differs between the alias layouts.
+
+        That is ``main.cfg``, every alias shard and every commands cfg (which
+        exec their map's shard only in the sharded layout).
+        """
+        self._files.add(MAIN_CFG)
+        self._files.update(aliases_filename(m) for m in _maps(lineups))
+        self._files.update(commands_filename(*pair) for pair in _map_sides(lineups))
+
+    def dirty_files(self) -> set | None:
+        """Return the dirty filenames, or ``None`` if everything is dirty."""
+        return None if self._all else set(self._files)
+
+    def is_dirty(self, filename: str) -> bool:
+        """Return ``True`` if *filename* needs to be regenerated."""
+        return self._all or filename in self._files
+
+    def clear(self) -> None:
+        """Mark every output file as clean."""
+        self._all = False
+        self._files.clear()
+
+
+def _digest(contents) -> str:
+    if isinstance(contents, str):
+        contents = contents.encode("utf-8")
+    return hashlib.sha256(contents).hexdigest()
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    diagnostics.count(diagnostics.FILES_OPENED)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            diagnostics.count(diagnostics.BYTES_READ, len(block))
+            h.update(block)
+    return h.hexdigest()
+
+
+def _unchanged(path: str, contents, digest: str, record: dict | None) -> tuple:
+    """Return ``(unchanged, record)`` for *path* against rendered *contents*.
+
+    A matching hash record with the same size and mtime is trusted as is.
+    Otherwise (e.g. after an incremental edit) the file on disk is hashed;
+    if it already holds *contents*, the fresh record to store is returned.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False, None
+    if (
+        record is not None
+        and record.get("sha256") == digest
+        and st.st_size == record.get("size")
+        and st.st_mtime_ns == record.get("mtime_ns")
+    ):
+        return True, None
+    if isinstance(contents, str):
+        contents = contents.encode("utf-8")
+    if st.st_size != len(contents) or _file_digest(path) != digest:
+        return False, None
+    return True, {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _record(path: str, digest: str) -> dict:
+    st = os.stat(path)
+    return {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _changed_files(directory: str, files: dict, hashes: dict, records: dict) -> dict:
+    """Return ``{filename: (contents, digest)}`` for files that must be written.
+
+    Fresh hash records of files found identical on disk go into *records*.
+    """
+    changed = {}
+    for filename, (contents, digest) in files.items():
+        path = os.path.abspath(os.path.join(directory, filename))
+        unchanged, record = _unchanged(path, contents, digest, hashes.get(path))
+        if not unchanged:
+            changed[filename] = (contents, digest)
+        elif record is not None:
+            records[path] = record
+    return changed
+
+
+def _digested(files: dict) -> dict:
+    return {name: (contents, _digest(contents)) for name, contents in files.items()}
+
+
+def generate_configs(
+    cfg_dir: str,
+    resource_dir: str,
+    data: dict,
+    storage_dir: str | None = None,
+    dirty: DirtyTracker | None = None,
+    progress=None,
+    layout: str = "single",
+) -> list:
+    """Regenerate config files from stored lineup *data*.
+
+    Every output file is rendered in memory first, staged, and then
+    published atomically: the CSAFAP cfg directory is swapped as a whole and
+    ``platform_english.txt`` is renamed into place.
+
+    When *dirty* is given only the files it marks are rendered. When
+    *storage_dir* is given, the content hash of each output is recorded there
+    and files whose rendered bytes match what is already on disk are not
+    rewritten. Returns the list of paths that were written.
+
+    *progress*, if given, is called as ``progress(done, total, message)``
+    before each directory is published; it may raise to stop there.
+
+    *layout* is ``"single"`` (every alias in ``main.cfg``) or ``"sharded"``
+    (``{map}_aliases.cfg`` shards); shards left over from the sharded layout
+    are removed when generating the single one.
+    """
+    with diagnostics.span("generate_configs"):
+        report = progress or (lambda done, total, message: None)
+        lineups = data.get("lineups", [])
+        only = dirty.dirty_files() if dirty is not None else None
+        report(0, 3, "Rendering")
+        hashes = load_output_hashes(storage_dir) if storage_dir else {}
+        rendered = _render(lineups, only, layout)
+        written, records, removed = _write_target(
+            cfg_dir, resource_dir, rendered, lineups, hashes, layout, report
+        )
+        if storage_dir and (records or removed):
+            save_output_hashes(storage_dir, _merged(hashes, records, removed))
+        if dirty is not None:
+            dirty.clear()
+        return written
+
+
+# One output target's outcome: the paths written, or the exception that
+# stopped it (``written`` then lists nothing)
+TargetResult = namedtuple("TargetResult", "cfg_dir resource_dir written error")
+
+
+def generate_configs_to_targets(
+    targets: list,
+    data: dict,
+    storage_dir: str | None = None,
+    dirty: DirtyTracker | None = None,
+    progress=None,
+    layout: str = "single",
+    max_workers: int | None = None,
+) -> list:
+    """Regenerate config files in several CS2 installs at once.
+
+    *targets* is a list of ``(cfg_dir, resource_dir)`` pairs; repeats are
+    written once. The files are rendered once; each target is then compared
+    against its recorded hashes and published on its own thread, as
+    ``generate_configs`` would. A target that fails does not stop the others.
+
+    Returns one ``TargetResult`` per target, in order. *progress* is called
+    from the calling thread as each target finishes; if it raises, targets
+    not yet started are skipped and the exception propagates. *dirty* is
+    cleared only when every target succeeded, so a failed one is retried in
+    full by the next generation.
+    """
+    targets = list(dict.fromkeys(tuple(target) for target in targets))
+    with diagnostics.span("generate_configs_to_targets"):
+        report = progress or (lambda done, total, message: None)
+        lineups = data.get("lineups", [])
+        only = dirty.dirty_files() if dirty is not None else None
+        total = len(targets) + 1
+        report(0, total, "Rendering")
+        hashes = load_output_hashes(storage_dir) if storage_dir else {}
+        rendered = _render(lineups, only, layout)
+        operation = diagnostics.current_operation()
+
+        def write(target):
+            with diagnostics.joined(operation), diagnostics.span("write_target"):
+                return _write_target(
+                    *target, rendered, lineups, hashes, layout,
+                    lambda done, total, message: None,
+                )
+
+        results: dict = {}
+        records: dict = {}
+        removed: list = []
+        pool = ThreadPoolExecutor(max_workers=max_workers or min(len(targets), 8) or 1)
+        try:
+            futures = {pool.submit(write, target): target for target in targets}
+            for done, future in enumerate(as_completed(futures), start=1):
+                cfg_dir, resource_dir = futures[future]
+                try:
+                    written, target_records, target_removed = future.result()
+                except Exception as exc:
+                    results[cfg_dir, resource_dir] = TargetResult(
+                        cfg_dir, resource_dir, [], exc
+                    )
+                    report(done, total, f"Failed: {cfg_dir}")
+                    continue
+                records.update(target_records)
+                removed.extend(target_removed)
+                results[cfg_dir, resource_dir] = TargetResult(
+                    cfg_dir, resource_dir, written, None
+                )
+                report(done, total, f"Wrote {len(written)} file(s) to {cfg_dir}")
+        finally:
+            pool.shutdown(cancel_futures=True)
+            # Record what did get written, even when progress stopped the run
+            if storage_dir and (records or removed):
+                save_output_hashes(storage_dir, _merged(hashes, records, removed))
+
+        ordered = [results[target] for target in targets]
+        if dirty is not None and not any(r.error for r in ordered):
+            dirty.clear()
+        return ordered
+
+
+def _render(lineups: list, only: set | None, layout: str) -> tuple:
+    """Render the outputs shared by every target.
+
+    Returns ``(cfg_files, platform_entries)``: ``{filename: (contents,
+    digest)}`` for the cfg dir, and the managed-block lines for
+    ``platform_english.txt`` (``None`` when it is not dirty).
+    """
+    with diagnostics.span("render.cfg_files"):
+        cfg_files = _digested(render_cfg_files(lineups, only, layout))
+    entries = None
+    if only is None or PLATFORM_ENGLISH in only:
+        with diagnostics.span("render.platform_english"):
+            entries = render_platform_entries(lineups)
+    return cfg_files, entries
+
+
+def _merged(hashes: dict, records: dict, removed: list) -> dict:
+    merged = dict(hashes)
+    for path in removed:
+        merged.pop(path, None)
+    merged.update(records)
+    return merged
+
+
+def _write_target(
+    cfg_dir, resource_dir, rendered, lineups, hashes, layout, report
+) -> tuple:
+    """Publish the *rendered* outputs that differ in one target.
+
+    *hashes* is only read. Returns ``(written, records, removed)``: the paths
+    written, the new hash records (of written files and of files found
+    already identical), and the paths whose records are stale.
+    """
+    cfg_files, entries = rendered
+    records = {}
+    cfg_changed = _changed_files(cfg_dir, cfg_files, hashes, records)
+    stale = []
+    if layout == "single":
+        stale = [
+            aliases_filename(m) for m in _maps(lineups)
+            if os.path.exists(os.path.join(cfg_dir, aliases_filename(m)))
+        ]
+    platform_changed = {}
+    if entries is not None:
+        # The text around the managed block differs per install
+        head, _, tail = split_platform_english(
+            os.path.join(resource_dir, PLATFORM_ENGLISH)
+        )
+        platform_changed = _changed_files(
+            resource_dir,
+            _digested({PLATFORM_ENGLISH: join_platform_english(head, entries, tail)}),
+            hashes,
+            records,
+        )
+
+    written = []
+    for step, (directory, changed) in enumerate((
+        (cfg_dir, cfg_changed),
+        (resource_dir, platform_changed),
+    ), start=1):
+        report(step, 3, f"Writing {len(changed)} file(s)")
+        files = {name: text for name, (text, _) in changed.items()}
+        if step == 1 and (changed or stale):
+            publish_directory(cfg_dir, files, remove=stale)
+        elif changed:
+            replace_files(directory, files)
+        for filename, (_, digest) in changed.items():
+            path = os.path.abspath(os.path.join(directory, filename))
+            invalidate_parse_cache(path)
+            records[path] = _record(path, digest)
+            written.append(path)
+    removed = [os.path.abspath(os.path.join(cfg_dir, filename)) for filename in stale]
+    return written, records, removed
@@ -0,0 +1,129 @@
+"""In-memory search index over stored lineups.
+
+Lineup names are split into lowercase word tokens and kept in an inverted
+index (token -> unique IDs) with a sorted vocabulary, so free-text queries
+resolve each word by prefix with ``bisect`` instead of scanning every
+lineup. ``map``, ``side`` and ``grenade`` have their own postings. A query
+intersects the matching sets, smallest first.
+"""
+
+import bisect
+import re
+import threading
+
+_TOKEN_RE = re.compile(r"\w+")
+
+FIELDS = ("map", "side", "grenade")
+
+
+def tokenize(text: str) -> list:
+    """Return the lowercase word tokens of *text*."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LineupIndex:
+    """Inverted index over lineup names plus per-field postings.
+
+    Safe to update from the GUI worker thread while the main loop queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._lineups: dict = {}  # unique_id -> (seq, lineup)
+        self._fields: dict = {field: {} for field in FIELDS}
+        self._tokens: dict = {}  # token -> set of unique IDs
+        self._vocab: list = []  # sorted tokens
+
+    @classmethod
+    def from_lineups(cls, lineups) -> "LineupIndex":
+        """Build an index from stored lineup dicts."""
+        index = cls()
+        for lu in lineups:
+            index.add(lu)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._lineups)
+
+    def add(self, lineup: dict) -> None:
+        """Index *lineup*, replacing any entry with the same ID."""
+        with self._lock:
+            unique_id = lineup["unique_id"]
+            if unique_id in self._lineups:
+                self._remove(unique_id)
+            self._seq += 1
+            self._lineups[unique_id] = (self._seq, lineup)
+            for field in FIELDS:
+                self._fields[field].setdefault(lineup.get(field), set()).add(unique_id)
+            for token in set(tokenize(lineup.get("name", ""))):
+                postings = self._tokens.get(token)
+                if postings is None:
+                    postings = self._tokens[token] = set()
+                    bisect.insort(self._vocab, token)
+                postings.add(unique_id)
+
+    def remove(self, unique_id: str) -> None:
+        """Drop *unique_id* from the index; unknown IDs are ignored."""
+        with self._lock:
+            self._remove(unique_id)
+
+    def _remove(self, unique_id: str) -> None:
+        entry = self._lineups.pop(unique_id, None)
+        if entry is None:
+            return
+        lineup = entry[1]
+        for field in FIELDS:
+            postings = self._fields[field].get(lineup.get(field))
+            if postings is not None:
+                postings.discard(unique_id)
+                if not postings:
+                    del self._fields[field][lineup.get(field)]
+        for token in set(tokenize(lineup.get("name", ""))):
+            postings = self._tokens.get(token)
+            if postings is None:
+                continue
+            postings.discard(unique_id)
+            if not postings:
+                del self._tokens[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+
+    def _prefix_postings(self, prefix: str) -> set:
+        start = bisect.bisect_left(self._vocab, prefix)
+        matches = set()
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._tokens[token]
+        return matches
+
+    def search(
+        self,
+        map_name: str | None = None,
+        side: str | None = None,
+        grenade: str | None = None,
+        text: str = "",
+    ) -> list:
+        """Return the lineups matching every given filter, in insertion order.
+
+        Each word of *text* must be a prefix of some word in the name.
+        Empty filters are ignored.
+        """
+        with self._lock:
+            sets = []
+            for field, value in zip(FIELDS, (map_name, side, grenade)):
+                if value:
+                    sets.append(self._fields[field].get(value, set()))
+            for word in set(tokenize(text)):
+                sets.append(self._prefix_postings(word))
+            if not sets:
+                return [lu for _, lu in self._lineups.values()]
+
+            sets.sort(key=len)
+            ids = set(sets[0])
+            for other in sets[1:]:
+                if not ids:
+                    break
+                ids &= other
+            entries = sorted(self._lineups[uid] for uid in ids)
+            return [lu for _, lu in entries]
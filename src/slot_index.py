@@ -0,0 +1,191 @@
+"""In-memory radio wheel occupancy index.
+
+Each ``(map, side)`` pair is tracked as a single integer bitmask over the
+``RADIO_TAB_*`` x ``RADIO_TEXT_*`` grid, so occupancy queries never touch the
+cfg files once the index has been built.
+"""
+
+from src.config_generator import move_slots, read_slots_cfg
+from src.constants import (
+    MAPS,
+    RADIO_TAB_MAX,
+    RADIO_TAB_MIN,
+    RADIO_TEXT_MAX,
+    RADIO_TEXT_MIN,
+    SIDES,
+)
+
+TEXTS_PER_TAB = RADIO_TEXT_MAX - RADIO_TEXT_MIN + 1
+SLOT_COUNT = (RADIO_TAB_MAX - RADIO_TAB_MIN + 1) * TEXTS_PER_TAB
+_FULL_MASK = (1 << SLOT_COUNT) - 1
+
+
+def slot_to_bit(tab: int, text: int) -> int:
+    """Return the bit position for ``(tab, text)``.
+
+    Bits are ordered tab-major, so the lowest free bit is the same slot that
+    ``find_first_empty_slot`` would pick. Raises ``ValueError`` for slots
+    outside the radio wheel grid.
+    """
+    if not (RADIO_TAB_MIN <= tab <= RADIO_TAB_MAX) or not (
+        RADIO_TEXT_MIN <= text <= RADIO_TEXT_MAX
+    ):
+        raise ValueError(f"Slot tab={tab} text={text} is outside the radio wheel.")
+    return (tab - RADIO_TAB_MIN) * TEXTS_PER_TAB + (text - RADIO_TEXT_MIN)
+
+
+def bit_to_slot(bit: int) -> tuple:
+    """Return the ``(tab, text)`` slot for bit position *bit*."""
+    tab, text = divmod(bit, TEXTS_PER_TAB)
+    return (tab + RADIO_TAB_MIN, text + RADIO_TEXT_MIN)
+
+
+def _key(map_name: str, side: str) -> tuple:
+    return (map_name.lower(), side.upper())
+
+
+class SlotIndex:
+    """Occupancy bitmask per ``(map, side)``."""
+
+    def __init__(self):
+        self._masks: dict = {}
+
+    @classmethod
+    def from_lineups(cls, lineups: list) -> "SlotIndex":
+        """Build an index from stored lineup dicts."""
+        index = cls()
+        for lu in lineups:
+            index.add(lu["map"], lu["side"], lu["tab"], lu["text"])
+        return index
+
+    @classmethod
+    def from_cfg_dir(cls, cfg_dir: str) -> "SlotIndex":
+        """Build an index by reading every labels/commands cfg once."""
+        index = cls()
+        index.merge_cfg_dir(cfg_dir)
+        return index
+
+    def copy(self) -> "SlotIndex":
+        """Return an independent copy of this index."""
+        index = SlotIndex()
+        index._masks = dict(self._masks)
+        return index
+
+    def merge_cfg_dir(self, cfg_dir: str) -> None:
+        """Mark every slot found in the labels/commands cfgs as occupied."""
+        for map_name in MAPS:
+            for side in SIDES:
+                labels, commands = read_slots_cfg(cfg_dir, map_name, side)
+                slots = labels.keys() | commands.keys()
+                for tab, text in slots:
+                    try:
+                        self.add(map_name, side, tab, text)
+                    except ValueError:
+                        continue
+
+    def mask(self, map_name: str, side: str) -> int:
+        """Return the raw occupancy bitmask for *map_name* / *side*."""
+        return self._masks.get(_key(map_name, side), 0)
+
+    def add(self, map_name: str, side: str, tab: int, text: int) -> None:
+        """Mark ``(tab, text)`` as occupied."""
+        key = _key(map_name, side)
+        self._masks[key] = self._masks.get(key, 0) | (1 << slot_to_bit(tab, text))
+
+    def remove(self, map_name: str, side: str, tab: int, text: int) -> None:
+        """Mark ``(tab, text)`` as free."""
+        key = _key(map_name, side)
+        self._masks[key] = self._masks.get(key, 0) & ~(1 << slot_to_bit(tab, text))
+
+    def is_occupied(self, map_name: str, side: str, tab: int, text: int) -> bool:
+        """Return ``True`` if ``(tab, text)`` is in use."""
+        return bool(self.mask(map_name, side) >> slot_to_bit(tab, text) & 1)
+
+    def occupied(self, map_name: str, side: str) -> set:
+        """Return the set of ``(tab, text)`` tuples already in use."""
+        mask = self.mask(map_name, side)
+        return {bit_to_slot(bit) for bit in range(SLOT_COUNT) if mask >> bit & 1}
+
+    def free_count(self, map_name: str, side: str) -> int:
+        """Return how many slots are still free."""
+        return SLOT_COUNT - bin(self.mask(map_name, side)).count("1")
+
+    def reserve(self, map_name: str, side: str, count: int) -> list:
+        """Reserve *count* free slots at once and return them in wheel order.
+
+        Either every slot is reserved or, if fewer than *count* are free,
+        ``ValueError`` is raised and nothing changes.
+        """
+        key = _key(map_name, side)
+        mask = self._masks.get(key, 0)
+        free = ~mask & _FULL_MASK
+        available = bin(free).count("1")
+        if count > available:
+            raise ValueError(
+                f"Only {available} free slot(s) on {map_name} {side}; {count} needed."
+            )
+        slots = []
+        for _ in range(count):
+            low = free & -free
+            free ^= low
+            mask |= low
+            slots.append(bit_to_slot(low.bit_length() - 1))
+        self._masks[key] = mask
+        return slots
+
+    def first_free(self, map_name: str, side: str):
+        """Return the first free ``(tab, text)`` slot, or ``None`` if full."""
+        free = ~self.mask(map_name, side) & _FULL_MASK
+        if not free:
+            return None
+        return bit_to_slot((free & -free).bit_length() - 1)
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+def compaction_moves(slots, pinned=()) -> dict:
+    """Plan how to repack *slots* into the lowest free slots.
+
+    *slots* are the ``(tab, text)`` slots to repack and *pinned* the slots
+    that must stay where they are. Order on the wheel is preserved. Returns
+    ``{old_slot: new_slot}`` for the slots that move.
+    """
+    pinned_bits = set()
+    for slot in pinned:
+        try:
+            pinned_bits.add(slot_to_bit(*slot))
+        except ValueError:
+            continue  # outside the wheel, cannot collide
+    targets = (bit for bit in range(SLOT_COUNT) if bit not in pinned_bits)
+    moves = {}
+    for slot in sorted(set(slots) - set(pinned), key=lambda s: slot_to_bit(*s)):
+        new = bit_to_slot(next(targets))
+        if new != slot:
+            moves[slot] = new
+    return moves
+
+
+def compact_wheel(
+    cfg_dir: str, lineups: list, map_name: str, side: str, layout: str = "single"
+) -> dict:
+    """Repack the stored lineups of *map_name* / *side* to close slot holes.
+
+    Entries in the cfg files that belong to no stored lineup keep their
+    slots. The labels and commands files are rewritten once each, and the
+    ``tab``/``text`` of each moved lineup dict is updated in place (the
+    caller saves storage). Returns ``{old_slot: new_slot}``.
+    """
+    key = _key(map_name, side)
+    pair = [lu for lu in lineups if _key(lu["map"], lu["side"]) == key]
+    stored = {(lu["tab"], lu["text"]) for lu in pair}
+    labels, commands = read_slots_cfg(cfg_dir, map_name, side)
+    pinned = (labels.keys() | commands.keys()) - stored
+    moves = compaction_moves(stored, pinned)
+    move_slots(cfg_dir, map_name, side, moves, layout)
+    for lu in pair:
+        new = moves.get((lu["tab"], lu["text"]))
+        if new is not None:
+            lu["tab"], lu["text"] = new
+    return moves
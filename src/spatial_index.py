@@ -0,0 +1,156 @@
+"""Spatial index over lineup throw positions.
+
+Each map has a uniform grid over the ``setpos`` X/Y plane. A lineup lives in
+the cell containing its position, so nearest-neighbour and radius queries
+only visit the cells around the query point instead of every lineup.
+Distances are full 3D Euclidean distances in game units.
+"""
+
+import heapq
+import math
+
+from src.core import parse_getpos
+
+# Grid cell edge in game units; roughly a few player widths.
+DEFAULT_CELL_SIZE = 256.0
+
+
+def lineup_position(lineup: dict):
+    """Return the ``(x, y, z)`` setpos of *lineup*, or ``None`` if unparsable."""
+    try:
+        return tuple(parse_getpos(lineup.get("raw_getpos", ""))["setpos"])
+    except ValueError:
+        return None
+
+
+class _MapGrid:
+    def __init__(self):
+        self.cells: dict = {}  # (cx, cy) -> {unique_id: (pos, lineup)}
+        self.bounds = None  # (min_cx, min_cy, max_cx, max_cy)
+
+    def add(self, cell, unique_id, pos, lineup):
+        self.cells.setdefault(cell, {})[unique_id] = (pos, lineup)
+        cx, cy = cell
+        if self.bounds is None:
+            self.bounds = (cx, cy, cx, cy)
+        else:
+            x0, y0, x1, y1 = self.bounds
+            self.bounds = (min(x0, cx), min(y0, cy), max(x1, cx), max(y1, cy))
+
+    def remove(self, cell, unique_id):
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.pop(unique_id, None)
+            if not bucket:
+                del self.cells[cell]
+
+    def ring(self, cx, cy, d):
+        """Yield the occupied cells at Chebyshev distance *d* from ``(cx, cy)``."""
+        if d == 0:
+            cells = [(cx, cy)]
+        else:
+            cells = [(cx + i, cy - d) for i in range(-d, d + 1)]
+            cells += [(cx + i, cy + d) for i in range(-d, d + 1)]
+            cells += [(cx - d, cy + j) for j in range(-d + 1, d)]
+            cells += [(cx + d, cy + j) for j in range(-d + 1, d)]
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket:
+                yield bucket
+
+    def max_ring(self, cx, cy):
+        """Return the ring distance beyond which no cell is occupied."""
+        if self.bounds is None:
+            return -1
+        x0, y0, x1, y1 = self.bounds
+        return max(cx - x0, x1 - cx, cy - y0, y1 - cy, 0)
+
+
+class SpatialIndex:
+    """Uniform grid per map over lineup ``setpos`` coordinates."""
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._grids: dict = {}  # map -> _MapGrid
+        self._where: dict = {}  # unique_id -> (map, cell)
+
+    @classmethod
+    def from_lineups(cls, lineups, cell_size: float = DEFAULT_CELL_SIZE):
+        """Build an index from stored lineup dicts."""
+        index = cls(cell_size)
+        for lu in lineups:
+            index.add(lu)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _cell(self, pos) -> tuple:
+        return (math.floor(pos[0] / self.cell_size), math.floor(pos[1] / self.cell_size))
+
+    def add(self, lineup: dict) -> bool:
+        """Index *lineup*; returns ``False`` if its getpos cannot be parsed."""
+        pos = lineup_position(lineup)
+        if pos is None:
+            return False
+        unique_id = lineup["unique_id"]
+        self.remove(unique_id)
+        cell = self._cell(pos)
+        map_name = lineup["map"].lower()
+        self._grids.setdefault(map_name, _MapGrid()).add(cell, unique_id, pos, lineup)
+        self._where[unique_id] = (map_name, cell)
+        return True
+
+    def remove(self, unique_id: str) -> None:
+        """Drop *unique_id* from the index; unknown IDs are ignored."""
+        where = self._where.pop(unique_id, None)
+        if where is not None:
+            map_name, cell = where
+            self._grids[map_name].remove(cell, unique_id)
+
+    def nearest(self, map_name: str, pos, k: int = 5, side: str | None = None) -> list:
+        """Return up to *k* ``(distance, lineup)`` pairs closest to *pos*.
+
+        Rings of cells are visited outwards until no unvisited cell can hold
+        anything closer than the current *k*-th best.
+        """
+        grid = self._grids.get(map_name.lower())
+        if grid is None or k <= 0:
+            return []
+        cx, cy = self._cell(pos)
+        best: list = []  # max-heap of (-distance, seq, lineup)
+        seq = 0
+        for d in range(grid.max_ring(cx, cy) + 1):
+            for bucket in grid.ring(cx, cy, d):
+                for point, lineup in bucket.values():
+                    if side and lineup["side"] != side:
+                        continue
+                    dist = math.dist(pos, point)
+                    seq += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, seq, lineup))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, seq, lineup))
+            # Every cell in ring d + 1 is at least d * cell_size away.
+            if len(best) == k and -best[0][0] <= d * self.cell_size:
+                break
+        return [(-neg, lineup) for neg, _, lineup in sorted(best, reverse=True)]
+
+    def within(self, map_name: str, pos, radius: float, side: str | None = None) -> list:
+        """Return ``(distance, lineup)`` pairs within *radius* of *pos*, closest first."""
+        grid = self._grids.get(map_name.lower())
+        if grid is None or radius < 0:
+            return []
+        cx, cy = self._cell(pos)
+        reach = min(math.ceil(radius / self.cell_size), grid.max_ring(cx, cy))
+        found = []
+        for d in range(reach + 1):
+            for bucket in grid.ring(cx, cy, d):
+                for point, lineup in bucket.values():
+                    if side and lineup["side"] != side:
+                        continue
+                    dist = math.dist(pos, point)
+                    if dist <= radius:
+                        found.append((dist, lineup))
+        found.sort(key=lambda pair: pair[0])
+        return found
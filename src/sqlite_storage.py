@@ -0,0 +1,198 @@
+"""SQLite-backed persistence for lineup data.
+
+Each lineup is one row, indexed by ``unique_id`` and by
+``(map, side, tab, text)``, so adds and deletes touch a single row instead of
+rewriting the whole library. The full lineup dict is kept as JSON in the
+``body`` column so unknown keys round-trip unchanged.
+"""
+
+import json
+import sqlite3
+
+from src import diagnostics
+from src.model import Lineup, as_lineup, encode_lineup
+from src.search_index import LineupIndex
+from src.storage import default_data
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lineups (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    unique_id TEXT NOT NULL UNIQUE,
+    map TEXT,
+    side TEXT,
+    tab INTEGER,
+    text INTEGER,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lineups_slot ON lineups (map, side, tab, text);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_INSERT = (
+    "INSERT OR REPLACE INTO lineups (unique_id, map, side, tab, text, body) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _row(lineup: dict) -> tuple:
+    return (
+        lineup["unique_id"],
+        lineup.get("map"),
+        lineup.get("side"),
+        lineup.get("tab"),
+        lineup.get("text"),
+        json.dumps(lineup, ensure_ascii=False, default=encode_lineup),
+    )
+
+
+class SqliteStore:
+    """Store bound to a SQLite database file.
+
+    Exposes the same methods as ``src.storage.JsonStore``. Mutating methods
+    update the in-memory ``data`` dict as well as the database.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # The GUI runs storage calls on a worker thread, one job at a time.
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        # Search index kept in step with add/remove once built
+        self.index = None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Whole-library operations
+    # ------------------------------------------------------------------
+
+    def load_data(self) -> dict:
+        """Load every lineup (in insertion order) and the settings."""
+        with diagnostics.span("sqlite.load_data"):
+            return self._load_data()
+
+    def _load_data(self) -> dict:
+        data = default_data()
+        data["lineups"] = [
+            Lineup.from_dict(json.loads(body))
+            for (body,) in self._conn.execute("SELECT body FROM lineups ORDER BY seq")
+        ]
+        for key, value in self._conn.execute("SELECT key, value FROM settings"):
+            data["settings"][key] = json.loads(value)
+        return data
+
+    def save_data(self, data: dict) -> None:
+        """Replace the stored library and settings with *data*."""
+        with diagnostics.span("sqlite.save_data"), self._conn:
+            self._conn.execute("DELETE FROM lineups")
+            self._conn.executemany(_INSERT, (_row(lu) for lu in data.get("lineups", [])))
+            self._save_settings(data)
+        if self.index is not None:
+            self.build_index(data)
+
+    def save_settings(self, data: dict) -> None:
+        """Persist only the settings part of *data*."""
+        with self._conn:
+            self._save_settings(data)
+
+    def _save_settings(self, data: dict) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            (
+                (key, json.dumps(value))
+                for key, value in data.get("settings", {}).items()
+            ),
+        )
+
+    def import_json(self, path: str) -> int:
+        """Import lineups and settings from a ``lineups.json`` file.
+
+        Lineups whose ID already exists are replaced. Returns the number of
+        lineups imported.
+        """
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        lineups = data.get("lineups", [])
+        with self._conn:
+            self._conn.executemany(_INSERT, (_row(lu) for lu in lineups))
+            self._save_settings(data)
+        return len(lineups)
+
+    # ------------------------------------------------------------------
+    # Row-level operations
+    # ------------------------------------------------------------------
+
+    def get_existing_ids(self, data: dict) -> set:
+        return {uid for (uid,) in self._conn.execute("SELECT unique_id FROM lineups")}
+
+    def add_lineup(self, data: dict, lineup: dict) -> dict:
+        lineup = as_lineup(lineup)
+        with self._conn:
+            self._conn.execute(_INSERT, _row(lineup))
+        data.setdefault("lineups", []).append(lineup)
+        if self.index is not None:
+            self.index.add(lineup)
+        return data
+
+    def add_lineups(self, data: dict, lineups: list) -> dict:
+        """Insert every lineup in *lineups* in one transaction."""
+        lineups = [as_lineup(lu) for lu in lineups]
+        with diagnostics.span("sqlite.add_lineups"), self._conn:
+            self._conn.executemany(_INSERT, (_row(lu) for lu in lineups))
+        data.setdefault("lineups", []).extend(lineups)
+        if self.index is not None:
+            for lu in lineups:
+                self.index.add(lu)
+        return data
+
+    def remove_lineup(self, data: dict, unique_id: str) -> dict:
+        with self._conn:
+            self._conn.execute("DELETE FROM lineups WHERE unique_id = ?", (unique_id,))
+        data["lineups"] = [
+            lu for lu in data.get("lineups", []) if lu.get("unique_id") != unique_id
+        ]
+        if self.index is not None:
+            self.index.remove(unique_id)
+        return data
+
+    def remove_lineups(self, data: dict, unique_ids: set) -> dict:
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM lineups WHERE unique_id = ?",
+                ((uid,) for uid in unique_ids),
+            )
+        data["lineups"] = [
+            lu for lu in data.get("lineups", []) if lu.get("unique_id") not in unique_ids
+        ]
+        if self.index is not None:
+            for unique_id in unique_ids:
+                self.index.remove(unique_id)
+        return data
+
+    def build_index(self, data: dict):
+        """Build the search index from *data* and keep it updated."""
+        self.index = LineupIndex.from_lineups(data.get("lineups", []))
+        return self.index
+
+    def find_lineup(self, data: dict, unique_id: str):
+        row = self._conn.execute(
+            "SELECT body FROM lineups WHERE unique_id = ?", (unique_id,)
+        ).fetchone()
+        return Lineup.from_dict(json.loads(row[0])) if row else None
+
+    def find_by_slot(
+        self, data: dict, map_name: str, side: str, tab: int, text: int
+    ) -> list:
+        """Return every lineup assigned to ``(tab, text)`` on *map_name* / *side*."""
+        rows = self._conn.execute(
+            "SELECT body FROM lineups WHERE map = ? AND side = ? AND tab = ? "
+            "AND text = ? ORDER BY seq",
+            (map_name, side, tab, text),
+        )
+        return [Lineup.from_dict(json.loads(body)) for (body,) in rows]
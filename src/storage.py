@@ -1,37 +1,84 @@
-"""JSON-based persistence for lineup data."""
+"""JSON-based persistence for lineup data.
+
+The module-level functions operate on the in-memory ``data`` dict and the
+``lineups.json`` file. ``open_store`` returns a store object exposing the
+same function surface bound to a storage directory, backed either by JSON
+or by SQLite (see ``src.sqlite_storage``). Lineups are held in memory as
+``src.model.Lineup`` records and written back as plain dicts.
+"""
 
 import json
 import os
 
+from src import diagnostics
+from src.fileio import atomic_write_text
+from src.model import Lineup, as_lineup, encode_lineup
+from src.search_index import LineupIndex
+
 
 _DEFAULT_DATA = {
     "lineups": [],
     "settings": {
         "cs2_path": "",
+        "extra_cs2_paths": [],
         "sensitivity": 1.0,
+        "storage_backend": "json",
+        "alias_layout": "single",
     },
 }
 
+BACKENDS = ("json", "sqlite")
+
+
+def default_storage_dir() -> str:
+    """Return the default storage directory (``~/.csafap``)."""
+    return os.path.join(os.path.expanduser("~"), ".csafap")
+
 
 def _data_path(storage_dir: str) -> str:
     return os.path.join(storage_dir, "lineups.json")
 
 
+def _db_path(storage_dir: str) -> str:
+    return os.path.join(storage_dir, "lineups.db")
+
+
+def _hashes_path(storage_dir: str) -> str:
+    return os.path.join(storage_dir, "output_hashes.json")
+
+
+def default_data() -> dict:
+    """Return a fresh copy of the default data structure."""
+    return json.loads(json.dumps(_DEFAULT_DATA))  # deep copy
+
+
 def load_data(storage_dir: str) -> dict:
     """Load stored lineup data from disk.  Returns default structure if missing."""
     path = _data_path(storage_dir)
     if not os.path.exists(path):
-        return json.loads(json.dumps(_DEFAULT_DATA))  # deep copy
-    with open(path, "r", encoding="utf-8") as fh:
-        return json.load(fh)
+        return default_data()
+    with diagnostics.span("storage.load_data"):
+        diagnostics.count(diagnostics.FILES_OPENED)
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+            if diagnostics.enabled:
+                diagnostics.count(diagnostics.BYTES_READ, fh.buffer.tell())
+        from_dict = Lineup.from_dict
+        data["lineups"] = [from_dict(lu) for lu in data.get("lineups", [])]
+    return data
 
 
 def save_data(storage_dir: str, data: dict) -> None:
     """Persist lineup data to disk."""
     os.makedirs(storage_dir, exist_ok=True)
     path = _data_path(storage_dir)
-    with open(path, "w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2, ensure_ascii=False)
+    with diagnostics.span("storage.save_data"):
+        diagnostics.count(diagnostics.FILES_WRITTEN)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False, default=encode_lineup)
+            if diagnostics.enabled:
+                fh.flush()
+                diagnostics.count(diagnostics.BYTES_WRITTEN, fh.buffer.tell())
 
 
 def get_existing_ids(data: dict) -> set:
@@ -41,7 +88,13 @@ def get_existing_ids(data: dict) -> set:
 
 def add_lineup(data: dict, lineup: dict) -> dict:
     """Add a lineup entry to the data structure and return updated data."""
-    data.setdefault("lineups", []).append(lineup)
+    data.setdefault("lineups", []).append(as_lineup(lineup))
+    return data
+
+
+def add_lineups(data: dict, lineups: list) -> dict:
+    """Add several lineup entries at once and return updated data."""
+    data.setdefault("lineups", []).extend(as_lineup(lu) for lu in lineups)
     return data
 
 
@@ -53,9 +106,178 @@ def remove_lineup(data: dict, unique_id: str) -> dict:
     return data
 
 
+def remove_lineups(data: dict, unique_ids: set) -> dict:
+    """Remove every lineup whose ID is in *unique_ids* and return updated data."""
+    data["lineups"] = [
+        lu for lu in data.get("lineups", []) if lu.get("unique_id") not in unique_ids
+    ]
+    return data
+
+
 def find_lineup(data: dict, unique_id: str):
     """Find and return a lineup by unique ID, or ``None``."""
     for lu in data.get("lineups", []):
         if lu.get("unique_id") == unique_id:
             return lu
     return None
+
+
+# ---------------------------------------------------------------------------
+# Storage backends
+# ---------------------------------------------------------------------------
+
+class JsonStore:
+    """Store bound to ``lineups.json``; every mutation rewrites the file."""
+
+    backend = "json"
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        # Search index kept in step with add/remove once built
+        self.index = None
+
+    def load_data(self) -> dict:
+        return load_data(self.storage_dir)
+
+    def save_data(self, data: dict) -> None:
+        save_data(self.storage_dir, data)
+        if self.index is not None:
+            self.build_index(data)
+
+    def save_settings(self, data: dict) -> None:
+        save_data(self.storage_dir, data)
+
+    def get_existing_ids(self, data: dict) -> set:
+        return get_existing_ids(data)
+
+    def add_lineup(self, data: dict, lineup: dict) -> dict:
+        data = add_lineup(data, lineup)
+        save_data(self.storage_dir, data)
+        if self.index is not None:
+            self.index.add(data["lineups"][-1])
+        return data
+
+    def add_lineups(self, data: dict, lineups: list) -> dict:
+        """Add every lineup in *lineups* with a single file rewrite."""
+        start = len(data.get("lineups", []))
+        data = add_lineups(data, lineups)
+        try:
+            save_data(self.storage_dir, data)
+        except BaseException:
+            del data["lineups"][start:]
+            raise
+        if self.index is not None:
+            for lu in data["lineups"][start:]:
+                self.index.add(lu)
+        return data
+
+    def remove_lineup(self, data: dict, unique_id: str) -> dict:
+        data = remove_lineup(data, unique_id)
+        save_data(self.storage_dir, data)
+        if self.index is not None:
+            self.index.remove(unique_id)
+        return data
+
+    def remove_lineups(self, data: dict, unique_ids: set) -> dict:
+        data = remove_lineups(data, unique_ids)
+        save_data(self.storage_dir, data)
+        if self.index is not None:
+            for unique_id in unique_ids:
+                self.index.remove(unique_id)
+        return data
+
+    def build_index(self, data: dict):
+        """Build the search index from *data* and keep it updated."""
+        self.index = LineupIndex.from_lineups(data.get("lineups", []))
+        return self.index
+
+    def find_lineup(self, data: dict, unique_id: str):
+        return find_lineup(data, unique_id)
+
+    def find_by_slot(
+        self, data: dict, map_name: str, side: str, tab: int, text: int
+    ) -> list:
+        """Return every lineup assigned to ``(tab, text)`` on *map_name* / *side*."""
+        return [
+            lu
+            for lu in data.get("lineups", [])
+            if (lu.get("map"), lu.get("side"), lu.get("tab"), lu.get("text"))
+            == (map_name, side, tab, text)
+        ]
+
+    def close(self) -> None:
+        pass
+
+
+def detect_backend(storage_dir: str) -> str:
+    """Return the backend in use for *storage_dir*.
+
+    A ``lineups.db`` file means SQLite; otherwise JSON is used.
+    """
+    return "sqlite" if os.path.exists(_db_path(storage_dir)) else "json"
+
+
+def open_store(storage_dir: str, backend: str | None = None):
+    """Open the lineup store for *storage_dir*.
+
+    If *backend* is ``None`` it is detected from the files present. Opening a
+    new SQLite store next to an existing ``lineups.json`` imports it.
+    """
+    backend = backend or detect_backend(storage_dir)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend!r}")
+    if backend == "json":
+        return JsonStore(storage_dir)
+    from src.sqlite_storage import SqliteStore
+
+    is_new = not os.path.exists(_db_path(storage_dir))
+    store = SqliteStore(_db_path(storage_dir))
+    if is_new and os.path.exists(_data_path(storage_dir)):
+        store.import_json(_data_path(storage_dir))
+    return store
+
+
+def switch_backend(storage_dir: str, data: dict, backend: str):
+    """Move *data* to the *backend* store and return the newly opened store.
+
+    Switching to JSON writes ``lineups.json`` and renames the database to
+    ``lineups.db.bak`` so it is no longer detected.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend!r}")
+    data.setdefault("settings", {})["storage_backend"] = backend
+    if backend == "json":
+        save_data(storage_dir, data)
+        if os.path.exists(_db_path(storage_dir)):
+            os.replace(_db_path(storage_dir), _db_path(storage_dir) + ".bak")
+        return JsonStore(storage_dir)
+    store = open_store(storage_dir, backend)
+    store.save_data(data)
+    return store
+
+
+def load_output_hashes(storage_dir: str) -> dict:
+    """Load the recorded content hash of every generated output file.
+
+    Returns ``{absolute_path: {"sha256": ..., "size": ..., "mtime_ns": ...}}``.
+    A missing or unreadable manifest loads as ``{}``, which only means every
+    output is hashed again on the next generate.
+    """
+    path = _hashes_path(storage_dir)
+    if not os.path.exists(path):
+        return {}
+    with diagnostics.span("storage.load_output_hashes"):
+        diagnostics.count(diagnostics.FILES_OPENED)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                hashes = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+    return hashes if isinstance(hashes, dict) else {}
+
+
+def save_output_hashes(storage_dir: str, hashes: dict) -> None:
+    """Persist generated output hashes to disk."""
+    path = _hashes_path(storage_dir)
+    with diagnostics.span("storage.save_output_hashes"):
+        atomic_write_text(path, json.dumps(hashes, indent=2, sort_keys=True))
@@ -0,0 +1,140 @@
+"""Background job runner that keeps file I/O off the Tk main loop.
+
+One job runs at a time on a daemon worker thread. Progress, results and
+errors are queued and delivered on the caller's thread by ``poll()``, which
+the GUI schedules with ``after()``; the worker never touches Tk itself.
+"""
+
+import queue
+import threading
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobContext:
+    """Handle passed to a running job for progress reports and cancellation."""
+
+    def __init__(self, runner: "JobRunner"):
+        self._runner = runner
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self) -> None:
+        """Raise ``JobCancelled`` if cancellation was requested."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(
+        self, done: int, total: int, message: str = "", cancellable: bool = True
+    ) -> None:
+        """Report progress, and raise ``JobCancelled`` if cancelled.
+
+        Pass ``cancellable=False`` once the job has reached a point it must
+        run to the end from; the report then never raises.
+        """
+        self._runner._events.put(("progress", (done, total, message)))
+        if cancellable:
+            self.check()
+
+
+class JobRunner:
+    """Run jobs one at a time on a worker thread.
+
+    ``submit(name, fn, ...)`` calls ``fn(context)`` on the worker thread.
+    Callbacks (``on_done(result)``, ``on_error(exc)``, ``on_cancel()`` and
+    ``on_progress(done, total, message)``) run inside ``poll()``.
+    """
+
+    def __init__(self):
+        self._events: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._name = None
+        self._context = None
+        self._callbacks: dict = {}
+
+    @property
+    def busy(self) -> bool:
+        return self._name is not None
+
+    @property
+    def current(self):
+        """Return the name of the running job, or ``None``."""
+        return self._name
+
+    def submit(
+        self,
+        name: str,
+        fn,
+        on_done=None,
+        on_error=None,
+        on_cancel=None,
+        on_progress=None,
+    ) -> bool:
+        """Start *fn* on the worker thread.
+
+        Returns ``False`` (and does nothing) if another job is still running.
+        """
+        with self._lock:
+            if self._name is not None:
+                return False
+            self._name = name
+            self._context = JobContext(self)
+            self._callbacks = {
+                "done": on_done,
+                "error": on_error,
+                "cancelled": on_cancel,
+                "progress": on_progress,
+            }
+        thread = threading.Thread(
+            target=self._run, args=(fn, self._context), name=f"job-{name}", daemon=True
+        )
+        thread.start()
+        return True
+
+    def cancel(self) -> None:
+        """Request cancellation of the running job."""
+        if self._context is not None:
+            self._context._cancel.set()
+
+    def _run(self, fn, context: JobContext) -> None:
+        try:
+            result = fn(context)
+        except JobCancelled:
+            self._events.put(("cancelled", ()))
+        except Exception as exc:  # delivered to on_error on the main thread
+            self._events.put(("error", (exc,)))
+        else:
+            self._events.put(("done", (result,)))
+
+    def poll(self) -> None:
+        """Deliver queued events to their callbacks on the calling thread."""
+        while True:
+            try:
+                kind, args = self._events.get_nowait()
+            except queue.Empty:
+                return
+            self._dispatch(kind, args)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until the running job has finished and deliver its events.
+
+        Intended for tests and headless callers; the GUI uses ``poll()``.
+        Raises ``queue.Empty`` if *timeout* expires first.
+        """
+        while self.busy:
+            self._dispatch(*self._events.get(timeout=timeout))
+
+    def _dispatch(self, kind: str, args: tuple) -> None:
+        callback = self._callbacks.get(kind)
+        if kind != "progress":
+            with self._lock:
+                self._name = None
+                self._context = None
+                self._callbacks = {}
+        if callback is not None:
+            callback(*args)
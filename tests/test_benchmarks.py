@@ -0,0 +1,181 @@
+"""Benchmark and scale tests for the generation pipeline.
+
+Each operation is timed and profiled with ``tracemalloc`` on a synthetic
+library covering every ``MAPS`` x ``SIDES`` x ``GRENADES`` combination, and
+fails when it exceeds its budget.
+
+Configuration (environment variables):
+
+``CSAFAP_BENCH_SIZES``
+    Comma-separated library sizes, default ``100``. The full scale run is
+    ``CSAFAP_BENCH_SIZES=100,10000,100000``.
+``CSAFAP_BENCH_SCALE``
+    Multiplier applied to every budget (default ``1.0``); raise it on slow
+    machines, lower it to tighten the regression threshold.
+
+Run ``python -m tests.test_benchmarks`` to print a results table instead.
+"""
+
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pytest
+
+from src.config_generator import remove_lineup_files, write_lineup
+from src.constants import GRENADES, MAPS, SIDES
+from src.core import make_lineup, parse_getpos
+from src.renderer import generate_configs
+from src.slot_index import SLOT_COUNT, bit_to_slot
+from src.storage import load_data, save_data
+
+SIZES = [int(n) for n in os.environ.get("CSAFAP_BENCH_SIZES", "100").split(",")]
+SCALE = float(os.environ.get("CSAFAP_BENCH_SCALE", "1.0"))
+
+# Number of lineups added/deleted incrementally against a library of size N.
+ADD_SAMPLE = 50
+DELETE_SAMPLE = 10
+
+# operation -> (fixed seconds, seconds per lineup in the library,
+#               peak tracemalloc bytes per lineup in the library)
+BUDGETS = {
+    "parse": (0.05, 20e-6, 2_000),
+    "add": (2.0, 1e-6, 2_000),
+    "generate": (1.0, 100e-6, 10_000),
+    "delete": (1.0, 100e-6, 5_000),
+    "save": (0.2, 100e-6, 5_000),
+    # Building compact Lineup records makes load about 1.6x plain json.load
+    # (~5us per lineup) for half the retained memory; keep it near that
+    "load": (0.1, 8e-6, 10_000),
+}
+_FIXED_PEAK_BYTES = 1_000_000
+
+
+def synthetic_raw_getpos(i: int) -> str:
+    """Return a deterministic getpos string for lineup number *i*."""
+    x, y, z = (i * 7) % 4000 - 2000, (i * 13) % 4000 - 2000, (i % 50) * 4
+    pitch, yaw = (i % 170) - 85 + 0.25, (i * 3) % 360 - 180 + 0.5
+    return f"setpos {x}.5 {y}.25 {z}.0; setang {pitch} {yaw} 0.00"
+
+
+def synthetic_lineups(n: int) -> list:
+    """Return *n* lineups cycling through every map, side and grenade."""
+    combos = itertools.cycle(itertools.product(MAPS, SIDES, GRENADES))
+    per_pair: dict = {}
+    lineups = []
+    for i, (map_name, side, grenade) in zip(range(n), combos):
+        used = per_pair.get((map_name, side), 0)
+        per_pair[(map_name, side)] = used + 1
+        tab, text = bit_to_slot(used % SLOT_COUNT)
+        lineups.append(make_lineup(
+            f"B{i:05X}"[-6:], side, map_name, grenade, f"{side} {grenade} {i}",
+            synthetic_raw_getpos(i), tab, text,
+        ))
+    return lineups
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def budget(operation: str, n: int) -> tuple:
+    """Return the ``(seconds, peak_bytes)`` budget for *operation* at size *n*."""
+    fixed, per_lineup, bytes_per_lineup = BUDGETS[operation]
+    return (
+        (fixed + per_lineup * n) * SCALE,
+        (_FIXED_PEAK_BYTES + bytes_per_lineup * n) * SCALE,
+    )
+
+
+def prepare(operation: str, n: int, work_dir: str):
+    """Set up *operation* on a library of *n* lineups and return the callable."""
+    lineups = synthetic_lineups(n)
+    data = {"lineups": lineups, "settings": {}}
+    cfg_dir = os.path.join(work_dir, "cfg")
+    resource_dir = os.path.join(work_dir, "resource")
+    storage_dir = os.path.join(work_dir, "storage")
+
+    if operation == "parse":
+        raws = [lu["raw_getpos"] for lu in lineups]
+        return lambda: [parse_getpos(raw) for raw in raws]
+    if operation == "generate":
+        return lambda: generate_configs(cfg_dir, resource_dir, data)
+    if operation == "add":
+        generate_configs(cfg_dir, resource_dir, data)
+        extra = synthetic_lineups(n + ADD_SAMPLE)[n:]
+        return lambda: [write_lineup(cfg_dir, resource_dir, lu) for lu in extra]
+    if operation == "delete":
+        generate_configs(cfg_dir, resource_dir, data)
+        victims = lineups[:DELETE_SAMPLE]
+        return lambda: [
+            remove_lineup_files(cfg_dir, resource_dir, lu) for lu in victims
+        ]
+    if operation == "save":
+        return lambda: save_data(storage_dir, data)
+    if operation == "load":
+        save_data(storage_dir, data)
+        return lambda: load_data(storage_dir)
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def measure(operation: str, n: int) -> tuple:
+    """Return ``(seconds, peak_bytes)`` for *operation* at size *n*.
+
+    Time and memory are measured on separate fresh setups because
+    ``tracemalloc`` slows allocation-heavy code down considerably.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        elapsed = _time(prepare(operation, n, work_dir))
+    with tempfile.TemporaryDirectory() as work_dir:
+        peak = _peak(prepare(operation, n, work_dir))
+    return elapsed, peak
+
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("operation", sorted(BUDGETS))
+def test_within_budget(operation, n):
+    elapsed, peak = measure(operation, n)
+    max_seconds, max_bytes = budget(operation, n)
+    assert elapsed <= max_seconds, (
+        f"{operation} x{n}: {elapsed:.3f}s exceeds budget {max_seconds:.3f}s"
+    )
+    assert peak <= max_bytes, (
+        f"{operation} x{n}: peak {peak} bytes exceeds budget {max_bytes:.0f}"
+    )
+
+
+def test_synthetic_lineups_cover_every_combination():
+    lineups = synthetic_lineups(len(MAPS) * len(SIDES) * len(GRENADES))
+    combos = {(lu["map"], lu["side"], lu["grenade"]) for lu in lineups}
+    assert len(combos) == len(MAPS) * len(SIDES) * len(GRENADES)
+    assert len({lu["unique_id"] for lu in lineups}) == len(lineups)
+
+
+def main() -> None:
+    print(f"{'operation':<10} {'n':>8} {'seconds':>10} {'budget':>10} {'peak KiB':>10}")
+    for n in SIZES:
+        for operation in sorted(BUDGETS):
+            elapsed, peak = measure(operation, n)
+            max_seconds, _ = budget(operation, n)
+            print(
+                f"{operation:<10} {n:>8} {elapsed:>10.4f} {max_seconds:>10.4f} "
+                f"{peak / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Tests for src.bulk module."""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from src.bulk import BulkImportError, bulk_add, prepare_lineups, read_rows
+from src.config_generator import read_labels_cfg
+from src.renderer import PLATFORM_ENGLISH
+from src.slot_index import SlotIndex
+from src.storage import JsonStore, load_data
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+def _row(x, map_name="dust2", side="T", **extra):
+    row = {
+        "map": map_name, "side": side, "grenade": "smoke", "name": f"row {x}",
+        "getpos": f"setpos {x * 100} 2 3;setang 4 5 0",
+    }
+    row.update(extra)
+    return row
+
+
+def _dirs(tmp_dir):
+    return (
+        os.path.join(tmp_dir, "storage"),
+        os.path.join(tmp_dir, "cfg"),
+        os.path.join(tmp_dir, "resource"),
+    )
+
+
+class TestReadRows:
+    def test_csv(self, tmp_dir):
+        path = os.path.join(tmp_dir, "lineups.csv")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("map,side,grenade,name,getpos,tab,text\n")
+            fh.write("dust2,T,smoke,xbox,setpos 1 2 3;setang 4 5 0,1,2\n")
+        assert read_rows(path) == [{
+            "map": "dust2", "side": "T", "grenade": "smoke", "name": "xbox",
+            "getpos": "setpos 1 2 3;setang 4 5 0", "tab": "1", "text": "2",
+        }]
+
+    def test_json_library(self, tmp_dir):
+        path = os.path.join(tmp_dir, "lineups.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"lineups": [_row(1)]}, fh)
+        assert read_rows(path) == [_row(1)]
+
+    def test_unknown_extension(self, tmp_dir):
+        with pytest.raises(ValueError):
+            read_rows(os.path.join(tmp_dir, "lineups.txt"))
+
+
+class TestPrepare:
+    def test_allocates_slots_and_ids(self):
+        lineups = prepare_lineups(
+            [_row(1), _row(2, tab="2", text="8"), _row(3)], set(), SlotIndex()
+        )
+        assert [(lu["tab"], lu["text"]) for lu in lineups] == [(0, 1), (2, 8), (0, 2)]
+        assert len({lu["unique_id"] for lu in lineups}) == 3
+
+    def test_reports_every_error(self):
+        slots = SlotIndex()
+        slots.add("dust2", "T", 0, 5)
+        rows = [
+            _row(1, map_name="nowhere"),
+            _row(2, getpos="garbage"),
+            _row(3, tab="0", text="5"),
+            _row(4, tab="1"),
+        ]
+        with pytest.raises(BulkImportError) as info:
+            prepare_lineups(rows, set(), slots)
+        assert [e.split(":")[0] for e in info.value.errors] == [
+            "row 1", "row 2", "row 4", "row 3",
+        ]
+        assert slots.occupied("dust2", "T") == {(0, 5)}
+
+    def test_too_many_for_wheel(self):
+        rows = [_row(i) for i in range(25)]
+        with pytest.raises(BulkImportError, match="24 free slot"):
+            prepare_lineups(rows, set(), SlotIndex())
+
+    def test_duplicates_are_skipped(self):
+        skipped = []
+        lineups = prepare_lineups(
+            [_row(1), _row(1), _row(2)], set(), SlotIndex(),
+            tolerances=(1.0, 0.05), skipped=skipped,
+        )
+        assert len(lineups) == 2
+        assert skipped == ["row 2: duplicates row 1"]
+        # The skipped row is given no slot
+        assert [(lu["tab"], lu["text"]) for lu in lineups] == [(0, 1), (0, 2)]
+
+    def test_duplicate_of_stored_lineup_is_skipped(self):
+        stored = prepare_lineups([_row(1)], set(), SlotIndex())
+        skipped = []
+        lineups = prepare_lineups(
+            [_row(1), _row(2)], set(), SlotIndex.from_lineups(stored), lineups=stored,
+            tolerances=(1.0, 0.05), skipped=skipped,
+        )
+        assert len(lineups) == 1
+        assert skipped == [f"row 1: duplicates lineup {stored[0]['unique_id']}"]
+
+
+class TestBulkAdd:
+    def test_one_commit(self, tmp_dir):
+        storage_dir, cfg_dir, resource_dir = _dirs(tmp_dir)
+        store = JsonStore(storage_dir)
+        data = store.load_data()
+        slots = SlotIndex()
+        rows = [_row(1), _row(2, map_name="nuke", side="CT")]
+        lineups = bulk_add(store, data, rows, cfg_dir, resource_dir, slots, storage_dir)
+
+        assert [lu["unique_id"] for lu in load_data(storage_dir)["lineups"]] == [
+            lu["unique_id"] for lu in lineups
+        ]
+        assert read_labels_cfg(cfg_dir, "nuke", "CT") == {
+            (0, 1): f"#{lineups[1]['message_name']}"
+        }
+        assert slots.occupied("dust2", "T") == {(0, 1)}
+
+    def test_rollback_when_storage_fails(self, tmp_dir):
+        storage_dir, cfg_dir, resource_dir = _dirs(tmp_dir)
+        store = JsonStore(storage_dir)
+        data = store.load_data()
+        bulk_add(store, data, [_row(1)], cfg_dir, resource_dir, SlotIndex(), storage_dir)
+        before = read_labels_cfg(cfg_dir, "dust2", "T")
+
+        def broken(data, lineups):
+            raise OSError("disk full")
+
+        store.add_lineups = broken
+        slots = SlotIndex.from_lineups(data["lineups"])
+        with pytest.raises(OSError):
+            bulk_add(store, data, [_row(2), _row(3)], cfg_dir, resource_dir, slots, storage_dir)
+
+        assert len(data["lineups"]) == 1
+        assert read_labels_cfg(cfg_dir, "dust2", "T") == before
+        with open(os.path.join(resource_dir, PLATFORM_ENGLISH), "rb") as fh:
+            assert b"row 2" not in fh.read()
+        assert slots.occupied("dust2", "T") == {(0, 1)}
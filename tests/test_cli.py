@@ -0,0 +1,357 @@
+"""Tests for src.cli module."""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from src.cli import main
+from src.config_generator import read_labels_cfg
+from src.storage import load_data
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def dirs():
+    with tempfile.TemporaryDirectory() as d:
+        yield os.path.join(d, "storage"), os.path.join(d, "cs2")
+
+
+def _run(dirs, *argv):
+    storage_dir, cs2_path = dirs
+    return main(["--storage-dir", storage_dir, "--cs2-path", cs2_path, *argv])
+
+
+def _cfg_dir(dirs):
+    return os.path.join(dirs[1], "csgo", "cfg", "CSAFAP")
+
+
+class TestCommands:
+    def test_add_list_delete(self, dirs, capsys):
+        assert _run(
+            dirs, "add", "--map", "dust2", "--side", "T", "--grenade", "smoke",
+            "--name", "xbox smoke", "--getpos", "setpos 1 2 3; setang 4 5 0",
+        ) == 0
+        lineups = load_data(dirs[0])["lineups"]
+        assert len(lineups) == 1
+        unique_id = lineups[0]["unique_id"]
+        assert read_labels_cfg(_cfg_dir(dirs), "dust2", "T") == {
+            (0, 1): f"#CFG_DUST2_SMOKE_{unique_id}"
+        }
+
+        capsys.readouterr()
+        assert _run(dirs, "list", "--map", "dust2") == 0
+        assert unique_id in capsys.readouterr().out
+
+        assert _run(dirs, "delete", unique_id) == 0
+        assert load_data(dirs[0])["lineups"] == []
+        assert read_labels_cfg(_cfg_dir(dirs), "dust2", "T") == {}
+
+    def test_delete_many(self, dirs, capsys):
+        for x, name in enumerate(("a", "b", "c")):
+            _run(
+                dirs, "add", "--map", "dust2", "--side", "T", "--grenade", "smoke",
+                "--name", name, "--getpos", f"setpos {x * 100} 2 3; setang 4 5 0",
+            )
+        ids = [lu["unique_id"] for lu in load_data(dirs[0])["lineups"]]
+        assert _run(dirs, "delete", ids[0], ids[2], "NOPE00") == 1
+        assert "NOPE00 not found" in capsys.readouterr().err
+        assert [lu["unique_id"] for lu in load_data(dirs[0])["lineups"]] == [ids[1]]
+        assert set(read_labels_cfg(_cfg_dir(dirs), "dust2", "T")) == {(0, 2)}
+
+    def test_add_rejects_occupied_slot(self, dirs, capsys):
+        argv = [
+            "add", "--map", "nuke", "--side", "CT", "--grenade", "smoke",
+            "--name", "a", "--getpos", "setpos 1 2 3; setang 4 5 0",
+            "--tab", "1", "--text", "2", "--allow-duplicate",
+        ]
+        assert _run(dirs, *argv) == 0
+        assert _run(dirs, *argv) == 1
+        assert "already occupied" in capsys.readouterr().err
+        assert _run(dirs, *argv, "--force") == 0
+
+    def test_import_condump(self, dirs, capsys):
+        log = os.path.join(os.path.dirname(dirs[0]), "condump000.txt")
+        with open(log, "w", encoding="utf-8") as fh:
+            for i in range(30):
+                fh.write("] getpos\n")
+                fh.write(f"setpos {i} 0 0; setang 0 {i} 0\n")
+        status = _run(
+            dirs, "import", log, "--map", "mirage", "--side", "CT",
+            "--grenade", "smoke", "--name-prefix", "session",
+        )
+        # 24 slots per map/side, so 6 lineups are left over.
+        assert status == 1
+        assert "Skipped 6" in capsys.readouterr().err
+        lineups = load_data(dirs[0])["lineups"]
+        assert len(lineups) == 24
+        assert lineups[0]["name"] == "session 1"
+        labels = read_labels_cfg(_cfg_dir(dirs), "mirage", "CT")
+        assert len(labels) == 24
+        assert labels[(0, 1)] == f"#{lineups[0]['message_name']}"
+        assert lineups[0]["message_name"].endswith(lineups[0]["unique_id"])
+
+    def test_import_condump_inserts_rows_only(self, dirs, monkeypatch):
+        from src.sqlite_storage import SqliteStore
+        from src.storage import open_store
+
+        os.makedirs(dirs[0])
+        open_store(dirs[0], "sqlite").close()
+        log = os.path.join(os.path.dirname(dirs[0]), "condump000.txt")
+        with open(log, "w", encoding="utf-8") as fh:
+            fh.write("setpos 1 0 0; setang 0 1 0\nsetpos 2 0 0; setang 0 2 0\n")
+
+        def rewrite(self, data):
+            raise AssertionError("import rewrote the whole library")
+
+        monkeypatch.setattr(SqliteStore, "save_data", rewrite)
+        assert _run(
+            dirs, "import", log, "--map", "nuke", "--side", "T", "--grenade", "smoke",
+        ) == 0
+        store = open_store(dirs[0])
+        assert len(store.load_data()["lineups"]) == 2
+        store.close()
+
+    def test_generate_and_slots(self, dirs, capsys):
+        _run(
+            dirs, "add", "--map", "train", "--side", "T", "--grenade", "decoy",
+            "--name", "a", "--getpos", "setpos 1 2 3; setang 4 5 0",
+        )
+        capsys.readouterr()
+        assert _run(dirs, "generate") == 0
+        assert "file(s) updated" in capsys.readouterr().out
+        assert _run(dirs, "slots", "--map", "train", "--side", "T") == 0
+        out = capsys.readouterr().out
+        assert "tab=0 text=1" in out
+        assert "First free: tab=0 text=2" in out
+
+    def test_add_rejects_duplicate(self, dirs, capsys):
+        argv = [
+            "add", "--map", "nuke", "--side", "CT", "--grenade", "smoke",
+            "--name", "a", "--getpos",
+        ]
+        assert _run(dirs, *argv, "setpos 1 2 3; setang 4 5 0") == 0
+        assert _run(dirs, *argv, "setpos 1.5 2 3; setang 4.01 5 0") == 1
+        assert "duplicates" in capsys.readouterr().err
+        assert _run(
+            dirs, *argv, "setpos 1.5 2 3; setang 4.01 5 0", "--position-tolerance", "0.1"
+        ) == 0
+
+    def test_dedupe_report_and_merge(self, dirs, capsys):
+        log = os.path.join(os.path.dirname(dirs[0]), "condump000.txt")
+        with open(log, "w", encoding="utf-8") as fh:
+            for i in range(3):
+                fh.write(f"setpos {i * 100} 0 0; setang 0 {i} 0\n")
+        argv = ["import", log, "--map", "nuke", "--side", "T", "--grenade", "smoke"]
+        assert _run(dirs, *argv) == 0
+        # Importing the same log again only finds duplicates
+        capsys.readouterr()
+        assert _run(dirs, *argv) == 0
+        assert "Skipped 3 duplicate" in capsys.readouterr().out
+        assert _run(dirs, *argv, "--allow-duplicate") == 0
+        assert len(load_data(dirs[0])["lineups"]) == 6
+
+        capsys.readouterr()
+        assert _run(dirs, "dedupe") == 0
+        assert "3 duplicate(s)" in capsys.readouterr().out
+        assert len(load_data(dirs[0])["lineups"]) == 6
+        assert _run(dirs, "dedupe", "--merge") == 0
+        assert len(load_data(dirs[0])["lineups"]) == 3
+        assert len(read_labels_cfg(_cfg_dir(dirs), "nuke", "T")) == 3
+
+    def test_sharded_layout(self, dirs):
+        _run(
+            dirs, "add", "--map", "vertigo", "--side", "CT", "--grenade", "smoke",
+            "--name", "a", "--getpos", "setpos 1 2 3; setang 4 5 0",
+        )
+        assert _run(dirs, "generate", "--layout", "sharded") == 0
+        assert load_data(dirs[0])["settings"]["alias_layout"] == "sharded"
+        shard = os.path.join(_cfg_dir(dirs), "vertigo_aliases.cfg")
+        unique_id = load_data(dirs[0])["lineups"][0]["unique_id"]
+        with open(shard, encoding="utf-8") as fh:
+            assert f"smoke_yaw_{unique_id}" in fh.read()
+
+        # Later adds and deletes follow the stored layout
+        _run(
+            dirs, "add", "--map", "vertigo", "--side", "CT", "--grenade", "smoke",
+            "--name", "b", "--getpos", "setpos 100 2 3; setang 4 5 0",
+        )
+        assert _run(dirs, "delete", unique_id) == 0
+        with open(shard, encoding="utf-8") as fh:
+            aliases = fh.read()
+        assert unique_id not in aliases and aliases.count("smoke_yaw_") == 1
+        with open(os.path.join(_cfg_dir(dirs), "main.cfg"), encoding="utf-8") as fh:
+            assert "_yaw_" not in fh.read()
+
+        assert _run(dirs, "generate", "--layout", "single") == 0
+        assert not os.path.exists(shard)
+
+    def test_compact(self, dirs, capsys):
+        for x in range(4):
+            _run(
+                dirs, "add", "--map", "ancient", "--side", "T", "--grenade", "smoke",
+                "--name", f"n{x}", "--getpos", f"setpos {x * 100} 0 0; setang 0 0 0",
+            )
+        ids = [lu["unique_id"] for lu in load_data(dirs[0])["lineups"]]
+        _run(dirs, "delete", ids[0], ids[2])
+        capsys.readouterr()
+        assert _run(dirs, "compact", "--map", "ancient") == 0
+        assert "Moved 2 slot(s)" in capsys.readouterr().out
+        slots = {lu["unique_id"]: (lu["tab"], lu["text"]) for lu in load_data(dirs[0])["lineups"]}
+        assert slots == {ids[1]: (0, 1), ids[3]: (0, 2)}
+        assert set(read_labels_cfg(_cfg_dir(dirs), "ancient", "T")) == {(0, 1), (0, 2)}
+
+    def test_sensitivity_rewrites_only_main_cfg(self, dirs, capsys):
+        _run(
+            dirs, "add", "--map", "overpass", "--side", "T", "--grenade", "smoke",
+            "--name", "a", "--getpos", "setpos 1 2 3; setang 4.4 5.5 0",
+        )
+        _run(dirs, "generate")
+        capsys.readouterr()
+        assert _run(dirs, "sensitivity", "2") == 0
+        out = capsys.readouterr().out
+        assert "Recomputed 1 lineup(s)" in out
+        assert "1 file(s) updated" in out
+        lineup = load_data(dirs[0])["lineups"][0]
+        assert lineup["yaw_value"] == 5.5 / (2 * 0.022)
+        with open(os.path.join(_cfg_dir(dirs), "main.cfg"), encoding="utf-8") as fh:
+            assert f'"yaw {lineup["yaw_value"]} 1 1"' in fh.read()
+        assert _run(dirs, "sensitivity", "0") == 1
+
+    def test_import_file_all_or_nothing(self, dirs, capsys):
+        csv_path = os.path.join(os.path.dirname(dirs[0]), "lineups.csv")
+        with open(csv_path, "w", encoding="utf-8") as fh:
+            fh.write("map,side,grenade,name,getpos\n")
+            fh.write("mirage,CT,smoke,window,setpos 1 2 3;setang 4 5 0\n")
+            fh.write("mirage,CT,flash,bad,setpos 9 9 9;setang 4 5 0\n")
+        assert _run(dirs, "import-file", csv_path) == 1
+        assert "row 2: unknown grenade 'flash'" in capsys.readouterr().err
+        assert load_data(dirs[0])["lineups"] == []
+
+        with open(csv_path, "w", encoding="utf-8") as fh:
+            fh.write("map,side,grenade,name,getpos,tab,text\n")
+            fh.write("mirage,CT,smoke,window,setpos 1 2 3;setang 4 5 0,,\n")
+            fh.write("mirage,CT,decoy,fake,setpos 9 9 9;setang 4 5 0,2,8\n")
+        assert _run(dirs, "import-file", csv_path) == 0
+        assert "Imported 2 lineup(s)." in capsys.readouterr().out
+        assert set(read_labels_cfg(_cfg_dir(dirs), "mirage", "CT")) == {(0, 1), (2, 8)}
+
+        # Importing the file again skips every row instead of failing
+        assert _run(dirs, "import-file", csv_path) == 0
+        out = capsys.readouterr().out
+        assert "Skipped row 1: duplicates lineup" in out
+        assert "Imported 0 lineup(s)." in out
+        assert len(load_data(dirs[0])["lineups"]) == 2
+
+    def test_import_file_writes_every_install(self, dirs, capsys):
+        second = dirs[1] + "_test_branch"
+        csv_path = os.path.join(os.path.dirname(dirs[0]), "lineups.csv")
+        with open(csv_path, "w", encoding="utf-8") as fh:
+            fh.write("map,side,grenade,name,getpos\n")
+            fh.write("mirage,CT,smoke,window,setpos 1 2 3;setang 4 5 0\n")
+        assert _run(dirs, "--cs2-path", second, "import-file", csv_path) == 0
+        for cs2_path in (dirs[1], second):
+            cfg_dir = os.path.join(cs2_path, "csgo", "cfg", "CSAFAP")
+            assert list(read_labels_cfg(cfg_dir, "mirage", "CT")) == [(0, 1)]
+
+    def test_edits_reach_every_install(self, dirs, capsys):
+        second = dirs[1] + "_test_branch"
+        both = ("--cs2-path", second)
+        for x, name in enumerate(("a", "b", "c", "c2")):
+            assert _run(
+                dirs, *both, "add", "--map", "dust2", "--side", "T", "--grenade",
+                "smoke", "--name", name,
+                "--getpos", f"setpos {x * 100 if x < 3 else 200.5} 2 3; setang 4 5 0",
+                "--allow-duplicate",
+            ) == 0
+        ids = [lu["unique_id"] for lu in load_data(dirs[0])["lineups"]]
+        assert _run(dirs, *both, "delete", ids[1]) == 0
+        assert _run(dirs, *both, "dedupe", "--merge") == 0
+        assert _run(dirs, *both, "compact") == 0
+
+        second_cfg = os.path.join(second, "csgo", "cfg", "CSAFAP")
+        labels = read_labels_cfg(_cfg_dir(dirs), "dust2", "T")
+        assert set(labels) == {(0, 1), (0, 2)}
+        assert read_labels_cfg(second_cfg, "dust2", "T") == labels
+        for name in ("main.cfg", "dust2_T_commands.cfg"):
+            with open(os.path.join(_cfg_dir(dirs), name), encoding="utf-8") as fh:
+                expected = fh.read()
+            with open(os.path.join(second_cfg, name), encoding="utf-8") as fh:
+                assert fh.read() == expected
+
+    def test_reconcile_repair(self, dirs, capsys):
+        _run(
+            dirs, "add", "--map", "dust2", "--side", "T", "--grenade", "smoke",
+            "--name", "a", "--getpos", "setpos 1 2 3; setang 4 5 0",
+        )
+        with open(os.path.join(_cfg_dir(dirs), "dust2_T_labels.cfg"), "a") as fh:
+            fh.write('cl_radial_radio_tab_2_text_8 "#CFG_DUST2_SMOKE_GONE00"\n')
+        capsys.readouterr()
+        assert _run(dirs, "reconcile") == 0
+        out = capsys.readouterr().out
+        assert "orphan_label\tdust2_T_labels.cfg\ttab=2 text=8" in out
+        assert "1 difference(s)." in out
+
+        assert _run(dirs, "reconcile", "--repair") == 0
+        assert "1 file(s) rewritten." in capsys.readouterr().out
+        assert _run(dirs, "reconcile") == 0
+        assert "Storage and config files agree." in capsys.readouterr().out
+
+    def test_generate_to_several_installs(self, dirs, capsys):
+        second = dirs[1] + "_test_branch"
+        _run(
+            dirs, "add", "--map", "train", "--side", "T", "--grenade", "decoy",
+            "--name", "a", "--getpos", "setpos 1 2 3; setang 4 5 0",
+        )
+        assert _run(dirs, "--cs2-path", second, "generate") == 0
+        for cs2_path in (dirs[1], second):
+            cfg_dir = os.path.join(cs2_path, "csgo", "cfg", "CSAFAP")
+            assert list(read_labels_cfg(cfg_dir, "train", "T")) == [(0, 1)]
+
+    def test_generate_reports_failed_install(self, dirs, capsys):
+        os.makedirs(os.path.dirname(dirs[1]), exist_ok=True)
+        broken = dirs[1] + "_file"
+        with open(broken, "w", encoding="utf-8"):
+            pass
+        assert _run(dirs, "--cs2-path", broken, "generate") == 1
+        assert broken in capsys.readouterr().err
+        assert os.path.isdir(_cfg_dir(dirs))
+
+    def test_missing_cs2_path(self, dirs, capsys):
+        assert main(["--storage-dir", dirs[0], "generate"]) == 1
+        assert "No CS2 installation path" in capsys.readouterr().err
+
+
+class TestHeadless:
+    def test_never_imports_tkinter(self, dirs):
+        code = (
+            "import sys\n"
+            "from src.cli import main\n"
+            f"main(['--storage-dir', {dirs[0]!r}, 'list'])\n"
+            "assert 'tkinter' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=_ROOT, check=True)
+
+
+class TestNear:
+    def test_nearest_and_radius(self, dirs, capsys):
+        for name, x in (("far", 2000), ("close", 10), ("mid", 300)):
+            _run(
+                dirs, "add", "--map", "inferno", "--side", "T", "--grenade", "smoke",
+                "--name", name, "--getpos", f"setpos {x} 0 0; setang 4 5 0",
+            )
+        capsys.readouterr()
+        getpos = "setpos 0 0 0; setang 0 0 0"
+        assert _run(dirs, "near", "--map", "inferno", "--getpos", getpos, "-k", "2") == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        assert "close" in lines[0] and "mid" in lines[1]
+
+        assert _run(
+            dirs, "near", "--map", "inferno", "--getpos", getpos, "--radius", "100"
+        ) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 1 and "close" in lines[0]
@@ -5,20 +5,33 @@ import tempfile
 
 import pytest
 
+import src.config_generator as config_generator
+import src.fileio as fileio
 from src.config_generator import (
+    PLATFORM_BLOCK_BEGIN,
+    PLATFORM_BLOCK_END,
     append_command,
     append_label,
     append_main_cfg,
     append_platform_english,
+    cs2_paths,
     find_first_empty_slot,
+    format_shard_exec,
     get_occupied_slots,
+    invalidate_parse_cache,
     read_commands_cfg,
     read_labels_cfg,
+    read_slots_cfg,
     remove_from_main_cfg,
     remove_from_platform_english,
+    remove_ids_from_main_cfg,
+    remove_lineups_files,
+    remove_messages_from_platform_english,
     remove_slot_from_commands,
     remove_slot_from_labels,
+    split_platform_english,
 )
+from src.fileio import sync_batch
 
 
 @pytest.fixture
@@ -27,6 +40,16 @@ def tmp_dir():
         yield d
 
 
+class TestCs2Paths:
+    def test_primary_first_without_repeats(self):
+        settings = {"cs2_path": "/a", "extra_cs2_paths": ["/b", " ", "/a", "/c "]}
+        assert cs2_paths(settings) == ["/a", "/b", "/c"]
+
+    def test_extra_paths_without_primary(self):
+        assert cs2_paths({"cs2_path": "", "extra_cs2_paths": ["/b"]}) == ["/b"]
+        assert cs2_paths({}) == []
+
+
 class TestAppendMainCfg:
     def test_creates_file_and_appends(self, tmp_dir):
         append_main_cfg(tmp_dir, "smoke", "ABC123", 1234.5, -678.9)
@@ -43,6 +66,20 @@ class TestAppendMainCfg:
         assert "ID0001" in content
         assert "ID0002" in content
 
+    def test_append_is_atomic_and_joins_batch(self, tmp_dir, monkeypatch):
+        append_main_cfg(tmp_dir, "smoke", "ID0001", 100.0, 200.0)
+        synced = []
+        monkeypatch.setattr(
+            fileio, "_sync_batch", lambda paths, directories=(): synced.extend(paths)
+        )
+        with sync_batch():
+            append_main_cfg(tmp_dir, "smoke", "ID0002", 300.0, 400.0)
+        path = os.path.join(tmp_dir, "main.cfg")
+        assert synced == [os.path.abspath(path)]
+        assert os.listdir(tmp_dir) == ["main.cfg"]
+        lines = open(path, encoding="utf-8").read().splitlines()
+        assert len(lines) == 4 and "ID0001" in lines[0] and "ID0002" in lines[3]
+
 
 class TestAppendPlatformEnglish:
     def test_creates_and_appends(self, tmp_dir):
@@ -53,6 +90,78 @@ class TestAppendPlatformEnglish:
         assert '"T \\n Smoke"' in content
 
 
+class TestPlatformEnglishManagedBlock:
+    def _path(self, tmp_dir):
+        return os.path.join(tmp_dir, "platform_english.txt")
+
+    def test_entries_live_inside_block(self, tmp_dir):
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_A", "A")
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_B", "B")
+        lines = open(self._path(tmp_dir), encoding="utf-8").read().splitlines()
+        assert lines[0] == PLATFORM_BLOCK_BEGIN
+        assert lines[-1] == PLATFORM_BLOCK_END
+        assert len(lines) == 4
+
+    def test_surrounding_content_is_preserved(self, tmp_dir):
+        path = self._path(tmp_dir)
+        head = '"lang"\n{\n"Tokens"\n{\n"Token_A"    "A"\n'
+        tail = '"Token_Z"    "CFG_DUST2_SMOKE_X mentioned here"\n}\n}\n'
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(head + PLATFORM_BLOCK_BEGIN + "\n" + PLATFORM_BLOCK_END + "\n" + tail)
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_X", "X")
+        remove_from_platform_english(tmp_dir, "CFG_DUST2_SMOKE_X")
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_Y", "Y")
+        content = open(path, encoding="utf-8").read()
+        assert content.startswith(head)
+        assert content.endswith(tail)
+        assert '"CFG_DUST2_SMOKE_Y"' in content
+        assert '"CFG_DUST2_SMOKE_X"' not in content
+
+    def test_migrates_legacy_entries(self, tmp_dir):
+        path = self._path(tmp_dir)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write('"Token_A"    "A"\n"CFG_DUST2_SMOKE_OLD"    "Old"\n')
+        head, entries, tail = split_platform_english(path)
+        assert head == b'"Token_A"    "A"\n'
+        assert entries == ['"CFG_DUST2_SMOKE_OLD"    "Old"']
+        assert tail == b""
+
+    def test_append_at_end_is_in_place(self, tmp_dir):
+        path = self._path(tmp_dir)
+        head = '"lang"\n{\n"Token_A"    "A"\n'
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(head + PLATFORM_BLOCK_BEGIN + "\n" + PLATFORM_BLOCK_END + "\n")
+        inode = os.stat(path).st_ino
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_A", "A")
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_B", "B")
+        # Written over the END marker, not renamed over the file
+        assert os.stat(path).st_ino == inode
+        content = open(path, encoding="utf-8").read()
+        assert content.startswith(head)
+        assert content.endswith(PLATFORM_BLOCK_END + "\n")
+        _, entries, tail = split_platform_english(path)
+        assert [e.split()[0] for e in entries] == [
+            '"CFG_DUST2_SMOKE_A"', '"CFG_DUST2_SMOKE_B"'
+        ]
+        assert tail == b""
+
+    def test_append_before_trailing_content_rewrites(self, tmp_dir):
+        path = self._path(tmp_dir)
+        tail = "}\n"
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(PLATFORM_BLOCK_BEGIN + "\n" + PLATFORM_BLOCK_END + "\n" + tail)
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_A", "A")
+        _, entries, rest = split_platform_english(path)
+        assert len(entries) == 1
+        assert rest == tail.encode("utf-8")
+
+    def test_append_same_message_replaces(self, tmp_dir):
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_A", "Old")
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_A", "New")
+        _, entries, _ = split_platform_english(self._path(tmp_dir))
+        assert entries == ['"CFG_DUST2_SMOKE_A"                    "New"']
+
+
 class TestLabelsAndCommands:
     def test_read_empty(self, tmp_dir):
         result = read_labels_cfg(tmp_dir, "dust2", "T")
@@ -122,3 +231,129 @@ class TestRemoval:
         slots = read_commands_cfg(tmp_dir, "dust2", "T")
         assert (0, 1) not in slots
         assert (0, 2) in slots
+
+    def test_remove_slot_from_commands_keeps_shard_exec(self, tmp_dir):
+        append_command(tmp_dir, "dust2", "T", 0, 1, "smoke", "ID1", "sharded")
+        append_command(tmp_dir, "dust2", "T", 0, 2, "smoke", "ID2", "sharded")
+        remove_slot_from_commands(tmp_dir, "dust2", "T", 0, 1, "sharded")
+        path = os.path.join(tmp_dir, "dust2_T_commands.cfg")
+        lines = open(path, encoding="utf-8").read().splitlines()
+        assert lines[0] == format_shard_exec("dust2")
+        assert set(read_commands_cfg(tmp_dir, "dust2", "T")) == {(0, 2)}
+
+
+class TestBatchRemoval:
+    def _lineup(self, unique_id, map_name, side, tab, text):
+        return {
+            "unique_id": unique_id,
+            "map": map_name,
+            "side": side,
+            "grenade": "smoke",
+            "message_name": f"CFG_{map_name.upper()}_SMOKE_{unique_id}",
+            "tab": tab,
+            "text": text,
+        }
+
+    def test_remove_ids_from_main_cfg(self, tmp_dir):
+        for uid in ("AAA111", "BBB222", "CCC333"):
+            append_main_cfg(tmp_dir, "smoke", uid, 1.0, 2.0)
+        remove_ids_from_main_cfg(tmp_dir, {"AAA111", "CCC333"})
+        content = open(os.path.join(tmp_dir, "main.cfg"), encoding="utf-8").read()
+        assert "AAA111" not in content
+        assert "CCC333" not in content
+        assert content.count("BBB222") == 2
+
+    def test_remove_ids_matches_exact_id(self, tmp_dir):
+        append_main_cfg(tmp_dir, "smoke", "AB", 1.0, 2.0)
+        append_main_cfg(tmp_dir, "smoke", "ABCDEF", 1.0, 2.0)
+        remove_ids_from_main_cfg(tmp_dir, {"AB"})
+        content = open(os.path.join(tmp_dir, "main.cfg"), encoding="utf-8").read()
+        assert "smoke_yaw_AB " not in content
+        assert "smoke_yaw_ABCDEF" in content
+
+    def test_remove_messages_keeps_other_lines(self, tmp_dir):
+        path = os.path.join(tmp_dir, "platform_english.txt")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write('"GameToken"    "CFG_DUST2_SMOKE_X1 is mentioned"\n')
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_X1", "Name1")
+        append_platform_english(tmp_dir, "CFG_DUST2_SMOKE_X2", "Name2")
+        remove_messages_from_platform_english(tmp_dir, {"CFG_DUST2_SMOKE_X1"})
+        content = open(path, encoding="utf-8").read()
+        assert '"GameToken"' in content
+        assert '"CFG_DUST2_SMOKE_X1"' not in content
+        assert '"CFG_DUST2_SMOKE_X2"' in content
+
+    def test_remove_lineups_files(self, tmp_dir):
+        lineups = [
+            self._lineup("ID0001", "dust2", "T", 0, 1),
+            self._lineup("ID0002", "dust2", "T", 0, 2),
+            self._lineup("ID0003", "dust2", "T", 0, 3),
+            self._lineup("ID0004", "nuke", "CT", 1, 1),
+        ]
+        for lu in lineups:
+            append_main_cfg(tmp_dir, "smoke", lu["unique_id"], 1.0, 2.0)
+            append_platform_english(tmp_dir, lu["message_name"], "Name")
+            append_label(
+                tmp_dir, lu["map"], lu["side"], lu["tab"], lu["text"],
+                lu["message_name"],
+            )
+            append_command(
+                tmp_dir, lu["map"], lu["side"], lu["tab"], lu["text"],
+                "smoke", lu["unique_id"],
+            )
+        remove_lineups_files(tmp_dir, tmp_dir, [lineups[0], lineups[2], lineups[3]])
+
+        assert set(read_labels_cfg(tmp_dir, "dust2", "T")) == {(0, 2)}
+        assert set(read_commands_cfg(tmp_dir, "dust2", "T")) == {(0, 2)}
+        assert read_labels_cfg(tmp_dir, "nuke", "CT") == {}
+        main = open(os.path.join(tmp_dir, "main.cfg"), encoding="utf-8").read()
+        assert "ID0002" in main
+        assert "ID0001" not in main and "ID0004" not in main
+
+
+class TestParseCache:
+    @pytest.fixture
+    def parses(self, monkeypatch):
+        invalidate_parse_cache()
+        calls = []
+        real = config_generator._parse_slots
+
+        def counting(path, pattern):
+            calls.append(os.path.basename(path))
+            return real(path, pattern)
+
+        monkeypatch.setattr(config_generator, "_parse_slots", counting)
+        return calls
+
+    def test_unchanged_file_is_parsed_once(self, tmp_dir, parses):
+        append_label(tmp_dir, "dust2", "T", 0, 1, "CFG_A")
+        append_command(tmp_dir, "dust2", "T", 0, 1, "smoke", "A")
+        parses.clear()
+        for _ in range(3):
+            labels, commands = read_slots_cfg(tmp_dir, "dust2", "T")
+        assert labels == {(0, 1): "#CFG_A"}
+        assert commands == {(0, 1): 'cmd";smoke_yaw_A;smoke_pitch_A;'}
+        assert parses == ["dust2_T_labels.cfg", "dust2_T_commands.cfg"]
+
+    def test_own_writes_and_external_edits_are_seen(self, tmp_dir, parses):
+        append_label(tmp_dir, "dust2", "T", 0, 1, "CFG_A")
+        append_label(tmp_dir, "dust2", "T", 0, 2, "CFG_B")
+        assert set(read_labels_cfg(tmp_dir, "dust2", "T")) == {(0, 1), (0, 2)}
+        with open(os.path.join(tmp_dir, "dust2_T_labels.cfg"), "a", encoding="utf-8") as fh:
+            fh.write('cl_radial_radio_tab_1_text_1 "#CFG_C"\n')
+        assert set(read_labels_cfg(tmp_dir, "dust2", "T")) == {(0, 1), (0, 2), (1, 1)}
+        os.remove(os.path.join(tmp_dir, "dust2_T_labels.cfg"))
+        assert read_labels_cfg(tmp_dir, "dust2", "T") == {}
+
+    def test_returned_dict_is_a_copy(self, tmp_dir, parses):
+        append_label(tmp_dir, "dust2", "T", 0, 1, "CFG_A")
+        read_labels_cfg(tmp_dir, "dust2", "T").clear()
+        assert read_labels_cfg(tmp_dir, "dust2", "T") == {(0, 1): "#CFG_A"}
+
+    def test_cache_is_bounded(self, tmp_dir, parses, monkeypatch):
+        monkeypatch.setattr(config_generator, "PARSE_CACHE_SIZE", 2)
+        for side in ("T", "CT"):
+            for map_name in ("dust2", "nuke"):
+                append_label(tmp_dir, map_name, side, 0, 1, "CFG_A")
+                read_labels_cfg(tmp_dir, map_name, side)
+        assert len(config_generator._parse_cache) == 2
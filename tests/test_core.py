@@ -1,5 +1,8 @@
 """Tests for src.core module."""
 
+import os
+import tempfile
+
 import pytest
 
 from src.core import (
@@ -8,7 +11,12 @@ from src.core import (
     extract_yaw_pitch,
     format_lineup_name,
     generate_unique_id,
+    iter_condump,
+    iter_getpos,
+    lineup_angles,
+    make_lineup,
     parse_getpos,
+    recompute_values,
 )
 
 
@@ -38,6 +46,45 @@ class TestParseGetpos:
             parse_getpos("setpos 1.0 2.0 3.0")
 
 
+class TestIterGetpos:
+    def test_yields_records_with_line_numbers(self):
+        lines = [
+            "Connected to server\n",
+            "] getpos\n",
+            "setpos 1.0 2.0 3.0;setang 4.0 5.0 0.0\n",
+            "some chatter\n",
+            "setpos -7.5 8.0 9.0; setang -10.0 11.0 0.0\n",
+        ]
+        records = list(iter_getpos(lines))
+        assert [r[0] for r in records] == [3, 5]
+        assert records[0][1] == "setpos 1.0 2.0 3.0;setang 4.0 5.0 0.0"
+        assert records[1][2] == {"setpos": [-7.5, 8.0, 9.0], "setang": [-10.0, 11.0, 0.0]}
+
+    def test_skips_malformed_numbers(self):
+        lines = ["setpos 1.2.3 0 0; setang 0 0 0", "setpos 1 2 3; setang 4 5 6"]
+        records = list(iter_getpos(lines))
+        assert [r[0] for r in records] == [2]
+
+    def test_is_lazy(self):
+        def lines():
+            yield "setpos 1 2 3; setang 4 5 6"
+            raise AssertionError("consumed too far")
+
+        assert next(iter_getpos(lines()))[0] == 1
+
+    def test_iter_condump(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "condump000.txt")
+            with open(path, "w", encoding="utf-8") as fh:
+                for i in range(100):
+                    fh.write(f"setpos {i}.0 0.0 0.0; setang 0.0 {i}.0 0.0\n")
+                    fh.write("noise\n")
+            records = list(iter_condump(path))
+        assert len(records) == 100
+        assert records[-1][0] == 199
+        assert records[-1][2]["setang"] == [0.0, 99.0, 0.0]
+
+
 class TestExtractYawPitch:
     def test_basic(self):
         setang = [90.00, -45.00, 0.00]
@@ -58,6 +105,31 @@ class TestCalculateValue:
     def test_zero(self):
         assert calculate_value(0.0) == 0.0
 
+    def test_sensitivity(self):
+        assert calculate_value(90.0, 2.0) == 90.0 / (2.0 * 0.022)
+        assert calculate_value(90.0, 1.0) == 90.0 / 0.022
+
+
+class TestRecomputeValues:
+    def test_matches_calculate_value(self):
+        lineups = [
+            make_lineup(f"ID000{i}", "T", "dust2", "smoke", "x",
+                        f"setpos 0 0 0; setang {i * 3.5} {-i * 7.25} 0", 0, 1)
+            for i in range(1, 6)
+        ]
+        assert recompute_values(lineups, 1.0) == 0
+        assert recompute_values(lineups, 2.5) == 5
+        for i, lu in enumerate(lineups, start=1):
+            assert lu["yaw_value"] == calculate_value(-i * 7.25, 2.5)
+            assert lu["pitch_value"] == calculate_value(i * 3.5, 2.5)
+        assert recompute_values(lineups, 2.5) == 0
+
+    def test_legacy_lineup_angles_parsed_once(self):
+        lineup = {"raw_getpos": "setpos 1 2 3; setang 10 20 0"}
+        assert lineup_angles(lineup) == (20.0, 10.0)
+        lineup["raw_getpos"] = "garbage"
+        assert lineup_angles(lineup) == (20.0, 10.0)
+
 
 class TestGenerateUniqueId:
     def test_length_and_characters(self):
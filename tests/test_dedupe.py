@@ -0,0 +1,93 @@
+"""Tests for src.dedupe module."""
+
+import random
+
+from src.dedupe import DedupeIndex, find_duplicates, tolerances
+
+
+def _lineup(unique_id, x=0.0, y=0.0, z=0.0, pitch=0.0, yaw=0.0, grenade="smoke", side="T"):
+    return {
+        "unique_id": unique_id,
+        "map": "dust2",
+        "side": side,
+        "grenade": grenade,
+        "name": unique_id,
+        "raw_getpos": f"setpos {x} {y} {z}; setang {pitch} {yaw} 0.00",
+        "tab": 0,
+        "text": 1,
+    }
+
+
+class TestDedupeIndex:
+    def test_exact_duplicate(self):
+        index = DedupeIndex.from_lineups([_lineup("A", 10, 20, 30, 5, 90)])
+        found = index.find(_lineup("B", 10, 20, 30, 5, 90))
+        assert [lu["unique_id"] for lu in found] == ["A"]
+
+    def test_within_tolerance_across_bucket_edges(self):
+        index = DedupeIndex(position_tolerance=1.0, angle_tolerance=0.1)
+        # 1.99 and 2.01 fall into different 2-unit buckets
+        index.add(_lineup("A", 1.99, 0, 0, 0, 0))
+        assert index.find(_lineup("B", 2.01, 0, 0, 0.05, 0))
+        assert not index.find(_lineup("C", 3.5, 0, 0, 0, 0))
+        assert not index.find(_lineup("D", 1.99, 0, 0, 0.5, 0))
+
+    def test_yaw_wraps_at_180(self):
+        index = DedupeIndex(position_tolerance=1.0, angle_tolerance=0.05)
+        index.add(_lineup("A", 0, 0, 0, 0, 179.99))
+        assert index.find(_lineup("B", 0, 0, 0, 0, -179.99))
+        # 180 is normalised to -180
+        assert index.find(_lineup("C", 0, 0, 0, 0, 180.0))
+        assert not index.find(_lineup("D", 0, 0, 0, 0, -179.9))
+        index = DedupeIndex.from_lineups([_lineup("E", 0, 0, 0, 0, -180.0)], 1.0, 0.05)
+        assert index.find(_lineup("F", 0, 0, 0, 0, 179.97))
+
+    def test_different_grenade_or_side_is_not_duplicate(self):
+        index = DedupeIndex.from_lineups([_lineup("A")])
+        assert not index.find(_lineup("B", grenade="decoy"))
+        assert not index.find(_lineup("C", side="CT"))
+
+    def test_ignores_itself_and_removed(self):
+        lineup = _lineup("A")
+        index = DedupeIndex.from_lineups([lineup])
+        assert index.find(lineup) == []
+        index.remove("A")
+        assert index.find(_lineup("B")) == []
+        assert len(index) == 0
+
+    def test_zero_tolerance_is_exact(self):
+        index = DedupeIndex.from_lineups([_lineup("A", 1.5)], 0.0, 0.0)
+        assert index.find(_lineup("B", 1.5))
+        assert not index.find(_lineup("C", 1.5001))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(5)
+        lineups = [
+            _lineup(f"L{i}", rng.randint(0, 20) * 0.7, 0, 0, rng.randint(0, 5) * 0.04, 0)
+            for i in range(300)
+        ]
+        index = DedupeIndex(1.0, 0.05)
+        for lu in lineups:
+            x, pitch = float(lu["raw_getpos"].split()[1]), float(lu["raw_getpos"].split()[5])
+            expected = {
+                other["unique_id"]
+                for other in lineups[: lineups.index(lu)]
+                if abs(float(other["raw_getpos"].split()[1]) - x) <= 1.0
+                and abs(float(other["raw_getpos"].split()[5]) - pitch) <= 0.05 + 1e-9
+            }
+            assert {o["unique_id"] for o in index.find(lu)} == expected
+            index.add(lu)
+
+
+class TestFindDuplicates:
+    def test_groups_keep_first(self):
+        lineups = [_lineup("A"), _lineup("B", 100), _lineup("C", 0.5), _lineup("D", 100.2)]
+        groups = find_duplicates(lineups)
+        assert [(k["unique_id"], [d["unique_id"] for d in dups]) for k, dups in groups] == [
+            ("A", ["C"]),
+            ("B", ["D"]),
+        ]
+
+    def test_tolerances_from_settings(self):
+        assert tolerances({}) == (1.0, 0.05)
+        assert tolerances({"dedupe_position_tolerance": 4}) == (4.0, 0.05)
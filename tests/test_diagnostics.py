@@ -0,0 +1,91 @@
+"""Tests for src.diagnostics module."""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from src import diagnostics
+from src.cli import main
+from src.config_generator import append_label, invalidate_parse_cache, read_labels_cfg
+from src.storage import load_data, save_data
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+@pytest.fixture
+def tracing():
+    diagnostics.clear()
+    diagnostics.enable()
+    yield
+    diagnostics.enable(False)
+    diagnostics.clear()
+
+
+class TestDisabled:
+    def test_spans_and_counts_are_noops(self):
+        assert not diagnostics.enabled
+        assert diagnostics.span("a") is diagnostics.span("b")
+        with diagnostics.span("a"):
+            diagnostics.count(diagnostics.FILES_OPENED)
+        assert diagnostics.last_operation() is None
+
+
+class TestEnabled:
+    def test_nested_spans_roll_up(self, tracing):
+        with diagnostics.span("outer"):
+            for _ in range(3):
+                with diagnostics.span("inner"):
+                    diagnostics.count("things", 2)
+        op = diagnostics.last_operation()
+        assert op.name == "outer"
+        assert op.spans["inner"][0] == 3
+        assert op.counters == {"things": 6}
+        assert op.wall_ms >= op.spans["inner"][1]
+        assert len(diagnostics.operations()) == 1
+
+    def test_config_and_storage_counters(self, tmp_dir, tracing):
+        with diagnostics.span("save"):
+            append_label(tmp_dir, "dust2", "T", 0, 1, "CFG_A")
+            append_label(tmp_dir, "dust2", "T", 0, 2, "CFG_B")
+            invalidate_parse_cache()
+            read_labels_cfg(tmp_dir, "dust2", "T")
+            save_data(tmp_dir, {"lineups": [], "settings": {}})
+            load_data(tmp_dir)
+        counters = diagnostics.last_operation().counters
+        assert counters[diagnostics.FILES_OPENED] == 3  # parsed labels + lineups.json
+        assert counters[diagnostics.REGEX_PARSES] == 3  # 1 + 2 lines
+        assert counters[diagnostics.FILES_WRITTEN] == 3
+        assert counters[diagnostics.BYTES_READ] > 0
+        assert counters[diagnostics.BYTES_WRITTEN] > 0
+
+    def test_dump_trace(self, tmp_dir, tracing):
+        with diagnostics.span("op"):
+            pass
+        path = os.path.join(tmp_dir, "trace.json")
+        assert diagnostics.dump_trace(path) == 1
+        with open(path, encoding="utf-8") as fh:
+            assert json.load(fh)["operations"][0]["name"] == "op"
+
+
+class TestCliTrace:
+    def test_trace_option(self, tmp_dir):
+        path = os.path.join(tmp_dir, "trace.json")
+        try:
+            assert main([
+                "--storage-dir", tmp_dir, "--cs2-path", os.path.join(tmp_dir, "cs2"),
+                "--trace", path, "generate",
+            ]) == 0
+        finally:
+            diagnostics.enable(False)
+            diagnostics.clear()
+        with open(path, encoding="utf-8") as fh:
+            op = json.load(fh)["operations"][-1]
+        assert op["name"] == "generate"
+        assert "generate_configs_to_targets" in op["spans"]
+        assert op["counters"][diagnostics.FILES_WRITTEN] > 0
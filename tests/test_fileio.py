@@ -0,0 +1,119 @@
+"""Tests for src.fileio module."""
+
+import os
+import tempfile
+
+import pytest
+
+from src import fileio
+from src.fileio import (
+    atomic_write_text,
+    publish_directory,
+    replace_files,
+    sync_batch,
+)
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+class TestAtomicWriteText:
+    def test_creates_and_replaces(self, tmp_dir):
+        path = os.path.join(tmp_dir, "sub", "a.cfg")
+        atomic_write_text(path, "one\n")
+        atomic_write_text(path, "two\n")
+        assert _read(path) == "two\n"
+        assert os.listdir(os.path.dirname(path)) == ["a.cfg"]
+
+
+class TestSyncBatch:
+    @pytest.fixture
+    def fsyncs(self, monkeypatch):
+        calls = []
+        real = os.fsync
+
+        def fsync(fd):
+            calls.append(fd)
+            real(fd)
+
+        monkeypatch.setattr(os, "fsync", fsync)
+        if hasattr(os, "sync"):
+            monkeypatch.setattr(os, "sync", lambda: pytest.fail("os.sync called"))
+        return calls
+
+    def test_single_write_flushes_file_and_directory(self, tmp_dir, fsyncs):
+        atomic_write_text(os.path.join(tmp_dir, "a.cfg"), "one\n")
+        assert len(fsyncs) == (2 if os.name == "posix" else 1)
+
+    def test_batch_flushes_once_at_the_end(self, tmp_dir, fsyncs):
+        with sync_batch():
+            for name in ("a.cfg", "b.cfg", "c.cfg"):
+                atomic_write_text(os.path.join(tmp_dir, name), "x\n")
+            atomic_write_text(os.path.join(tmp_dir, "a.cfg"), "y\n")
+            assert fsyncs == []
+        # Three files, then their one directory
+        assert len(fsyncs) == (4 if os.name == "posix" else 3)
+        assert _read(os.path.join(tmp_dir, "a.cfg")) == "y\n"
+
+    def test_publish_flushes_only_staged_files(self, tmp_dir, fsyncs):
+        target = os.path.join(tmp_dir, "CSAFAP")
+        publish_directory(target, {"main.cfg": "a\n", "x_labels.cfg": "b\n"})
+        # Two files, the staging directory and the parent
+        assert len(fsyncs) == (4 if os.name == "posix" else 2)
+
+
+class TestPublishDirectory:
+    def test_creates_directory(self, tmp_dir):
+        target = os.path.join(tmp_dir, "CSAFAP")
+        publish_directory(target, {"main.cfg": "alias x\n"})
+        assert _read(os.path.join(target, "main.cfg")) == "alias x\n"
+
+    def test_keeps_unrelated_files(self, tmp_dir):
+        target = os.path.join(tmp_dir, "CSAFAP")
+        os.makedirs(target)
+        with open(os.path.join(target, "user.cfg"), "w", encoding="utf-8") as fh:
+            fh.write("echo hi\n")
+        publish_directory(target, {"main.cfg": "new\n"})
+        assert _read(os.path.join(target, "user.cfg")) == "echo hi\n"
+        assert _read(os.path.join(target, "main.cfg")) == "new\n"
+        assert sorted(os.listdir(tmp_dir)) == ["CSAFAP"]
+
+    def test_failure_leaves_old_tree(self, tmp_dir, monkeypatch):
+        target = os.path.join(tmp_dir, "CSAFAP")
+        publish_directory(target, {"main.cfg": "old\n"})
+
+        def boom(paths, directories=()):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(fileio, "_sync_batch", boom)
+        with pytest.raises(OSError):
+            publish_directory(target, {"main.cfg": "new\n"})
+        assert _read(os.path.join(target, "main.cfg")) == "old\n"
+        assert sorted(os.listdir(tmp_dir)) == ["CSAFAP"]
+
+    def test_recovers_interrupted_swap(self, tmp_dir):
+        target = os.path.join(tmp_dir, "CSAFAP")
+        publish_directory(target, {"main.cfg": "old\n"})
+        # Simulate a crash between the two renames of a swap.
+        os.replace(target, target + ".csafap-old")
+        publish_directory(target, {"dust2_T_labels.cfg": "labels\n"})
+        assert _read(os.path.join(target, "main.cfg")) == "old\n"
+        assert _read(os.path.join(target, "dust2_T_labels.cfg")) == "labels\n"
+
+
+class TestReplaceFiles:
+    def test_replaces_only_given_files(self, tmp_dir):
+        with open(os.path.join(tmp_dir, "other.txt"), "w", encoding="utf-8") as fh:
+            fh.write("game file\n")
+        replace_files(tmp_dir, {"platform_english.txt": "entries\n"})
+        assert _read(os.path.join(tmp_dir, "platform_english.txt")) == "entries\n"
+        assert _read(os.path.join(tmp_dir, "other.txt")) == "game file\n"
+        assert sorted(os.listdir(tmp_dir)) == ["other.txt", "platform_english.txt"]
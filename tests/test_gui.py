@@ -0,0 +1,123 @@
+"""Tests for src.gui module (the parts that run without a display)."""
+
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+import src.gui as gui  # noqa: E402
+from src.core import make_lineup  # noqa: E402
+from src.storage import JsonStore, load_data, save_data  # noqa: E402
+from src.worker import JobRunner  # noqa: E402
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+def _lineup(unique_id):
+    return {
+        "unique_id": unique_id,
+        "side": "T",
+        "map": "dust2",
+        "grenade": "smoke",
+        "name": f"T smoke {unique_id}",
+        "raw_getpos": "setpos 1.0 2.0 3.0; setang 4.0 5.0 0.0",
+        "yaw_value": 5.0 / 0.022,
+        "pitch_value": 4.0 / 0.022,
+        "message_name": f"CFG_DUST2_SMOKE_{unique_id}",
+        "tab": 0,
+        "text": 1,
+    }
+
+
+class TestSaveLineupJob:
+    def test_cancel_after_files_written_still_saves(self, tmp_dir, monkeypatch):
+        cfg_dir = os.path.join(tmp_dir, "cfg")
+        resource_dir = os.path.join(tmp_dir, "resource")
+        storage_dir = os.path.join(tmp_dir, "storage")
+        store = JsonStore(storage_dir)
+        data = load_data(storage_dir)
+        runner = JobRunner()
+        write_lineup = gui.write_lineup
+
+        def write_then_cancel(*args):
+            write_lineup(*args)
+            runner.cancel()
+
+        monkeypatch.setattr(gui, "write_lineup", write_then_cancel)
+        done, cancelled = [], []
+        runner.submit(
+            "save",
+            lambda ctx: gui.save_lineup_job(
+                ctx, store, data, cfg_dir, resource_dir, _lineup("ID0001"), "single"
+            ),
+            on_done=done.append,
+            on_cancel=lambda: cancelled.append(True),
+        )
+        runner.wait(timeout=5)
+
+        assert cancelled == []
+        assert len(done) == 1
+        stored = load_data(storage_dir)["lineups"]
+        assert [lu["unique_id"] for lu in stored] == ["ID0001"]
+        main_cfg = open(os.path.join(cfg_dir, "main.cfg"), encoding="utf-8").read()
+        assert "ID0001" in main_cfg
+
+    def test_cancel_before_write_leaves_no_files(self, tmp_dir):
+        cfg_dir = os.path.join(tmp_dir, "cfg")
+        storage_dir = os.path.join(tmp_dir, "storage")
+        store = JsonStore(storage_dir)
+        data = load_data(storage_dir)
+        runner = JobRunner()
+        cancelled = []
+
+        def job(ctx):
+            runner.cancel()
+            return gui.save_lineup_job(
+                ctx, store, data, cfg_dir, tmp_dir, _lineup("ID0001"), "single"
+            )
+
+        runner.submit("save", job, on_cancel=lambda: cancelled.append(True))
+        runner.wait(timeout=5)
+
+        assert cancelled == [True]
+        assert not os.path.exists(os.path.join(cfg_dir, "main.cfg"))
+        assert load_data(storage_dir)["lineups"] == []
+
+
+class TestStoreSensitivity:
+    def _library(self, storage_dir):
+        data = load_data(storage_dir)
+        data["lineups"].append(make_lineup(
+            "ID0001", "T", "dust2", "smoke", "xbox",
+            "setpos 1.0 2.0 3.0;setang -10.0 20.0 0.0", 0, 1,
+        ))
+        save_data(storage_dir, data)
+        return load_data(storage_dir)
+
+    def test_saves_setting_with_values(self, tmp_dir):
+        data = self._library(tmp_dir)
+        assert gui.store_sensitivity(JsonStore(tmp_dir), data, 2.0) == 1
+        stored = load_data(tmp_dir)
+        assert stored["settings"]["sensitivity"] == 2.0
+        assert stored["lineups"][0]["yaw_value"] == data["lineups"][0]["yaw_value"]
+        assert stored["lineups"][0]["yaw_value"] == pytest.approx(20.0 / (2.0 * 0.022))
+
+    def test_failed_save_restores_previous(self, tmp_dir):
+        data = self._library(tmp_dir)
+        before = data["lineups"][0]["yaw_value"]
+
+        class FailingStore:
+            def save_data(self, data):
+                raise OSError("disk full")
+
+        with pytest.raises(OSError):
+            gui.store_sensitivity(FailingStore(), data, 2.0)
+        assert data["settings"]["sensitivity"] == 1.0
+        assert data["lineups"][0]["yaw_value"] == before
+        assert load_data(tmp_dir)["settings"]["sensitivity"] == 1.0
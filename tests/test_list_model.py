@@ -0,0 +1,102 @@
+"""Tests for src.list_model module."""
+
+from src.list_model import PagedApplier, RowSync, apply_ops, row_values
+
+
+class FakeTree:
+    """Minimal stand-in for ``ttk.Treeview`` keyed by iid."""
+
+    def __init__(self):
+        self.order = []
+        self.values = {}
+        self.calls = 0
+
+    def insert(self, parent, index, iid, values):
+        self.calls += 1
+        self.order.insert(index, iid)
+        self.values[iid] = values
+
+    def delete(self, *iids):
+        self.calls += 1
+        for iid in iids:
+            self.order.remove(iid)
+            del self.values[iid]
+
+    def item(self, iid, values):
+        self.calls += 1
+        self.values[iid] = values
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def rows(self):
+        return [self.values[iid] for iid in self.order]
+
+
+def _lineup(unique_id, name="test", text=1):
+    return {
+        "unique_id": unique_id,
+        "map": "dust2",
+        "side": "T",
+        "grenade": "smoke",
+        "name": name,
+        "tab": 0,
+        "text": text,
+    }
+
+
+def _sync(tree, sync, lineups):
+    ops = sync.plan(lineups)
+    apply_ops(tree, ops)
+    assert tree.rows() == [row_values(lu) for lu in lineups]
+    return ops
+
+
+class TestRowSync:
+    def test_initial_load_inserts_everything(self):
+        tree, sync = FakeTree(), RowSync()
+        ops = _sync(tree, sync, [_lineup(f"ID000{i}") for i in range(5)])
+        assert [op[0] for op in ops] == ["insert"] * 5
+
+    def test_unchanged_list_needs_no_ops(self):
+        tree, sync = FakeTree(), RowSync()
+        lineups = [_lineup(f"ID000{i}") for i in range(5)]
+        _sync(tree, sync, lineups)
+        assert _sync(tree, sync, lineups) == []
+
+    def test_add_delete_update_touch_only_changed_rows(self):
+        tree, sync = FakeTree(), RowSync()
+        lineups = [_lineup(f"ID000{i}") for i in range(5)]
+        _sync(tree, sync, lineups)
+        lineups = lineups[:1] + lineups[2:] + [_lineup("ID0009")]
+        lineups[0] = _lineup("ID0000", name="renamed")
+        ops = _sync(tree, sync, lineups)
+        assert sorted(op[0] for op in ops) == ["delete", "insert", "update"]
+
+    def test_reordering(self):
+        tree, sync = FakeTree(), RowSync()
+        lineups = [_lineup(f"ID000{i}") for i in range(4)]
+        _sync(tree, sync, lineups)
+        _sync(tree, sync, [lineups[3], _lineup("NEW001"), lineups[1], lineups[0]])
+        _sync(tree, sync, list(reversed(lineups)))
+
+
+class TestPagedApplier:
+    def test_applies_one_page_per_tick(self):
+        tree, sync = FakeTree(), RowSync()
+        ticks = []
+        applier = PagedApplier(tree, ticks.append, page_size=10)
+        lineups = [_lineup(f"ID{i:04d}") for i in range(35)]
+        applier.extend(sync.plan(lineups))
+        assert len(tree.order) == 10
+        assert applier.pending == 25
+
+        # A second refresh while paging continues is queued behind the first
+        lineups = lineups[5:]
+        applier.extend(sync.plan(lineups))
+        while ticks:
+            ticks.pop(0)()
+        assert tree.rows() == [row_values(lu) for lu in lineups]
+        assert applier.pending == 0
@@ -0,0 +1,128 @@
+"""Tests for src.model module."""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from src.core import make_lineup
+from src.model import Lineup, as_lineup
+from src.sqlite_storage import SqliteStore
+from src.storage import load_data, save_data
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+def _entry(unique_id="ABC123", **overrides):
+    entry = make_lineup(
+        unique_id, "T", "dust2", "smoke", "xbox smoke",
+        "setpos 1.0 2.0 3.0;setang -10.0 20.0 0.0", 0, 1,
+    ).to_dict()
+    entry.update(overrides)
+    return entry
+
+
+class TestLineup:
+    def test_slots_only(self):
+        lu = Lineup.from_dict(_entry())
+        assert not hasattr(lu, "__dict__")
+
+    def test_roundtrip_keeps_dict_and_order(self):
+        entry = _entry()
+        assert list(Lineup.from_dict(entry).to_dict().items()) == list(entry.items())
+
+    def test_message_name_is_derived(self):
+        lu = Lineup.from_dict(_entry())
+        assert lu["message_name"] == "CFG_DUST2_SMOKE_ABC123"
+        lu["grenade"] = "decoy"
+        assert lu["message_name"] == "CFG_DUST2_DECOY_ABC123"
+
+    def test_custom_message_name_is_kept(self):
+        lu = Lineup.from_dict(_entry(message_name="CFG_LEGACY"))
+        assert lu["message_name"] == "CFG_LEGACY"
+        assert lu.to_dict()["message_name"] == "CFG_LEGACY"
+
+    def test_near_miss_message_names_are_kept(self):
+        names = ("CFG_DUST2_SMOKE_abc123", "CFG_DUST2_SMOKE_ABC1234", "CFG_DUST2_SMOKE_")
+        for name in names:
+            lu = Lineup.from_dict(_entry(message_name=name))
+            assert lu.to_dict()["message_name"] == name
+        lu = Lineup.from_dict(_entry("abc123", message_name="CFG_DUST2_SMOKE_ABC123"))
+        assert lu.to_dict()["message_name"] == "CFG_DUST2_SMOKE_ABC123"
+
+    def test_load_matches_general_construction(self):
+        entry = _entry()
+        assert Lineup.from_dict(entry).to_dict() == Lineup(**entry).to_dict()
+        # A non-string map leaves the complete-record path but still loads
+        odd = Lineup.from_dict(_entry(map=None))
+        assert odd["map"] is None
+        # So does a non-string ID
+        entry["unique_id"] = 7
+        assert Lineup.from_dict(entry)["unique_id"] == 7
+
+    def test_mapping_views_match_storage_dict(self):
+        for entry in (
+            _entry(),
+            _entry(note="jump throw"),
+            _entry(message_name="CUSTOM"),
+            {"unique_id": "A", "name": "test"},
+        ):
+            lu = Lineup.from_dict(entry)
+            expected = lu.to_dict()
+            assert list(lu) == list(expected)
+            assert len(lu) == len(expected)
+            assert dict(lu) == expected
+
+    def test_missing_fields_behave_like_dict(self):
+        lu = Lineup.from_dict({"unique_id": "A", "name": "test"})
+        assert "map" not in lu
+        assert "message_name" not in lu
+        assert lu.get("tab", 7) == 7
+        with pytest.raises(KeyError):
+            lu["yaw_angle"]
+        assert lu == {"unique_id": "A", "name": "test"}
+
+    def test_unknown_keys_roundtrip(self):
+        lu = Lineup.from_dict(_entry(note="jump throw"))
+        assert lu["note"] == "jump throw"
+        assert lu.to_dict()["note"] == "jump throw"
+
+    def test_enum_fields_are_interned(self):
+        a = Lineup.from_dict(json.loads(json.dumps(_entry("AAAAAA"))))
+        b = Lineup.from_dict(json.loads(json.dumps(_entry("BBBBBB"))))
+        assert a["map"] is b["map"]
+        assert a["grenade"] is b["grenade"]
+
+    def test_formatted_name(self):
+        lu = Lineup.from_dict(_entry())
+        assert lu.formatted_name.startswith("Xbox \\n Smoke")
+
+    def test_as_lineup_keeps_instances(self):
+        lu = as_lineup(_entry())
+        assert as_lineup(lu) is lu
+
+
+class TestStorageEdges:
+    def test_json_store_loads_lineups(self, tmp_dir):
+        save_data(tmp_dir, {"lineups": [Lineup.from_dict(_entry())], "settings": {}})
+        with open(os.path.join(tmp_dir, "lineups.json"), encoding="utf-8") as fh:
+            assert json.load(fh)["lineups"] == [_entry()]
+        loaded = load_data(tmp_dir)["lineups"]
+        assert isinstance(loaded[0], Lineup)
+        assert loaded[0] == _entry()
+
+    def test_sqlite_store_loads_lineups(self, tmp_dir):
+        store = SqliteStore(os.path.join(tmp_dir, "lineups.db"))
+        try:
+            store.add_lineup({"lineups": []}, _entry())
+            loaded = store.load_data()["lineups"]
+            assert isinstance(loaded[0], Lineup)
+            assert loaded[0] == _entry()
+            assert store.find_lineup({}, "ABC123") == _entry()
+        finally:
+            store.close()
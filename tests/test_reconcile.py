@@ -0,0 +1,107 @@
+"""Tests for src.reconcile module."""
+
+import os
+import tempfile
+
+import pytest
+
+from src.config_generator import (
+    append_label,
+    append_main_cfg,
+    append_platform_english,
+    read_commands_cfg,
+    read_labels_cfg,
+)
+from src.core import make_lineup
+from src.reconcile import reconcile, repair
+from src.renderer import generate_configs
+
+
+@pytest.fixture
+def dirs():
+    with tempfile.TemporaryDirectory() as d:
+        yield os.path.join(d, "cfg"), os.path.join(d, "resource"), os.path.join(d, "store")
+
+
+def _lineups():
+    return [
+        make_lineup(
+            f"ID000{i}", "T", "dust2", "smoke", f"lineup {i}",
+            f"setpos {i} 2 3;setang 4 {i} 0", 0, i,
+        )
+        for i in range(1, 4)
+    ]
+
+
+def _kinds(issues) -> set:
+    return {(i.kind, i.key) for i in issues}
+
+
+class TestReconcile:
+    def test_clean_after_generate(self, dirs):
+        cfg_dir, resource_dir, storage_dir = dirs
+        data = {"lineups": _lineups()}
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        assert reconcile(cfg_dir, resource_dir, data["lineups"]) == []
+
+    def test_reports_drift(self, dirs):
+        cfg_dir, resource_dir, storage_dir = dirs
+        lineups = _lineups()
+        data = {"lineups": lineups}
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        first = lineups[0]
+        # duplicated alias, orphaned label/message, lineup missing from storage
+        append_main_cfg(cfg_dir, "smoke", "ID0001", first["yaw_value"], first["pitch_value"])
+        append_label(cfg_dir, "dust2", "T", 2, 8, "CFG_DUST2_SMOKE_GONE00")
+        append_platform_english(resource_dir, "CFG_DUST2_SMOKE_GONE00", "Gone")
+        del lineups[2]
+
+        assert _kinds(reconcile(cfg_dir, resource_dir, lineups)) == {
+            ("duplicate_alias", "ID0001"),
+            ("orphan_alias", "ID0003"),
+            ("orphan_message", "CFG_DUST2_SMOKE_GONE00"),
+            ("orphan_message", "CFG_DUST2_SMOKE_ID0003"),
+            ("orphan_label", (2, 8)),
+            ("orphan_label", (0, 3)),
+            ("orphan_command", (0, 3)),
+        }
+
+    def test_stale_alias(self, dirs):
+        cfg_dir, resource_dir, storage_dir = dirs
+        lineups = _lineups()
+        generate_configs(cfg_dir, resource_dir, {"lineups": lineups}, storage_dir)
+        lineups[0]["yaw_value"] = 1.0
+        assert _kinds(reconcile(cfg_dir, resource_dir, lineups)) == {
+            ("stale_alias", "ID0001"),
+        }
+
+    def test_missing_and_conflicts(self, dirs):
+        cfg_dir, resource_dir, _ = dirs
+        lineups = _lineups()
+        lineups[1]["text"] = 1  # same slot as the first
+        kinds = _kinds(reconcile(cfg_dir, resource_dir, lineups))
+        assert ("missing_alias", "ID0001") in kinds
+        assert ("missing_message", "CFG_DUST2_SMOKE_ID0002") in kinds
+        assert ("missing_label", (0, 1)) in kinds
+        assert ("slot_conflict", (0, 1)) in kinds
+
+
+class TestRepair:
+    def test_one_rewrite_per_file(self, dirs):
+        cfg_dir, resource_dir, storage_dir = dirs
+        lineups = _lineups()
+        data = {"lineups": lineups}
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        append_label(cfg_dir, "dust2", "T", 2, 8, "CFG_DUST2_SMOKE_GONE00")
+        append_label(cfg_dir, "dust2", "T", 2, 7, "CFG_DUST2_SMOKE_GONE01")
+        del lineups[2]
+
+        issues = reconcile(cfg_dir, resource_dir, lineups)
+        written = repair(cfg_dir, resource_dir, data, issues, storage_dir)
+        assert sorted(os.path.basename(p) for p in written) == [
+            "dust2_T_commands.cfg", "dust2_T_labels.cfg", "main.cfg",
+            "platform_english.txt",
+        ]
+        assert reconcile(cfg_dir, resource_dir, lineups) == []
+        assert set(read_labels_cfg(cfg_dir, "dust2", "T")) == {(0, 1), (0, 2)}
+        assert set(read_commands_cfg(cfg_dir, "dust2", "T")) == {(0, 1), (0, 2)}
@@ -0,0 +1,405 @@
+"""Tests for src.renderer module."""
+
+import os
+import tempfile
+
+import pytest
+
+from src.config_generator import (
+    append_command,
+    append_label,
+    append_main_cfg,
+    append_platform_english,
+    read_commands_cfg,
+    read_labels_cfg,
+    remove_lineups_files,
+    write_lineup,
+)
+from src.core import format_lineup_name
+from src.renderer import (
+    DirtyTracker,
+    generate_configs,
+    generate_configs_to_targets,
+    render_cfg_files,
+    render_main_cfg,
+    render_platform_english,
+)
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+def _lineup(unique_id, map_name="dust2", side="T", grenade="smoke", tab=0, text=1):
+    return {
+        "unique_id": unique_id,
+        "side": side,
+        "map": map_name,
+        "grenade": grenade,
+        "name": f"{side} {grenade} {unique_id}",
+        "raw_getpos": "setpos 1.0 2.0 3.0; setang 4.0 5.0 0.0",
+        "yaw_value": 5.0 / 0.022,
+        "pitch_value": 4.0 / 0.022,
+        "message_name": f"CFG_{map_name.upper()}_{grenade.upper()}_{unique_id}",
+        "tab": tab,
+        "text": text,
+    }
+
+
+class TestRender:
+    def test_main_cfg_matches_append(self, tmp_dir):
+        lineups = [_lineup("ID0001"), _lineup("ID0002", grenade="decoy", text=2)]
+        for lu in lineups:
+            append_main_cfg(
+                tmp_dir, lu["grenade"], lu["unique_id"],
+                lu["yaw_value"], lu["pitch_value"],
+            )
+        expected = open(os.path.join(tmp_dir, "main.cfg"), encoding="utf-8").read()
+        assert render_main_cfg(lineups) == expected
+
+    def test_slot_files_match_append(self, tmp_dir):
+        lineups = [_lineup("ID0001", text=3), _lineup("ID0002", tab=1, text=1)]
+        for lu in lineups:
+            append_label(
+                tmp_dir, lu["map"], lu["side"], lu["tab"], lu["text"],
+                lu["message_name"],
+            )
+            append_command(
+                tmp_dir, lu["map"], lu["side"], lu["tab"], lu["text"],
+                lu["grenade"], lu["unique_id"],
+            )
+        files = render_cfg_files(lineups)
+        for name in ("dust2_T_labels.cfg", "dust2_T_commands.cfg"):
+            expected = open(os.path.join(tmp_dir, name), encoding="utf-8").read()
+            assert files[name] == expected
+
+    def test_renders_every_map_side(self):
+        files = render_cfg_files([])
+        assert files["main.cfg"] == ""
+        assert files["train_CT_labels.cfg"] == ""
+        assert files["ancient_T_commands.cfg"] == ""
+
+    def test_platform_english_replaces_generated_entries(self, tmp_dir):
+        path = os.path.join(tmp_dir, "platform_english.txt")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write('"SomeToken"    "Keep me"\n"CFG_DUST2_SMOKE_OLD000"    "Old"\n')
+        result = render_platform_english(path, [_lineup("NEW000")]).decode("utf-8")
+        assert '"SomeToken"' in result
+        assert "OLD000" not in result
+        assert '"CFG_DUST2_SMOKE_NEW000"' in result
+
+
+class TestGenerateConfigs:
+    def test_writes_all_files(self, tmp_dir):
+        cfg_dir = os.path.join(tmp_dir, "cfg")
+        resource_dir = os.path.join(tmp_dir, "resource")
+        data = {"lineups": [_lineup("ID0001"), _lineup("ID0002", "mirage", "CT")]}
+        generate_configs(cfg_dir, resource_dir, data)
+
+        main = open(os.path.join(cfg_dir, "main.cfg"), encoding="utf-8").read()
+        assert "smoke_yaw_ID0001" in main
+        assert "smoke_yaw_ID0002" in main
+        assert read_labels_cfg(cfg_dir, "mirage", "CT") == {
+            (0, 1): "#CFG_MIRAGE_SMOKE_ID0002"
+        }
+        assert "smoke_yaw_ID0001" in read_commands_cfg(cfg_dir, "dust2", "T")[(0, 1)]
+
+    def test_regenerate_does_not_duplicate(self, tmp_dir):
+        data = {"lineups": [_lineup("ID0001")]}
+        append_platform_english(
+            tmp_dir, "CFG_DUST2_SMOKE_ID0001", format_lineup_name("t smoke ID0001")
+        )
+        generate_configs(tmp_dir, tmp_dir, data)
+        generate_configs(tmp_dir, tmp_dir, data)
+        main = open(os.path.join(tmp_dir, "main.cfg"), encoding="utf-8").read()
+        platform = open(
+            os.path.join(tmp_dir, "platform_english.txt"), encoding="utf-8"
+        ).read()
+        assert main.count("smoke_yaw_ID0001") == 1
+        assert platform.count("CFG_DUST2_SMOKE_ID0001") == 1
+
+    def test_progress_can_abort_before_publishing(self, tmp_dir):
+        steps = []
+
+        def progress(done, total, message):
+            steps.append(done)
+            if done == 1:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            generate_configs(tmp_dir, tmp_dir, {"lineups": [_lineup("ID0001")]},
+                             progress=progress)
+        assert steps == [0, 1]
+        assert not os.path.exists(os.path.join(tmp_dir, "main.cfg"))
+
+
+class TestDirtyTracker:
+    def test_starts_all_dirty(self):
+        tracker = DirtyTracker()
+        assert tracker.dirty_files() is None
+        assert tracker.is_dirty("anything.cfg")
+
+    def test_mark_lineup(self):
+        tracker = DirtyTracker()
+        tracker.clear()
+        tracker.mark_lineup(_lineup("ID0001", "nuke", "CT"))
+        assert tracker.dirty_files() == {
+            "main.cfg",
+            "nuke_aliases.cfg",
+            "platform_english.txt",
+            "nuke_CT_labels.cfg",
+            "nuke_CT_commands.cfg",
+        }
+        assert not tracker.is_dirty("dust2_T_labels.cfg")
+
+    def test_mark_layout(self):
+        tracker = DirtyTracker()
+        tracker.clear()
+        tracker.mark_layout([_lineup("ID0001", "nuke", "CT")])
+        files = tracker.dirty_files()
+        assert {"main.cfg", "nuke_aliases.cfg", "dust2_T_commands.cfg"} <= files
+        assert not any(name.endswith("_labels.cfg") for name in files)
+        assert "platform_english.txt" not in files
+
+
+class TestIncrementalGenerate:
+    def _dirs(self, tmp_dir):
+        return (
+            os.path.join(tmp_dir, "cfg"),
+            os.path.join(tmp_dir, "resource"),
+            os.path.join(tmp_dir, "storage"),
+        )
+
+    def test_unchanged_files_are_skipped(self, tmp_dir):
+        cfg_dir, resource_dir, storage_dir = self._dirs(tmp_dir)
+        data = {"lineups": [_lineup("ID0001")]}
+        written = generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        assert len(written) == 2 + 2 * 18
+        assert os.path.exists(os.path.join(storage_dir, "output_hashes.json"))
+
+        mtime = os.stat(os.path.join(cfg_dir, "main.cfg")).st_mtime_ns
+        assert generate_configs(cfg_dir, resource_dir, data, storage_dir) == []
+        assert os.stat(os.path.join(cfg_dir, "main.cfg")).st_mtime_ns == mtime
+
+    def test_corrupt_manifest_forces_rehash(self, tmp_dir):
+        cfg_dir, resource_dir, storage_dir = self._dirs(tmp_dir)
+        data = {"lineups": [_lineup("ID0001")]}
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        with open(os.path.join(storage_dir, "output_hashes.json"), "w") as fh:
+            fh.write('{"/x/main.cfg": {"sha')
+
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        assert generate_configs(cfg_dir, resource_dir, data, storage_dir) == []
+
+    def test_only_changed_files_are_written(self, tmp_dir):
+        cfg_dir, resource_dir, storage_dir = self._dirs(tmp_dir)
+        data = {"lineups": [_lineup("ID0001")]}
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+
+        new = _lineup("ID0002", "inferno", "CT")
+        data["lineups"].append(new)
+        written = generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        names = sorted(os.path.basename(p) for p in written)
+        assert names == [
+            "inferno_CT_commands.cfg",
+            "inferno_CT_labels.cfg",
+            "main.cfg",
+            "platform_english.txt",
+        ]
+
+    def test_dirty_tracker_limits_rendering(self, tmp_dir):
+        cfg_dir, resource_dir, storage_dir = self._dirs(tmp_dir)
+        data = {"lineups": [_lineup("ID0001")]}
+        tracker = DirtyTracker()
+        generate_configs(cfg_dir, resource_dir, data, storage_dir, tracker)
+        assert tracker.dirty_files() == set()
+
+        new = _lineup("ID0002", "inferno", "CT")
+        data["lineups"].append(new)
+        tracker.mark_lineup(new)
+        written = generate_configs(cfg_dir, resource_dir, data, storage_dir, tracker)
+        assert len(written) == 4
+        assert read_labels_cfg(cfg_dir, "inferno", "CT") == {
+            (0, 1): "#CFG_INFERNO_SMOKE_ID0002"
+        }
+        assert read_labels_cfg(cfg_dir, "dust2", "T") == {
+            (0, 1): "#CFG_DUST2_SMOKE_ID0001"
+        }
+
+    def test_incremental_edits_are_not_rewritten(self, tmp_dir):
+        cfg_dir, resource_dir, storage_dir = self._dirs(tmp_dir)
+        data = {"lineups": [_lineup("ID0001")]}
+        tracker = DirtyTracker()
+        generate_configs(cfg_dir, resource_dir, data, storage_dir, tracker)
+
+        new = _lineup("ID0002", "inferno", "CT")
+        write_lineup(cfg_dir, resource_dir, new)
+        data["lineups"].append(new)
+        tracker.mark_lineup(new)
+        paths = [
+            os.path.join(cfg_dir, name)
+            for name in ("main.cfg", "inferno_CT_labels.cfg", "inferno_CT_commands.cfg")
+        ] + [os.path.join(resource_dir, "platform_english.txt")]
+        mtimes = [os.stat(p).st_mtime_ns for p in paths]
+        # Already identical on disk: hashed, not rewritten
+        assert generate_configs(cfg_dir, resource_dir, data, storage_dir, tracker) == []
+        assert [os.stat(p).st_mtime_ns for p in paths] == mtimes
+        # and the refreshed records let the next run trust the stat again
+        assert generate_configs(cfg_dir, resource_dir, data, storage_dir) == []
+
+    def test_externally_modified_file_is_rewritten(self, tmp_dir):
+        cfg_dir, resource_dir, storage_dir = self._dirs(tmp_dir)
+        data = {"lineups": [_lineup("ID0001")]}
+        generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        with open(os.path.join(cfg_dir, "main.cfg"), "w", encoding="utf-8") as fh:
+            fh.write("tampered\n")
+        written = generate_configs(cfg_dir, resource_dir, data, storage_dir)
+        assert [os.path.basename(p) for p in written] == ["main.cfg"]
+        main = open(os.path.join(cfg_dir, "main.cfg"), encoding="utf-8").read()
+        assert "smoke_yaw_ID0001" in main
+
+
+class TestShardedLayout:
+    def test_generate_sharded(self, tmp_dir):
+        data = {"lineups": [_lineup("ID0001"), _lineup("ID0002", "mirage", "CT")]}
+        generate_configs(tmp_dir, tmp_dir, data, layout="sharded")
+
+        def read(name):
+            with open(os.path.join(tmp_dir, name), encoding="utf-8") as fh:
+                return fh.read()
+
+        assert "_yaw_" not in read("main.cfg")
+        assert 'alias csafap_dust2 "exec CSAFAP/dust2_aliases"' in read("main.cfg")
+        assert "smoke_yaw_ID0001" in read("dust2_aliases.cfg")
+        assert "ID0002" not in read("dust2_aliases.cfg")
+        assert "smoke_yaw_ID0002" in read("mirage_aliases.cfg")
+        assert read("nuke_aliases.cfg") == ""
+        commands = read("mirage_CT_commands.cfg").splitlines()
+        assert commands[0] == "exec CSAFAP/mirage_aliases"
+        assert read_commands_cfg(tmp_dir, "mirage", "CT") == {
+            (0, 1): "cmd\";smoke_yaw_ID0002;smoke_pitch_ID0002;"
+        }
+
+    def test_switching_back_removes_shards(self, tmp_dir):
+        data = {"lineups": [_lineup("ID0001")]}
+        generate_configs(tmp_dir, tmp_dir, data, tmp_dir, layout="sharded")
+        generate_configs(tmp_dir, tmp_dir, data, tmp_dir)
+        assert not os.path.exists(os.path.join(tmp_dir, "dust2_aliases.cfg"))
+        with open(os.path.join(tmp_dir, "main.cfg"), encoding="utf-8") as fh:
+            assert "smoke_yaw_ID0001" in fh.read()
+        with open(os.path.join(tmp_dir, "dust2_T_commands.cfg"), encoding="utf-8") as fh:
+            assert not fh.read().startswith("exec")
+
+    def test_layout_switch_with_aliases_only_regenerate(self, tmp_dir):
+        data = {"lineups": [_lineup("ID0001"), _lineup("ID0002", "mirage", "CT")]}
+        generate_configs(tmp_dir, tmp_dir, data, tmp_dir)
+        tracker = DirtyTracker()
+        tracker.clear()
+        tracker.mark_aliases(data["lineups"])
+        tracker.mark_layout(data["lineups"])
+        generate_configs(tmp_dir, tmp_dir, data, tmp_dir, tracker, layout="sharded")
+        for name, contents in render_cfg_files(data["lineups"], layout="sharded").items():
+            with open(os.path.join(tmp_dir, name), encoding="utf-8") as fh:
+                assert fh.read() == contents, name
+
+    def test_incremental_matches_render(self, tmp_dir):
+        inc_dir = os.path.join(tmp_dir, "inc")
+        full_dir = os.path.join(tmp_dir, "full")
+        lineups = [_lineup("ID0001"), _lineup("ID0002", text=2), _lineup("ID0003", "nuke")]
+        generate_configs(inc_dir, inc_dir, {"lineups": []}, layout="sharded")
+        for lu in lineups:
+            write_lineup(inc_dir, inc_dir, lu, "sharded")
+        remove_lineups_files(inc_dir, inc_dir, lineups[:1], "sharded")
+        generate_configs(full_dir, full_dir, {"lineups": lineups[1:]}, layout="sharded")
+        for name in ("dust2_aliases.cfg", "nuke_aliases.cfg", "dust2_T_commands.cfg"):
+            with open(os.path.join(inc_dir, name), encoding="utf-8") as a, open(
+                os.path.join(full_dir, name), encoding="utf-8"
+            ) as b:
+                assert a.read() == b.read()
+
+
+class TestTargets:
+    def _targets(self, tmp_dir, count=2):
+        return [
+            (os.path.join(tmp_dir, f"cs2_{i}", "cfg"),
+             os.path.join(tmp_dir, f"cs2_{i}", "resource"))
+            for i in range(count)
+        ]
+
+    def test_writes_every_target(self, tmp_dir):
+        targets = self._targets(tmp_dir)
+        # Text outside the managed block is kept per install
+        for i, (_, resource_dir) in enumerate(targets):
+            os.makedirs(resource_dir)
+            path = os.path.join(resource_dir, "platform_english.txt")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(f'"lang"\n{{\n"Tokens"\n{{\n"Own_{i}" "x"\n}}\n}}\n')
+        data = {"lineups": [_lineup("ID0001")]}
+        results = generate_configs_to_targets(targets, data)
+        assert [(r.cfg_dir, r.resource_dir) for r in results] == targets
+        for i, result in enumerate(results):
+            assert result.error is None
+            assert len(result.written) == 2 + 2 * 18
+            assert read_labels_cfg(result.cfg_dir, "dust2", "T") == {
+                (0, 1): "#CFG_DUST2_SMOKE_ID0001"
+            }
+            path = os.path.join(result.resource_dir, "platform_english.txt")
+            with open(path, encoding="utf-8") as fh:
+                text = fh.read()
+            assert f'"Own_{i}"' in text
+            assert "CFG_DUST2_SMOKE_ID0001" in text
+
+    def test_matches_single_target(self, tmp_dir):
+        data = {"lineups": [_lineup("ID0001"), _lineup("ID0002", "nuke", "CT")]}
+        (cfg_a, res_a), (cfg_b, res_b) = self._targets(tmp_dir)
+        generate_configs(cfg_a, res_a, data, layout="sharded")
+        generate_configs_to_targets([(cfg_b, res_b)], data, layout="sharded")
+        assert sorted(os.listdir(cfg_a)) == sorted(os.listdir(cfg_b))
+        for name in os.listdir(cfg_a):
+            with open(os.path.join(cfg_a, name), encoding="utf-8") as a, open(
+                os.path.join(cfg_b, name), encoding="utf-8"
+            ) as b:
+                assert a.read() == b.read()
+
+    def test_unchanged_targets_are_skipped(self, tmp_dir):
+        targets = self._targets(tmp_dir)
+        storage_dir = os.path.join(tmp_dir, "storage")
+        data = {"lineups": [_lineup("ID0001")]}
+        generate_configs_to_targets(targets, data, storage_dir)
+        results = generate_configs_to_targets(targets, data, storage_dir)
+        assert [r.written for r in results] == [[], []]
+
+        data["lineups"].append(_lineup("ID0002", "inferno", "CT"))
+        results = generate_configs_to_targets(targets, data, storage_dir)
+        assert [len(r.written) for r in results] == [4, 4]
+
+    def test_failed_target_does_not_stop_others(self, tmp_dir):
+        good, bad = self._targets(tmp_dir)
+        # A file where the install directory should be
+        with open(os.path.join(tmp_dir, "cs2_1"), "w", encoding="utf-8"):
+            pass
+        tracker = DirtyTracker()
+        data = {"lineups": [_lineup("ID0001")]}
+        results = generate_configs_to_targets([good, bad], data, dirty=tracker)
+        assert results[0].error is None
+        assert len(results[0].written) == 2 + 2 * 18
+        assert isinstance(results[1].error, OSError)
+        assert results[1].written == []
+        # Still dirty, so the next generation retries the failed install
+        assert tracker.dirty_files() is None
+
+    def test_repeated_target_is_written_once(self, tmp_dir):
+        target = self._targets(tmp_dir, 1)[0]
+        data = {"lineups": [_lineup("ID0001")]}
+        results = generate_configs_to_targets([target, list(target)], data)
+        assert len(results) == 1
+
+    def test_progress_reports_each_target(self, tmp_dir):
+        calls = []
+        generate_configs_to_targets(
+            self._targets(tmp_dir, 3), {"lineups": []},
+            progress=lambda done, total, message: calls.append((done, total)),
+        )
+        assert calls == [(0, 4), (1, 4), (2, 4), (3, 4)]
@@ -0,0 +1,122 @@
+"""Tests for src.search_index module."""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+from src.search_index import LineupIndex, tokenize
+from src.storage import JsonStore, open_store
+from tests.test_benchmarks import SCALE
+
+# Search budget for 100k lineups, in seconds (times CSAFAP_BENCH_SCALE)
+LARGE_QUERY_BUDGET = 0.05
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+def _lineup(unique_id, name, map_name="dust2", side="T", grenade="smoke"):
+    return {
+        "unique_id": unique_id,
+        "map": map_name,
+        "side": side,
+        "grenade": grenade,
+        "name": name,
+        "tab": 0,
+        "text": 1,
+    }
+
+
+def _ids(lineups):
+    return [lu["unique_id"] for lu in lineups]
+
+
+@pytest.fixture
+def index():
+    return LineupIndex.from_lineups([
+        _lineup("ID0001", "Xbox smoke from T spawn"),
+        _lineup("ID0002", "CT cross smoke", side="CT"),
+        _lineup("ID0003", "Window smoke", map_name="mirage"),
+        _lineup("ID0004", "Xbox flash", grenade="grenade"),
+    ])
+
+
+class TestTokenize:
+    def test_lowercase_words(self):
+        assert tokenize("Xbox smoke-from T_spawn!") == ["xbox", "smoke", "from", "t_spawn"]
+
+
+class TestLineupIndex:
+    def test_no_filters_returns_everything_in_order(self, index):
+        assert _ids(index.search()) == ["ID0001", "ID0002", "ID0003", "ID0004"]
+
+    def test_field_filters(self, index):
+        assert _ids(index.search(map_name="mirage")) == ["ID0003"]
+        assert _ids(index.search(side="CT")) == ["ID0002"]
+        assert _ids(index.search(map_name="dust2", grenade="smoke")) == [
+            "ID0001", "ID0002"
+        ]
+        assert index.search(map_name="nuke") == []
+
+    def test_text_matches_word_prefixes(self, index):
+        assert _ids(index.search(text="xb")) == ["ID0001", "ID0004"]
+        assert _ids(index.search(text="XBOX sm")) == ["ID0001"]
+        assert _ids(index.search(text="smoke", side="T")) == ["ID0001", "ID0003"]
+        assert index.search(text="box") == []
+
+    def test_add_and_remove(self, index):
+        index.remove("ID0001")
+        assert _ids(index.search(text="xbox")) == ["ID0004"]
+        index.remove("ID0004")
+        assert index.search(text="xbox") == []
+        index.add(_lineup("ID0005", "Xbox molly"))
+        assert _ids(index.search(text="xbox")) == ["ID0005"]
+        index.remove("NOPE00")
+        assert len(index) == 3
+
+    def test_readd_replaces_entry(self, index):
+        index.add(_lineup("ID0003", "Jungle smoke", map_name="mirage"))
+        assert index.search(text="window") == []
+        assert _ids(index.search(text="jungle")) == ["ID0003"]
+
+    def test_large_library_query_is_fast(self):
+        index = LineupIndex.from_lineups(
+            _lineup(f"L{i:06d}", f"lineup {i} spot{i % 1000}") for i in range(100_000)
+        )
+        start = time.perf_counter()
+        found = index.search(text="spot12", side="T")
+        elapsed = time.perf_counter() - start
+        # spot12 and spot120..spot129 each match 100 lineups
+        assert len(found) == 1100
+        assert elapsed < LARGE_QUERY_BUDGET * SCALE
+
+
+class TestStoreMaintainsIndex:
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_add_remove_update_index(self, tmp_dir, backend):
+        store = open_store(tmp_dir, backend)
+        try:
+            data = store.load_data()
+            index = store.build_index(data)
+            data = store.add_lineup(data, _lineup("ID0001", "Xbox smoke"))
+            data = store.add_lineup(data, _lineup("ID0002", "Window smoke"))
+            assert _ids(index.search(text="smoke")) == ["ID0001", "ID0002"]
+            data = store.remove_lineup(data, "ID0001")
+            assert _ids(index.search(text="smoke")) == ["ID0002"]
+            data = store.remove_lineups(data, {"ID0002"})
+            assert index.search() == []
+        finally:
+            store.close()
+
+    def test_save_data_rebuilds_index(self, tmp_dir):
+        store = JsonStore(os.path.join(tmp_dir, "s"))
+        data = store.load_data()
+        store.build_index(data)
+        data["lineups"] = [_lineup("ID0009", "Imported")]
+        store.save_data(data)
+        assert _ids(store.index.search(text="imp")) == ["ID0009"]
@@ -0,0 +1,150 @@
+"""Tests for src.slot_index module."""
+
+import tempfile
+
+import pytest
+
+from src.config_generator import (
+    append_command,
+    append_label,
+    find_first_empty_slot,
+    get_occupied_slots,
+    read_commands_cfg,
+    read_labels_cfg,
+)
+from src.slot_index import (
+    SLOT_COUNT,
+    SlotIndex,
+    bit_to_slot,
+    compact_wheel,
+    compaction_moves,
+    slot_to_bit,
+)
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+class TestBitMapping:
+    def test_roundtrip(self):
+        for bit in range(SLOT_COUNT):
+            assert slot_to_bit(*bit_to_slot(bit)) == bit
+
+    def test_first_bit_is_first_slot(self):
+        assert bit_to_slot(0) == (0, 1)
+        assert slot_to_bit(0, 2) == 1
+        assert slot_to_bit(1, 1) == 8
+
+    def test_out_of_range_raises(self):
+        with pytest.raises(ValueError):
+            slot_to_bit(3, 1)
+        with pytest.raises(ValueError):
+            slot_to_bit(0, 0)
+
+
+class TestSlotIndex:
+    def test_empty(self):
+        index = SlotIndex()
+        assert index.first_free("dust2", "T") == (0, 1)
+        assert index.occupied("dust2", "T") == set()
+        assert index.free_count("dust2", "T") == SLOT_COUNT
+
+    def test_add_and_remove(self):
+        index = SlotIndex()
+        index.add("dust2", "T", 0, 1)
+        index.add("dust2", "T", 0, 2)
+        assert index.first_free("dust2", "T") == (0, 3)
+        assert index.is_occupied("dust2", "T", 0, 2)
+        index.remove("dust2", "T", 0, 1)
+        assert index.first_free("dust2", "T") == (0, 1)
+        assert index.occupied("dust2", "T") == {(0, 2)}
+
+    def test_map_sides_are_independent(self):
+        index = SlotIndex()
+        index.add("dust2", "T", 0, 1)
+        assert index.first_free("dust2", "CT") == (0, 1)
+        assert index.first_free("DUST2", "t") == (0, 2)
+
+    def test_full_returns_none(self):
+        index = SlotIndex()
+        for bit in range(SLOT_COUNT):
+            index.add("nuke", "CT", *bit_to_slot(bit))
+        assert index.first_free("nuke", "CT") is None
+        assert index.free_count("nuke", "CT") == 0
+
+    def test_from_lineups(self):
+        lineups = [
+            {"map": "mirage", "side": "CT", "tab": 1, "text": 4},
+            {"map": "mirage", "side": "T", "tab": 0, "text": 1},
+        ]
+        index = SlotIndex.from_lineups(lineups)
+        assert index.occupied("mirage", "CT") == {(1, 4)}
+        assert index.first_free("mirage", "T") == (0, 2)
+
+    def test_from_cfg_dir_matches_file_scan(self, tmp_dir):
+        append_label(tmp_dir, "dust2", "T", 0, 1, "CFG_DUST2_SMOKE_X1")
+        append_command(tmp_dir, "dust2", "T", 0, 2, "smoke", "X2")
+        append_label(tmp_dir, "train", "CT", 2, 8, "CFG_TRAIN_SMOKE_X3")
+        index = SlotIndex.from_cfg_dir(tmp_dir)
+        for map_name, side in (("dust2", "T"), ("train", "CT"), ("nuke", "T")):
+            assert index.occupied(map_name, side) == get_occupied_slots(
+                tmp_dir, map_name, side
+            )
+            assert index.first_free(map_name, side) == find_first_empty_slot(
+                tmp_dir, map_name, side
+            )
+
+
+class TestReserve:
+    def test_reserves_lowest_free_slots(self):
+        index = SlotIndex()
+        index.add("dust2", "T", 0, 2)
+        assert index.reserve("dust2", "T", 3) == [(0, 1), (0, 3), (0, 4)]
+        assert index.occupied("dust2", "T") == {(0, 1), (0, 2), (0, 3), (0, 4)}
+        assert index.reserve("dust2", "T", 0) == []
+
+    def test_fails_fast_without_partial_reservation(self):
+        index = SlotIndex()
+        index.reserve("nuke", "CT", SLOT_COUNT - 2)
+        with pytest.raises(ValueError, match="Only 2 free slot"):
+            index.reserve("nuke", "CT", 3)
+        assert index.free_count("nuke", "CT") == 2
+
+
+def _lineup(unique_id, tab, text):
+    return {
+        "unique_id": unique_id, "map": "dust2", "side": "T", "grenade": "smoke",
+        "message_name": f"CFG_DUST2_SMOKE_{unique_id}", "tab": tab, "text": text,
+    }
+
+
+class TestCompaction:
+    def test_moves_preserve_order_and_skip_pinned(self):
+        moves = compaction_moves([(0, 3), (1, 1), (2, 8)], pinned=[(0, 2), (9, 9)])
+        assert moves == {(0, 3): (0, 1), (1, 1): (0, 3), (2, 8): (0, 4)}
+        assert compaction_moves([(0, 1), (0, 2)]) == {}
+
+    def test_compact_wheel_rewrites_files_and_lineups(self, tmp_dir):
+        lineups = [_lineup("A", 0, 4), _lineup("B", 1, 2), _lineup("C", 0, 1)]
+        for lu in lineups:
+            append_label(tmp_dir, "dust2", "T", lu["tab"], lu["text"], lu["message_name"])
+            append_command(tmp_dir, "dust2", "T", lu["tab"], lu["text"], "smoke", lu["unique_id"])
+        # A foreign entry that no stored lineup owns keeps its slot
+        append_label(tmp_dir, "dust2", "T", 0, 2, "CFG_MANUAL")
+
+        moves = compact_wheel(tmp_dir, lineups, "dust2", "T")
+        assert moves == {(0, 4): (0, 3), (1, 2): (0, 4)}
+        assert [(lu["tab"], lu["text"]) for lu in lineups] == [(0, 3), (0, 4), (0, 1)]
+        assert read_labels_cfg(tmp_dir, "dust2", "T") == {
+            (0, 1): "#CFG_DUST2_SMOKE_C",
+            (0, 2): "#CFG_MANUAL",
+            (0, 3): "#CFG_DUST2_SMOKE_A",
+            (0, 4): "#CFG_DUST2_SMOKE_B",
+        }
+        assert read_commands_cfg(tmp_dir, "dust2", "T")[(0, 4)] == (
+            'cmd";smoke_yaw_B;smoke_pitch_B;'
+        )
+        assert compact_wheel(tmp_dir, lineups, "dust2", "T") == {}
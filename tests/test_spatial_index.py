@@ -0,0 +1,102 @@
+"""Tests for src.spatial_index module."""
+
+import math
+import random
+import time
+
+import pytest
+
+from src.spatial_index import SpatialIndex, lineup_position
+from tests.test_benchmarks import SCALE
+
+# Per-query nearest() budget on 50k lineups, in seconds (times CSAFAP_BENCH_SCALE)
+LOOKUP_BUDGET = 0.001
+
+
+def _lineup(unique_id, x, y, z=0.0, map_name="dust2", side="T"):
+    return {
+        "unique_id": unique_id,
+        "map": map_name,
+        "side": side,
+        "grenade": "smoke",
+        "name": unique_id,
+        "raw_getpos": f"setpos {x} {y} {z}; setang 0 0 0",
+        "tab": 0,
+        "text": 1,
+    }
+
+
+def _brute_force(lineups, map_name, pos, side=None):
+    pairs = [
+        (math.dist(pos, lineup_position(lu)), lu)
+        for lu in lineups
+        if lu["map"] == map_name and (not side or lu["side"] == side)
+    ]
+    return sorted(pairs, key=lambda pair: pair[0])
+
+
+def _ids(pairs):
+    return [lu["unique_id"] for _, lu in pairs]
+
+
+@pytest.fixture
+def library():
+    rng = random.Random(7)
+    return [
+        _lineup(
+            f"L{i:05d}",
+            rng.uniform(-3000, 3000),
+            rng.uniform(-3000, 3000),
+            rng.uniform(-200, 200),
+            map_name=rng.choice(["dust2", "mirage"]),
+            side=rng.choice(["T", "CT"]),
+        )
+        for i in range(2000)
+    ]
+
+
+class TestSpatialIndex:
+    def test_nearest_matches_brute_force(self, library):
+        index = SpatialIndex.from_lineups(library)
+        rng = random.Random(1)
+        for _ in range(50):
+            pos = (rng.uniform(-3500, 3500), rng.uniform(-3500, 3500), 0.0)
+            expected = _brute_force(library, "dust2", pos)[:7]
+            assert _ids(index.nearest("dust2", pos, k=7)) == _ids(expected)
+
+    def test_within_matches_brute_force(self, library):
+        index = SpatialIndex.from_lineups(library)
+        pos = (100.0, -250.0, 0.0)
+        for radius in (0, 50, 400, 10_000):
+            expected = [p for p in _brute_force(library, "mirage", pos, "CT") if p[0] <= radius]
+            assert _ids(index.within("mirage", pos, radius, side="CT")) == _ids(expected)
+
+    def test_add_remove(self):
+        index = SpatialIndex.from_lineups([_lineup("A", 0, 0), _lineup("B", 500, 0)])
+        assert _ids(index.nearest("dust2", (450, 0, 0), k=1)) == ["B"]
+        index.remove("B")
+        assert _ids(index.nearest("dust2", (450, 0, 0), k=1)) == ["A"]
+        index.add(_lineup("A", 1000, 1000))  # re-adding moves the lineup
+        assert len(index) == 1
+        assert index.within("dust2", (0, 0, 0), 10) == []
+
+    def test_unknown_map_and_bad_getpos(self):
+        index = SpatialIndex()
+        bad = dict(_lineup("X", 0, 0), raw_getpos="garbage")
+        assert index.add(bad) is False
+        assert index.nearest("nuke", (0, 0, 0)) == []
+
+    def test_lookup_is_sub_millisecond(self):
+        rng = random.Random(3)
+        lineups = [
+            _lineup(f"L{i:06d}", rng.uniform(-4000, 4000), rng.uniform(-4000, 4000))
+            for i in range(50_000)
+        ]
+        index = SpatialIndex.from_lineups(lineups)
+        queries = [(rng.uniform(-4000, 4000), rng.uniform(-4000, 4000), 0.0) for _ in range(200)]
+        start = time.perf_counter()
+        results = [index.nearest("dust2", pos, k=5) for pos in queries]
+        per_query = (time.perf_counter() - start) / len(queries)
+        for pos, found in zip(queries[:5], results):
+            assert _ids(found) == _ids(_brute_force(lineups, "dust2", pos)[:5])
+        assert per_query < LOOKUP_BUDGET * SCALE
@@ -0,0 +1,136 @@
+"""Tests for src.sqlite_storage module."""
+
+import os
+import tempfile
+
+import pytest
+
+from src.sqlite_storage import SqliteStore
+from src.storage import detect_backend, load_data, open_store, save_data, switch_backend
+
+
+@pytest.fixture
+def tmp_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield d
+
+
+@pytest.fixture
+def store(tmp_dir):
+    s = SqliteStore(os.path.join(tmp_dir, "lineups.db"))
+    yield s
+    s.close()
+
+
+def _lineup(unique_id, map_name="dust2", side="T", tab=0, text=1):
+    return {
+        "unique_id": unique_id,
+        "map": map_name,
+        "side": side,
+        "grenade": "smoke",
+        "name": "test",
+        "tab": tab,
+        "text": text,
+    }
+
+
+class TestSqliteStore:
+    def test_load_empty_returns_default(self, store):
+        data = store.load_data()
+        assert data["lineups"] == []
+        assert data["settings"]["sensitivity"] == 1.0
+
+    def test_add_find_remove(self, store):
+        data = store.load_data()
+        data = store.add_lineup(data, _lineup("ID0001"))
+        data = store.add_lineup(data, _lineup("ID0002", text=2))
+        assert len(data["lineups"]) == 2
+        assert store.find_lineup(data, "ID0001")["unique_id"] == "ID0001"
+        assert store.get_existing_ids(data) == {"ID0001", "ID0002"}
+
+        data = store.remove_lineup(data, "ID0001")
+        assert [lu["unique_id"] for lu in data["lineups"]] == ["ID0002"]
+        assert store.find_lineup(data, "ID0001") is None
+        assert [lu["unique_id"] for lu in store.load_data()["lineups"]] == ["ID0002"]
+
+    def test_remove_lineups(self, store):
+        data = store.load_data()
+        for i in range(5):
+            store.add_lineup(data, _lineup(f"ID000{i}", text=i + 1))
+        data = store.remove_lineups(data, {"ID0001", "ID0003"})
+        expected = ["ID0000", "ID0002", "ID0004"]
+        assert [lu["unique_id"] for lu in data["lineups"]] == expected
+        assert [lu["unique_id"] for lu in store.load_data()["lineups"]] == expected
+
+    def test_find_by_slot(self, store):
+        data = store.load_data()
+        store.add_lineup(data, _lineup("ID0001", "mirage", "CT", 1, 4))
+        store.add_lineup(data, _lineup("ID0002", "mirage", "T", 1, 4))
+        found = store.find_by_slot(data, "mirage", "CT", 1, 4)
+        assert [lu["unique_id"] for lu in found] == ["ID0001"]
+
+    def test_preserves_order_and_extra_keys(self, store):
+        data = store.load_data()
+        lineups = [_lineup(f"ID000{i}") for i in range(5)]
+        lineups[2]["extra"] = {"nested": [1, 2]}
+        data["lineups"] = lineups
+        data["settings"]["cs2_path"] = "/games/cs2"
+        store.save_data(data)
+        loaded = store.load_data()
+        assert loaded["lineups"] == lineups
+        assert loaded["settings"]["cs2_path"] == "/games/cs2"
+
+    def test_import_json(self, tmp_dir, store):
+        data = load_data(tmp_dir)
+        data["lineups"] = [_lineup("ID0001"), _lineup("ID0002")]
+        save_data(tmp_dir, data)
+        assert store.import_json(os.path.join(tmp_dir, "lineups.json")) == 2
+        assert store.get_existing_ids({}) == {"ID0001", "ID0002"}
+
+
+class TestBackendSelection:
+    def test_default_is_json(self, tmp_dir):
+        assert detect_backend(tmp_dir) == "json"
+        assert open_store(tmp_dir).backend == "json"
+
+    def test_open_sqlite_imports_existing_json(self, tmp_dir):
+        data = load_data(tmp_dir)
+        data["lineups"] = [_lineup("ID0001")]
+        save_data(tmp_dir, data)
+        store = open_store(tmp_dir, "sqlite")
+        try:
+            assert store.load_data()["lineups"] == data["lineups"]
+            assert detect_backend(tmp_dir) == "sqlite"
+        finally:
+            store.close()
+
+    def test_switch_roundtrip(self, tmp_dir):
+        data = load_data(tmp_dir)
+        data["lineups"] = [_lineup("ID0001")]
+        store = switch_backend(tmp_dir, data, "sqlite")
+        store.add_lineup(data, _lineup("ID0002", text=2))
+        store.close()
+
+        reopened = open_store(tmp_dir)
+        assert reopened.backend == "sqlite"
+        data = reopened.load_data()
+        assert data["settings"]["storage_backend"] == "sqlite"
+        reopened.close()
+
+        store = switch_backend(tmp_dir, data, "json")
+        assert store.backend == "json"
+        assert detect_backend(tmp_dir) == "json"
+        ids = {lu["unique_id"] for lu in load_data(tmp_dir)["lineups"]}
+        assert ids == {"ID0001", "ID0002"}
+
+    def test_unknown_backend_raises(self, tmp_dir):
+        with pytest.raises(ValueError):
+            open_store(tmp_dir, "yaml")
+
+
+class TestAddLineups:
+    def test_batch_insert(self, store):
+        data = store.load_data()
+        store.add_lineups(data, [_lineup("ID0001"), _lineup("ID0002", text=2)])
+        assert [lu["unique_id"] for lu in data["lineups"]] == ["ID0001", "ID0002"]
+        assert store.get_existing_ids(data) == {"ID0001", "ID0002"}
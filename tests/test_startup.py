@@ -0,0 +1,113 @@
+"""Startup-time tests for the GUI.
+
+``import src.gui`` is timed in a fresh interpreter. The first paint (from
+``Application()`` until the window has been drawn) needs a display and is
+skipped without one; it runs against a large library, which must not slow
+it down because storage loads in the background.
+
+Budgets are in seconds and multiplied by ``CSAFAP_BENCH_SCALE``, as in
+``tests/test_benchmarks.py``.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from src.storage import default_data, save_data
+from tests.test_benchmarks import SCALE, synthetic_lineups
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET = 1.0
+FIRST_PAINT_BUDGET = 1.5
+LIBRARY_SIZE = 20_000
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import src.gui
+result = {"import": time.perf_counter() - start}
+if len(sys.argv) > 1:
+    import tkinter
+    try:
+        app = src.gui.Application(storage_dir=sys.argv[1])
+    except tkinter.TclError:
+        result["paint"] = None
+    else:
+        app.update()
+        result["paint"] = time.perf_counter() - start
+        result["lazy"] = app._rows is None and app.diagnostics_tree is None
+        app.destroy()
+print(json.dumps(result))
+"""
+
+
+def _measure(*argv) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, *argv],
+        cwd=_ROOT, check=True, capture_output=True, text=True,
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def tkinter_available():
+    try:
+        import tkinter  # noqa: F401
+    except ImportError:
+        pytest.skip("tkinter is not installed")
+
+
+def test_import_time(tkinter_available):
+    assert _measure()["import"] < IMPORT_BUDGET * SCALE
+
+
+def test_first_paint(tkinter_available):
+    with tempfile.TemporaryDirectory() as storage_dir:
+        data = default_data()
+        data["lineups"] = synthetic_lineups(LIBRARY_SIZE)
+        save_data(storage_dir, data)
+        result = _measure(storage_dir)
+    if result["paint"] is None:
+        pytest.skip("no display available")
+    assert result["lazy"], "only the Add form should be built before first paint"
+    assert result["paint"] < FIRST_PAINT_BUDGET * SCALE
+
+
+_LOAD_ERROR_SCRIPT = """
+import json, sys, tkinter
+import src.gui
+asked = []
+src.gui.messagebox.askretrycancel = lambda *args: asked.append(args) or False
+try:
+    app = src.gui.Application(storage_dir=sys.argv[1])
+except tkinter.TclError:
+    print(json.dumps(None))
+    sys.exit()
+app.jobs.wait(10)
+app.update()
+app.jobs.poll()
+result = {"error": app._load_error is not None, "asked": len(asked)}
+result["loaded"] = app._loaded()
+result["asked_again"] = len(asked)
+app.destroy()
+print(json.dumps(result))
+"""
+
+
+def test_load_failure_is_reported(tkinter_available):
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "lineups.json"), "w", encoding="utf-8") as fh:
+            fh.write("{not json")
+        proc = subprocess.run(
+            [sys.executable, "-c", _LOAD_ERROR_SCRIPT, tmp],
+            cwd=_ROOT, check=True, capture_output=True, text=True,
+        )
+    result = json.loads(proc.stdout.splitlines()[-1])
+    if result is None:
+        pytest.skip("no display available")
+    assert result == {"error": True, "asked": 1, "loaded": False, "asked_again": 2}
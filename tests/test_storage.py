@@ -6,12 +6,16 @@ import tempfile
 import pytest
 
 from src.storage import (
+    JsonStore,
     add_lineup,
     find_lineup,
     get_existing_ids,
     load_data,
+    load_output_hashes,
     remove_lineup,
+    remove_lineups,
     save_data,
+    save_output_hashes,
 )
 
 
@@ -38,6 +42,26 @@ class TestLoadSaveData:
         assert loaded["lineups"][0]["unique_id"] == "TEST01"
 
 
+class TestOutputHashes:
+    def test_load_missing_returns_empty(self, tmp_dir):
+        assert load_output_hashes(tmp_dir) == {}
+
+    def test_roundtrip(self, tmp_dir):
+        hashes = {"/x/main.cfg": {"sha256": "ab", "size": 2, "mtime_ns": 1}}
+        save_output_hashes(tmp_dir, hashes)
+        assert load_output_hashes(tmp_dir) == hashes
+
+    def test_corrupt_manifest_loads_empty(self, tmp_dir):
+        save_output_hashes(tmp_dir, {"/x/main.cfg": {"sha256": "ab"}})
+        path = os.path.join(tmp_dir, "output_hashes.json")
+        with open(path, "r+", encoding="utf-8") as fh:
+            fh.truncate(10)
+        assert load_output_hashes(tmp_dir) == {}
+        # Saving over the damaged manifest recovers it
+        save_output_hashes(tmp_dir, {"/y": {"sha256": "cd"}})
+        assert load_output_hashes(tmp_dir) == {"/y": {"sha256": "cd"}}
+
+
 class TestLineupOperations:
     def test_add_lineup(self):
         data = {"lineups": []}
@@ -51,6 +75,11 @@ class TestLineupOperations:
         assert len(data["lineups"]) == 1
         assert data["lineups"][0]["unique_id"] == "ID0002"
 
+    def test_remove_lineups(self):
+        data = {"lineups": [{"unique_id": u} for u in ("A", "B", "C", "D")]}
+        data = remove_lineups(data, {"A", "C"})
+        assert [lu["unique_id"] for lu in data["lineups"]] == ["B", "D"]
+
     def test_find_lineup(self):
         data = {"lineups": [{"unique_id": "ID0001", "name": "Test"}]}
         result = find_lineup(data, "ID0001")
@@ -65,3 +94,34 @@ class TestLineupOperations:
         data = {"lineups": [{"unique_id": "A"}, {"unique_id": "B"}]}
         ids = get_existing_ids(data)
         assert ids == {"A", "B"}
+
+
+class TestJsonStore:
+    def test_mutations_are_persisted(self, tmp_dir):
+        store = JsonStore(tmp_dir)
+        data = store.load_data()
+        data = store.add_lineup(data, {"unique_id": "ID0001", "name": "a"})
+        data = store.add_lineup(data, {"unique_id": "ID0002", "name": "b"})
+        data = store.remove_lineup(data, "ID0001")
+        loaded = load_data(tmp_dir)
+        assert [lu["unique_id"] for lu in loaded["lineups"]] == ["ID0002"]
+        assert store.find_lineup(loaded, "ID0002")["name"] == "b"
+
+
+class TestAddLineups:
+    def test_one_save_for_batch(self, tmp_dir):
+        store = JsonStore(tmp_dir)
+        data = store.load_data()
+        store.build_index(data)
+        store.add_lineups(data, [{"unique_id": "A", "name": "a"}, {"unique_id": "B", "name": "b"}])
+        assert [lu["unique_id"] for lu in load_data(tmp_dir)["lineups"]] == ["A", "B"]
+        assert len(store.index) == 2
+
+    def test_failed_save_leaves_data(self, tmp_dir):
+        path = os.path.join(tmp_dir, "file")
+        open(path, "w").close()
+        store = JsonStore(os.path.join(path, "storage"))  # parent is a file
+        data = {"lineups": [{"unique_id": "A"}]}
+        with pytest.raises(OSError):
+            store.add_lineups(data, [{"unique_id": "B"}])
+        assert [lu["unique_id"] for lu in data["lineups"]] == ["A"]
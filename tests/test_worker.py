@@ -0,0 +1,90 @@
+"""Tests for src.worker module."""
+
+import threading
+
+from src.worker import JobRunner
+
+
+class TestJobRunner:
+    def test_result_delivered_on_wait(self):
+        runner = JobRunner()
+        results = []
+        assert runner.submit("add", lambda ctx: 1 + 2, on_done=results.append)
+        assert runner.busy
+        runner.wait(timeout=5)
+        assert results == [3]
+        assert not runner.busy
+
+    def test_error_delivered(self):
+        runner = JobRunner()
+        errors = []
+
+        def job(ctx):
+            raise OSError("disk full")
+
+        runner.submit("fail", job, on_error=errors.append)
+        runner.wait(timeout=5)
+        assert [str(e) for e in errors] == ["disk full"]
+
+    def test_refuses_second_job_while_busy(self):
+        runner = JobRunner()
+        release = threading.Event()
+        runner.submit("slow", lambda ctx: release.wait(5))
+        assert runner.current == "slow"
+        assert not runner.submit("other", lambda ctx: None)
+        release.set()
+        runner.wait(timeout=5)
+        assert runner.submit("other", lambda ctx: None)
+        runner.wait(timeout=5)
+
+    def test_progress_then_done_in_order(self):
+        runner = JobRunner()
+        events = []
+
+        def job(ctx):
+            for i in range(3):
+                ctx.report(i, 3, f"step {i}")
+            return "ok"
+
+        runner.submit(
+            "steps", job,
+            on_done=lambda result: events.append(result),
+            on_progress=lambda done, total, msg: events.append(msg),
+        )
+        runner.wait(timeout=5)
+        assert events == ["step 0", "step 1", "step 2", "ok"]
+
+    def test_cancel_stops_at_next_report(self):
+        runner = JobRunner()
+        started = threading.Event()
+        proceed = threading.Event()
+        cancelled = []
+        finished = []
+
+        def job(ctx):
+            started.set()
+            proceed.wait(5)
+            ctx.report(1, 2)
+            finished.append(True)
+
+        runner.submit("long", job, on_cancel=lambda: cancelled.append(True))
+        started.wait(5)
+        runner.cancel()
+        proceed.set()
+        runner.wait(timeout=5)
+        assert cancelled == [True]
+        assert finished == []
+        assert not runner.busy
+
+    def test_non_cancellable_report_does_not_raise(self):
+        runner = JobRunner()
+        results = []
+
+        def job(ctx):
+            runner.cancel()
+            ctx.report(1, 2, cancellable=False)
+            return "saved"
+
+        runner.submit("save", job, on_done=results.append)
+        runner.wait(timeout=5)
+        assert results == ["saved"]